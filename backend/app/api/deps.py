@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from typing import Iterator
+import secrets
+from typing import AsyncIterator, Iterator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import structlog
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import Settings, get_settings
 from app.core.security import AuthenticatedUser, AuthenticationError, verify_access_token
-from app.db.base import SessionLocal
+from app.db.base import AsyncSessionLocal, SessionLocal
+from app.services.curriculum_graph import CurriculumGraph
 
 auth_scheme = HTTPBearer(auto_error=False)
 
@@ -26,6 +31,28 @@ def get_db() -> Iterator[Session]:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            # Commit at the end of request if no exception occurred
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def get_curriculum_graph() -> CurriculumGraph:
+    """Current curriculum graph; 503 while it cannot be read from the database."""
+    try:
+        return await CurriculumGraph.current_async()
+    except SQLAlchemyError as exc:
+        structlog.get_logger(__name__).warning("curriculum_graph_unavailable", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Curriculum temporarily unavailable"
+        ) from exc
+
+
 def get_app_settings() -> Settings:
     return get_settings()
 
@@ -51,3 +78,11 @@ async def get_current_user(
         return await verify_access_token(credentials.credentials, settings)
     except AuthenticationError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+
+
+def require_admin(
+    x_admin_token: str | None = Header(default=None),
+    settings: Settings = Depends(get_app_settings),
+) -> None:
+    if not settings.admin_token or not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.deps import require_admin
+from app.ml.model_loader import ModelLoader
+from app.ml.model_registry import ModelValidationError, get_model_registry
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/models", summary="Loaded and available models")
+def list_models() -> dict[str, Any]:
+    registry = get_model_registry()
+    return {**registry.stats(), "available": registry.available()}
+
+
+@router.post("/admin/models/reload", summary="Hot-reload a model and make it active")
+async def reload_model(name: str | None = Query(default=None, description="Model name; defaults to the active model")) -> dict[str, Any]:
+    # Only models the registry already lists can be loaded; anything else would unpickle an arbitrary path
+    if name is not None and name not in get_model_registry().available():
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+    # Load and warm-up run in a worker thread; requests keep using the current model until the swap
+    try:
+        await asyncio.to_thread(ModelLoader.reload, name)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Model file not found: {exc}") from exc
+    except ModelValidationError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"Model could not be loaded: {exc}") from exc
+    entry = ModelLoader.entry()
+    return {"active": entry.name, "version": entry.version, "load_ms": entry.load_ms, "warmup_ms": entry.warmup_ms}
@@ -10,12 +10,13 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_app_settings, get_current_user, get_db
 from app.core.config import Settings
-from app.core.password import hash_password, verify_password
+from app.core.password import hash_password, needs_rehash, verify_password
 from app.core.security import AuthenticatedUser
 from app.db import repository
 from app.db.models import User
 from app.db.schemas import UserRead
 from app.db.schemas_auth import RegisterResponse, Token, UserLogin, UserRegister, UserResponse
+from app.services.executor import get_password_executor
 
 router = APIRouter()
 
@@ -54,8 +55,8 @@ async def register(
             detail="Email already registered"
         )
 
-    # Create new user
-    hashed_password = hash_password(user_data.password)
+    # Create new user (bcrypt runs in the password pool, off the event loop)
+    hashed_password = await get_password_executor().run(hash_password, user_data.password)
     new_user = User(
         id=uuid.uuid4(),
         email=user_data.email,
@@ -101,8 +102,9 @@ async def login(
             detail="Invalid email or password"
         )
 
-    # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    # Verify password (bcrypt runs in the password pool, off the event loop)
+    password_executor = get_password_executor()
+    if not await password_executor.run(verify_password, credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -115,6 +117,10 @@ async def login(
             detail="User account is inactive"
         )
 
+    # Transparently upgrade hashes made with a previous BCRYPT_ROUNDS (active accounts only)
+    if needs_rehash(user.password_hash):
+        user.password_hash = await password_executor.run(hash_password, credentials.password)
+
     # Create access token
     access_token = create_access_token(str(user.id), user.email, settings)
 
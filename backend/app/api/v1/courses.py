@@ -1,145 +1,122 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Iterable, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import or_, func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user, get_curriculum_graph
 from app.core.security import AuthenticatedUser
-from app.db.models import Course
-from app.db.repository import get_student_profile
-from app.db.schemas import CourseRead
+from app.db.async_repository import get_student_profile
+from app.db.schemas import CourseDependencies, CourseRead, CourseRef, CriticalPath
+from app.services.course_availability import list_available_courses
+from app.services.course_catalog import CourseCatalog, etag_matches
+from app.services.curriculum_graph import CurriculumGraph, iter_nodes
+from app.services.prerequisite_closure import PrerequisiteClosure
 
 
 router = APIRouter()
 
 
+# Clients revalidate on every poll; an unchanged catalog costs a 304 without a body
+CACHE_CONTROL = "private, no-cache"
+
+
+def _cached_json(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/courses/available", response_model=List[CourseRead])
 async def get_available_courses(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     user: AuthenticatedUser = Depends(get_current_user),
     max_next_semesters: int = Query(1, ge=0, le=3),
-) -> list[CourseRead]:
-    """
-    Return available courses for the current user based on their profile.
-
-    Minimal viable logic:
-    - If the user has a profile, use `semestres_cursados` to allow courses up to next semester window.
-    - Only include courses without prerequisites (prerequisitos empty/None),
-      since we don't yet track cursos_aprobados.
-    - If no profile, return all courses without prerequisites as a fallback.
-    """
-    profile = get_student_profile(db, user_id=user.id)
-
-    semestre_limit: int | None = None
-    if profile is not None:
-        try:
-            semestres_cursados = int(profile.profile_data.get("semestres_cursados", 0))
-            semestre_limit = semestres_cursados + max_next_semesters
-        except (TypeError, ValueError):
-            semestre_limit = None
-
-    # Base filter: by semester window (if provided)
-    base_query = db.query(Course)
-    if semestre_limit is not None:
-        # Only enforce upper bound to include cursos de semestres anteriores sin prerequisitos
-        base_query = base_query.filter((Course.semestre == None) | (Course.semestre <= semestre_limit))  # noqa: E711
-
-    # If we have an approved-courses list in profile, enforce prerequisites
-    approved_names: set[str] = set()
-    approved_codes: set[str] = set()
-    if profile and isinstance(profile.profile_data, dict):
-        try:
-            # Normalize to uppercase without surrounding spaces for robustness
-            approved_names = {str(x).strip().upper() for x in (profile.profile_data.get("cursos_aprobados", []) or [])}
-            approved_codes = {str(x).strip().upper() for x in (profile.profile_data.get("cursos_aprobados_codigos", []) or [])}
-        except Exception:
-            approved_names = set()
-            approved_codes = set()
-
-    # If the user marked approved courses but did not set semestres_cursados, infer progress
-    if (semestre_limit is None or semestre_limit == max_next_semesters) and (approved_names or approved_codes):
-        try:
-            cond = []
-            if approved_codes:
-                cond.append(func.upper(Course.cod_curso).in_(approved_codes))
-            if approved_names:
-                cond.append(func.upper(Course.nombre).in_(approved_names))
-            if cond:
-                rows = db.query(Course.semestre).filter(or_(*cond)).all()
-                max_sem = max([r[0] or 0 for r in rows], default=0)
-                # Use the greater of declared semestres_cursados and inferred from approved courses
-                base_sem = max_sem
-                try:
-                    base_sem = max(base_sem, int(profile.profile_data.get("semestres_cursados", 0)))  # type: ignore[arg-type]
-                except Exception:
-                    pass
-                semestre_limit = base_sem + max_next_semesters
-        except Exception:
-            pass
-
-    def prereqs_satisfied(course: Course) -> bool:
-        # If no prerequisites, it's available
-        if not course.prerequisitos:
-            return True
-        # If we don't know approved names, default to showing only no-prereq courses
-        if not approved_names:
-            return False
-        # All prereq names must be in approved_names
-        try:
-            return all((str(p).strip().upper() in approved_names) for p in course.prerequisitos)
-        except Exception:
-            return False
-
-    def not_already_taken(course: Course) -> bool:
-        name_ok = (course.nombre or "").strip().upper() not in approved_names
-        code_ok = (course.cod_curso or "").strip().upper() not in approved_codes
-        return name_ok and code_ok
-
-    # Fetch and apply Python-side filter for prerequisites (JSON field)
-    all_candidates = base_query.order_by(Course.semestre.asc().nullsfirst(), Course.cod_curso.asc()).all()
-    courses = [c for c in all_candidates if prereqs_satisfied(c) and not_already_taken(c)]
-
-    return [
-        CourseRead(
-            cod_curso=c.cod_curso,
-            nombre=c.nombre,
-            semestre=c.semestre,
-            tipo=c.tipo,
-            horas=c.horas,
-            creditos=c.creditos,
-            prerequisitos=c.prerequisitos or [],
-            familia=c.familia,
-            nivel=c.nivel,
-        )
-        for c in courses
-    ]
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> Response:
+    """Return available courses for the current user based on their profile."""
+    profile = await get_student_profile(db, user_id=user.id)
+    catalog = CourseCatalog.for_graph(graph)
+    courses = list_available_courses(profile, max_next_semesters=max_next_semesters, graph=graph)
+    body, etag = catalog.subset(courses)
+    return _cached_json(request, body, etag)
 
 
 @router.get("/courses/all", response_model=List[CourseRead])
 async def list_all_courses(
-    db: Session = Depends(get_db),
+    request: Request,
     user: AuthenticatedUser = Depends(get_current_user),
-) -> list[CourseRead]:
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> Response:
     """Return all courses in the curriculum (no filtering)."""
-    items = (
-        db.query(Course)
-        .order_by(Course.semestre.asc().nullsfirst(), Course.cod_curso.asc())
-        .all()
-    )
+    catalog = CourseCatalog.for_graph(graph)
+    return _cached_json(request, catalog.body, catalog.etag)
+
+
+def _closure_node(graph: CurriculumGraph, cod_curso: str) -> tuple[PrerequisiteClosure, int]:
+    closure = PrerequisiteClosure.for_graph(graph)
+    node = closure.graph.node(cod_curso)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Course {cod_curso} not found in the curriculum")
+    return closure, node
+
+
+def _course_refs(closure: PrerequisiteClosure, nodes: Iterable[int]) -> list[CourseRef]:
     return [
-        CourseRead(
-            cod_curso=c.cod_curso,
-            nombre=c.nombre,
-            semestre=c.semestre,
-            tipo=c.tipo,
-            horas=c.horas,
-            creditos=c.creditos,
-            prerequisitos=c.prerequisitos or [],
-            familia=c.familia,
-            nivel=c.nivel,
-        )
-        for c in items
+        CourseRef(cod_curso=course.cod_curso, nombre=course.nombre, semestre=course.semestre)
+        for course in (closure.graph.courses[n] for n in nodes)
     ]
+
+
+@router.get("/courses/{cod_curso}/blocked-by", response_model=CourseDependencies)
+async def course_blocked_by(
+    cod_curso: str,
+    user: AuthenticatedUser = Depends(get_current_user),
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> CourseDependencies:
+    """Every course that must be approved before this one, directly or transitively."""
+    closure, node = _closure_node(graph, cod_curso)
+    course_mask = (1 << len(graph)) - 1
+    requires = closure.requires[node]
+    return CourseDependencies(
+        cod_curso=graph.courses[node].cod_curso,
+        direct=[graph.courses[n].cod_curso for n in iter_nodes(graph.prerequisite_masks[node] & course_mask)],
+        courses=_course_refs(closure, iter_nodes(requires & course_mask)),
+        requirements=list(graph.requirement_names(requires)),
+        curriculum_version=closure.version,
+    )
+
+
+@router.get("/courses/{cod_curso}/unlocks", response_model=CourseDependencies)
+async def course_unlocks(
+    cod_curso: str,
+    user: AuthenticatedUser = Depends(get_current_user),
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> CourseDependencies:
+    """Every course that needs this one, directly or transitively: what failing it blocks."""
+    closure, node = _closure_node(graph, cod_curso)
+    return CourseDependencies(
+        cod_curso=graph.courses[node].cod_curso,
+        direct=[c.cod_curso for c, mask in zip(graph.courses, graph.prerequisite_masks) if mask >> node & 1],
+        courses=_course_refs(closure, iter_nodes(closure.unlocks[node])),
+        curriculum_version=closure.version,
+    )
+
+
+@router.get("/courses/{cod_curso}/critical-path", response_model=CriticalPath)
+async def course_critical_path(
+    cod_curso: str,
+    user: AuthenticatedUser = Depends(get_current_user),
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> CriticalPath:
+    """Longest prerequisite chain leading to this course."""
+    closure, node = _closure_node(graph, cod_curso)
+    return CriticalPath(
+        cod_curso=closure.graph.courses[node].cod_curso,
+        length=closure.depth[node],
+        path=_course_refs(closure, closure.critical_path(node)),
+        curriculum_version=closure.version,
+    )
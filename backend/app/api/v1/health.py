@@ -1,5 +1,10 @@
 from datetime import datetime
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+from app.core import metrics
 
 router = APIRouter()
 
@@ -9,6 +14,20 @@ def healthz() -> dict[str, str]:
     return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
 
 
-@router.get("/health", summary="Health check")
-def health() -> dict[str, str]:
-    return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
+@router.get("/health", summary="Readiness check")
+def health(request: Request) -> JSONResponse:
+    # Ready only once the startup warm-up has finished; /healthz stays a plain liveness probe
+    ready = getattr(request.app.state, "ready", False)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ok" if ready else "starting",
+            "timestamp": datetime.utcnow().isoformat(),
+            "warmup": getattr(request.app.state, "warmup", None),
+        },
+    )
+
+
+@router.get("/metrics", summary="Runtime metrics")
+def runtime_metrics() -> dict[str, Any]:
+    return metrics.snapshot()
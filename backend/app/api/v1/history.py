@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from typing import Literal
 
-from app.api.deps import get_current_user, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_app_settings, get_async_db, get_current_user
+from app.core.config import Settings
 from app.core.security import AuthenticatedUser
-from app.db import repository
+from app.db import async_repository, history_codec
 from app.db.schemas import HistoryResponse, InferenceRead
 
 router = APIRouter()
@@ -12,22 +15,52 @@ router = APIRouter()
 @router.get("/history", response_model=HistoryResponse)
 async def get_history(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Ignored when a cursor is given; prefer cursor for deep pages"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    fields: Literal["full", "summary"] = Query("full", description="summary omits input/output payloads"),
+    total: Literal["exact", "cached", "none"] = Query(
+        "exact", description="exact counts; cached may lag other workers by HISTORY_TOTAL_CACHE_SECONDS; none skips it"
+    ),
     user: AuthenticatedUser = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    settings: Settings = Depends(get_app_settings),
 ) -> HistoryResponse:
-    inferences, total = repository.list_user_inferences(db, user_id=user.id, limit=limit, offset=offset)
+    include_payloads = fields == "full"
+    try:
+        rows, next_cursor = await async_repository.list_user_inferences(
+            db, user_id=user.id, limit=limit, offset=offset, cursor=cursor, include_payloads=include_payloads
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
     items = [
         InferenceRead(
-            id=str(inf.id),
-            cod_curso=inf.cod_curso,
-            prediction_label=inf.output_payload.get("label", "Desconocido"),
-            score=float(inf.output_payload.get("score", 0.0)),
-            version=inf.version,
-            created_at=inf.created_at,
-            input_payload=inf.input_payload,
-            output_payload=inf.output_payload,
+            id=str(row.id),
+            cod_curso=row.cod_curso,
+            prediction_label=row.label or "Desconocido",
+            score=float(row.score or 0.0),
+            estimated_grade=row.estimated_grade,
+            version=row.version,
+            created_at=row.created_at,
+            # Payloads are rebuilt from the compact columns only when they were asked for
+            input_payload=(
+                history_codec.decode_input(row.input_payload, row.feature_names, row.features_blob)
+                if include_payloads
+                else None
+            ),
+            output_payload=(
+                history_codec.decode_output(row.output_payload, row.label, row.score, row.version)
+                if include_payloads
+                else None
+            ),
         )
-        for inf in inferences
+        for row in rows
     ]
-    return HistoryResponse(items=items, total=total, limit=limit, offset=offset)
+
+    count = None
+    if total != "none":
+        max_age = settings.history_total_cache_seconds if total == "cached" else 0.0
+        count = await async_repository.count_user_inferences(db, user_id=user.id, max_age_seconds=max_age)
+    return HistoryResponse(
+        items=items, total=count, limit=limit, offset=0 if cursor else offset, next_cursor=next_cursor
+    )
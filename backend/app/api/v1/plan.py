@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_user, get_curriculum_graph
+from app.core.security import AuthenticatedUser
+from app.db import async_repository
+from app.db.schemas import PlannedCourse, PlannedSemester, StudyPlanRequest, StudyPlanResult
+from app.ml.featurizer import to_feature_matrix
+from app.ml.model_loader import ModelLoader
+from app.services.curriculum_graph import CurriculumGraph, approved_sets
+from app.services.inference import InferenceService
+from app.services.prediction_cache import profile_revision
+from app.services.study_planner import build_plan, credits_of
+
+router = APIRouter()
+
+
+@router.post("/plan", response_model=StudyPlanResult)
+async def study_plan(
+    payload: StudyPlanRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: AuthenticatedUser = Depends(get_current_user),
+    graph: CurriculumGraph = Depends(get_curriculum_graph),
+) -> StudyPlanResult:
+    """Semester-by-semester plan for the rest of the curriculum, scored with a single model call."""
+    profile = await async_repository.get_student_profile(db, user_id=user.id)
+    if not profile and not payload.features:
+        raise HTTPException(
+            status_code=422,
+            detail="No student profile found. Please create a profile first at /api/v1/profile or provide features in the request."
+        )
+
+    approved_names, approved_codes = approved_sets(profile.profile_data if profile else None)
+    approved = graph.approved_mask(approved_names, approved_codes)
+    candidates = [course for course in graph.courses if not approved >> course.node & 1]
+    if not candidates:
+        return StudyPlanResult(
+            semesters=[], unscheduled=[], critical_path=0, expected_passes=0.0, version=ModelLoader.version()
+        )
+
+    # Every course that could end up in the plan is scored in one batch
+    course_codes = [course.cod_curso for course in candidates]
+    if profile:
+        results = await InferenceService.predict_profile(
+            user_id=user.id,
+            profile_data=profile.profile_data,
+            revision=profile_revision(profile.profile_data, profile.updated_at),
+            course_codes=course_codes,
+        )
+    else:
+        results = await InferenceService.score(to_feature_matrix([payload.features] * len(course_codes)))
+    by_node = {course.node: result for course, result in zip(candidates, results)}
+
+    plan = build_plan(
+        graph,
+        approved,
+        {node: result[1] for node, result in by_node.items()},
+        max_credits=payload.max_credits,
+        max_semesters=payload.max_semesters,
+        electives=payload.electives,
+    )
+
+    semesters = []
+    for index, planned in enumerate(plan.semesters, start=1):
+        courses = [
+            PlannedCourse(
+                cod_curso=item.course.cod_curso,
+                nombre=item.course.nombre,
+                creditos=credits_of(item.course),
+                score=item.score,
+                estimated_grade=by_node[item.course.node][3],
+                requirements=list(item.requirements),
+            )
+            for item in planned
+        ]
+        semesters.append(
+            PlannedSemester(
+                index=index,
+                courses=courses,
+                credits=sum(course.creditos for course in courses),
+                expected_credits=sum(course.creditos * course.score for course in courses),
+            )
+        )
+    return StudyPlanResult(
+        semesters=semesters,
+        unscheduled=[course.cod_curso for course in plan.unscheduled],
+        critical_path=plan.critical_path,
+        expected_passes=sum(course.score for semester in semesters for course in semester.courses),
+        version=results[0][2]["model_version"],
+    )
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import logging
 
-from app.api.deps import get_app_settings, get_current_user, get_db
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_app_settings, get_async_db, get_current_user, get_curriculum_graph
 from app.core.config import Settings
 from app.core.security import AuthenticatedUser
-from app.db import repository
-from app.db.schemas import PredictRequest, PredictionResult
+from app.db import async_repository
+from app.db.schemas import BatchPredictionResult, BatchPredictRequest, PredictRequest, PredictionResult
+from app.ml.featurizer import to_feature_matrix, to_feature_vector
 from app.ml.model_loader import ModelLoader
+from app.services.course_availability import list_available_courses
+from app.services.history_writer import get_history_writer
 from app.services.inference import InferenceService
-from app.services.profile_mapper import simplified_to_full_features
+from app.services.prediction_cache import profile_revision
 
 router = APIRouter()
 
@@ -16,38 +21,40 @@ router = APIRouter()
 @router.post("/predict", response_model=PredictionResult)
 async def predict(
     payload: PredictRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: AuthenticatedUser = Depends(get_current_user),
     settings: Settings = Depends(get_app_settings),
 ) -> PredictionResult:
-    repository.get_or_create_user(db, user_id=user.id, email=user.email)
-    repository.get_or_create_course(db, course_code=payload.course_code)
-
-    # Try to get student profile from database
-    import logging
-    profile = repository.get_student_profile(db, user_id=user.id)
+    # User, stored profile and course in one round trip
+    context = await async_repository.load_request_context(
+        db, user_id=user.id, email=user.email, course_code=payload.course_code
+    )
+    profile = context.profile
 
     # If profile exists, convert to 41 features; otherwise use provided features
     if profile:
-        # Convert profile to 41 features using the mapper
-        import logging
+        # Convert profile to 41 features using the mapper (served from the prediction cache when fresh)
         logging.info(f"✅ Using profile data: {profile.profile_data}")
-        features = simplified_to_full_features(profile.profile_data, course_code=payload.course_code)
-        logging.info(f"✅ Generated features - Promedio: {features.get('PROM_POND_HIST')}, Créditos: {features.get('CRED_APROB_HIST')}, Puntaje: {features.get('PTJE_INGRESO')}")
+        results = await InferenceService.predict_profile(
+            user_id=user.id,
+            profile_data=profile.profile_data,
+            revision=profile_revision(profile.profile_data, profile.updated_at),
+            course_codes=[payload.course_code],
+        )
     elif payload.features:
         # Use features from request
         logging.warning(f"⚠️ No profile found, using request features: {payload.features}")
-        features = payload.features
+        vectors = to_feature_vector(payload.features)
+        results = await InferenceService.score(vectors)
     else:
         # No profile and no features - return error with helpful message
-        from fastapi import HTTPException
         raise HTTPException(
             status_code=422,
             detail="No student profile found. Please create a profile first at /api/v1/profile or provide features in the request."
         )
 
-    label, score, details, est_grade = InferenceService.predict(features=features)
-    model_version = ModelLoader.version()
+    label, score, details, est_grade = results[0]
+    model_version = details["model_version"]
 
     output_payload = {
         "label": label,
@@ -58,17 +65,20 @@ async def predict(
 
     # Try to save inference history, but don't fail if it errors
     try:
-        repository.create_inference(
+        await get_history_writer().record_async(
             db,
             user_id=user.id,
-            course_code=payload.course_code,
-            input_payload={"features": payload.features, "metadata": payload.metadata},
-            output_payload=output_payload,
-            version=model_version,
+            records=[
+                {
+                    "course_code": payload.course_code,
+                    "input_payload": {"features": payload.features, "metadata": payload.metadata},
+                    "output_payload": output_payload,
+                    "version": model_version,
+                }
+            ],
         )
     except Exception as e:
         # Log the error but continue - prediction is more important than history
-        import logging
         logging.warning(f"Failed to save inference history: {e}")
 
     return PredictionResult(
@@ -80,3 +90,80 @@ async def predict(
         estimated_grade=est_grade,
         max_grade=20.0,
     )
+
+
+@router.post("/predict/batch", response_model=BatchPredictionResult)
+async def predict_batch(
+    payload: BatchPredictRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: AuthenticatedUser = Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+) -> BatchPredictionResult:
+    """Score several courses for the current user with a single model call."""
+    profile = (await async_repository.load_request_context(db, user_id=user.id, email=user.email)).profile
+
+    if payload.all_available:
+        graph = await get_curriculum_graph()
+        available = list_available_courses(profile, max_next_semesters=payload.max_next_semesters, graph=graph)
+        course_codes = [c.cod_curso for c in available]
+    else:
+        course_codes = list(dict.fromkeys(payload.course_codes))
+
+    if not course_codes:
+        return BatchPredictionResult(items=[], version=ModelLoader.version())
+
+    await async_repository.get_or_create_courses(db, course_codes=course_codes)
+
+    if profile:
+        results = await InferenceService.predict_profile(
+            user_id=user.id,
+            profile_data=profile.profile_data,
+            revision=profile_revision(profile.profile_data, profile.updated_at),
+            course_codes=course_codes,
+        )
+    elif payload.features:
+        vectors = to_feature_matrix([payload.features] * len(course_codes))
+        results = await InferenceService.score(vectors)
+    else:
+        raise HTTPException(
+            status_code=422,
+            detail="No student profile found. Please create a profile first at /api/v1/profile or provide features in the request."
+        )
+
+    items: list[PredictionResult] = []
+    records: list[dict] = []
+    for code, (label, score, details, est_grade) in zip(course_codes, results):
+        model_version = details["model_version"]
+        items.append(
+            PredictionResult(
+                cod_curso=code,
+                prediction_label=label,
+                score=score,
+                version=model_version,
+                details=details,
+                estimated_grade=est_grade,
+                max_grade=20.0,
+            )
+        )
+        records.append(
+            {
+                "course_code": code,
+                "input_payload": {"features": payload.features, "metadata": payload.metadata},
+                "output_payload": {
+                    "label": label,
+                    "score": score,
+                    "details": details,
+                    "version": model_version,
+                    "mode": "batch",
+                },
+                "version": model_version,
+            }
+        )
+
+    # Try to save inference history in one bulk insert, but don't fail if it errors
+    try:
+        await get_history_writer().record_async(db, user_id=user.id, records=records)
+    except Exception as e:
+        logging.warning(f"Failed to save inference history: {e}")
+
+    return BatchPredictionResult(items=items, version=items[0].version)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user
 from app.core.security import AuthenticatedUser
-from app.db import repository
+from app.db import async_repository
 from app.db.schemas_profile import StudentProfileCreate, StudentProfileRead, StudentProfileSimplified
+from app.services.prediction_cache import get_prediction_cache
 
 router = APIRouter()
 
@@ -12,18 +13,18 @@ router = APIRouter()
 @router.post("/profile", response_model=StudentProfileRead, status_code=status.HTTP_201_CREATED)
 async def create_or_update_profile(
     profile: StudentProfileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: AuthenticatedUser = Depends(get_current_user),
 ) -> StudentProfileRead:
     """Create or update student profile"""
-    repository.get_or_create_user(db, user_id=user.id, email=user.email)
-
-    # Check if profile already exists
-    existing_profile = repository.get_student_profile(db, user_id=user.id)
+    # Check if profile already exists (resolved together with the user)
+    existing_profile = (await async_repository.load_request_context(db, user_id=user.id, email=user.email)).profile
 
     if existing_profile:
         # Update existing profile
-        updated_profile = repository.update_student_profile(db, user_id=user.id, profile_data=profile.model_dump())
+        updated_profile = await async_repository.update_student_profile(db, user_id=user.id, profile_data=profile.model_dump())
+        # Predictions of the previous revision can no longer be requested; frees them in-process
+        get_prediction_cache().invalidate_user(user.id)
         return StudentProfileRead(
             id=str(updated_profile.id),
             user_id=str(updated_profile.user_id),
@@ -33,7 +34,7 @@ async def create_or_update_profile(
         )
     else:
         # Create new profile
-        new_profile = repository.create_student_profile(db, user_id=user.id, profile_data=profile.model_dump())
+        new_profile = await async_repository.create_student_profile(db, user_id=user.id, profile_data=profile.model_dump())
         return StudentProfileRead(
             id=str(new_profile.id),
             user_id=str(new_profile.user_id),
@@ -45,13 +46,11 @@ async def create_or_update_profile(
 
 @router.get("/profile", response_model=StudentProfileRead | None)
 async def get_profile(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: AuthenticatedUser = Depends(get_current_user),
 ) -> StudentProfileRead | None:
     """Get student profile"""
-    repository.get_or_create_user(db, user_id=user.id, email=user.email)
-
-    profile = repository.get_student_profile(db, user_id=user.id)
+    profile = (await async_repository.load_request_context(db, user_id=user.id, email=user.email)).profile
 
     if not profile:
         return None
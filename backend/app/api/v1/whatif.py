@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_app_settings, get_current_user, get_db
+from app.api.deps import get_app_settings, get_async_db, get_current_user
 from app.core.config import Settings
 from app.core.security import AuthenticatedUser
-from app.db import repository
-from app.db.schemas import PredictionResult, WhatIfRequest
-from app.ml.model_loader import ModelLoader
+from app.db import async_repository
+from app.db.schemas import PredictionResult, SweepPoint, WhatIfRequest, WhatIfSweepRequest, WhatIfSweepResult
+from app.ml.featurizer import to_feature_vector
+from app.services.executor import get_inference_executor
+from app.services.history_writer import get_history_writer
 from app.services.inference import InferenceService
 from app.services.profile_mapper import simplified_to_full_features
+from app.services.whatif_sweep import SweepError, build_sweep_matrix
 
 router = APIRouter()
 
@@ -16,15 +19,15 @@ router = APIRouter()
 @router.post("/whatif", response_model=PredictionResult)
 async def what_if(
     payload: WhatIfRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: AuthenticatedUser = Depends(get_current_user),
     settings: Settings = Depends(get_app_settings),
 ) -> PredictionResult:
-    repository.get_or_create_user(db, user_id=user.id, email=user.email)
-    repository.get_or_create_course(db, course_code=payload.course_code)
-
-    # Try to get student profile from database
-    profile = repository.get_student_profile(db, user_id=user.id)
+    # User, stored profile and course in one round trip
+    context = await async_repository.load_request_context(
+        db, user_id=user.id, email=user.email, course_code=payload.course_code
+    )
+    profile = context.profile
 
     # If profile exists, prefer adjusting simplified profile fields and re-map to 41 features
     if profile:
@@ -48,8 +51,9 @@ async def what_if(
         for key, delta in payload.deltas.items():
             adjusted_features[key] = float(adjusted_features.get(key, 0.0)) + float(delta)
 
-    label, score, details, est_grade = InferenceService.predict(features=adjusted_features)
-    model_version = ModelLoader.version()
+    results = await InferenceService.score(to_feature_vector(adjusted_features))
+    label, score, details, est_grade = results[0]
+    model_version = details["model_version"]
 
     output_payload = {
         "label": label,
@@ -59,13 +63,17 @@ async def what_if(
         "mode": "whatif",
     }
 
-    repository.create_inference(
+    await get_history_writer().record_async(
         db,
         user_id=user.id,
-        course_code=payload.course_code,
-        input_payload={"features": adjusted_features, "metadata": payload.metadata, "deltas": payload.deltas},
-        output_payload=output_payload,
-        version=model_version,
+        records=[
+            {
+                "course_code": payload.course_code,
+                "input_payload": {"features": adjusted_features, "metadata": payload.metadata, "deltas": payload.deltas},
+                "output_payload": output_payload,
+                "version": model_version,
+            }
+        ],
     )
 
     return PredictionResult(
@@ -77,3 +85,83 @@ async def what_if(
         estimated_grade=est_grade,
         max_grade=20.0,
     )
+
+
+@router.post("/whatif/sweep", response_model=WhatIfSweepResult)
+async def what_if_sweep(
+    payload: WhatIfSweepRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: AuthenticatedUser = Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+) -> WhatIfSweepResult:
+    """Evaluate a grid of what-if values for one course with a single model call."""
+    context = await async_repository.load_request_context(
+        db, user_id=user.id, email=user.email, course_code=payload.course_code
+    )
+    profile = context.profile
+
+    if not profile and not payload.features:
+        raise HTTPException(
+            status_code=422,
+            detail="No student profile found. Please create a profile first at /api/v1/profile or provide features in the request."
+        )
+
+    try:
+        matrix, grid = build_sweep_matrix(
+            course_code=payload.course_code,
+            axes=payload.axes,
+            profile_data=dict(profile.profile_data) if profile else None,
+            features=payload.features,
+            max_points=settings.whatif_sweep_max_points,
+        )
+    except SweepError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    pass_prob, grades, model_version = await get_inference_executor().run(InferenceService.predict_arrays, matrix)
+
+    keys = [axis.key for axis in payload.axes]
+    scores = pass_prob.tolist()
+    est_grades = grades.tolist() if grades is not None else [None] * len(scores)
+    base = SweepPoint(values={}, score=scores[0], estimated_grade=est_grades[0])
+    points = [
+        SweepPoint(values=dict(zip(keys, values)), score=score, estimated_grade=grade)
+        for values, score, grade in zip(grid.tolist(), scores[1:], est_grades[1:])
+    ]
+
+    # Store one summarized history entry for the whole sweep
+    best = max(points, key=lambda point: point.score)
+    await get_history_writer().record_async(
+        db,
+        user_id=user.id,
+        records=[
+            {
+                "course_code": payload.course_code,
+                "input_payload": {
+                    "axes": [axis.model_dump() for axis in payload.axes],
+                    "metadata": payload.metadata,
+                    "features": payload.features,
+                },
+                "output_payload": {
+                    "label": "Aprobar" if base.score >= InferenceService.pass_mark else "Desaprobar",
+                    "score": base.score,
+                    "details": {
+                        "points": len(points),
+                        "min_score": min(point.score for point in points),
+                        "max_score": best.score,
+                        "best_values": best.values,
+                    },
+                    "version": model_version,
+                    "mode": "whatif_sweep",
+                },
+                "version": model_version,
+            }
+        ],
+    )
+
+    return WhatIfSweepResult(
+        cod_curso=payload.course_code,
+        version=model_version,
+        axes=keys,
+        base=base,
+        points=points,
+    )
@@ -24,15 +24,91 @@ class Settings(BaseSettings):
     supabase_project_ref: str | None = Field(default=None, alias="SUPABASE_PROJECT_REF")
     supabase_jwks_url: AnyHttpUrl | None = Field(default=None, alias="SUPABASE_JWKS_URL")
     supabase_audience: str = Field(default="authenticated", alias="SUPABASE_AUDIENCE")
+    # JWKS cache: refreshed in the background REFRESH_AHEAD seconds before the TTL, stale keys
+    # served for up to MAX_STALE seconds if the provider is slow; unknown kids refetch at most
+    # once per MIN_REFRESH_INTERVAL
+    jwks_ttl_seconds: float = Field(default=300.0, alias="JWKS_TTL_SECONDS")
+    jwks_refresh_ahead_seconds: float = Field(default=60.0, alias="JWKS_REFRESH_AHEAD_SECONDS")
+    jwks_max_stale_seconds: float = Field(default=3600.0, alias="JWKS_MAX_STALE_SECONDS")
+    jwks_min_refresh_interval_seconds: float = Field(default=30.0, alias="JWKS_MIN_REFRESH_INTERVAL_SECONDS")
+    jwks_timeout_seconds: float = Field(default=5.0, alias="JWKS_TIMEOUT_SECONDS")
 
     # Internal JWT settings (used when AUTH_MODE=jwt)
     jwt_secret: str = Field(default="dev-secret-key-change-in-production", alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
+    # Verified bearer tokens, kept until exp but at most TOKEN_CACHE_MAX_TTL_SECONDS (size 0 disables it)
+    token_cache_size: int = Field(default=10000, alias="TOKEN_CACHE_SIZE")
+    token_cache_max_ttl_seconds: float = Field(default=600.0, alias="TOKEN_CACHE_MAX_TTL_SECONDS")
+
+    # Password hashing: bcrypt cost factor (existing hashes are upgraded on login) and its
+    # dedicated pool; requests beyond workers + queue get 503 instead of waiting
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(default=32, alias="PASSWORD_HASH_MAX_QUEUE")
 
     database_url: str = Field(alias="DATABASE_URL")
+    # Request handlers use an async engine; by default DATABASE_URL with its async driver
+    # (sqlite -> aiosqlite, postgresql -> asyncpg)
+    async_database_url: str | None = Field(default=None, alias="ASYNC_DATABASE_URL")
+    # Connection pool of the async engine serving requests (in-memory SQLite always shares a
+    # single connection); connections are replaced after DB_POOL_RECYCLE_SECONDS rather than
+    # pinged on every checkout
+    db_pool_size: int = Field(default=10, ge=1, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, alias="DB_MAX_OVERFLOW")
+    # The sync engine only serves auth lookups, background flushes and scripts
+    db_sync_pool_size: int = Field(default=2, ge=1, alias="DB_SYNC_POOL_SIZE")
+    db_sync_max_overflow: int = Field(default=3, ge=0, alias="DB_SYNC_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=10.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=False, alias="DB_POOL_PRE_PING")
 
     model_path: str = Field(default="../ml_models/models/model.pkl", alias="MODEL_PATH")
     model_version: str = Field(default="v1", alias="MODEL_VERSION")
+    # Model registry: <MODEL_DIR>/<name>.pkl; MODEL_NAME picks the active model instead of MODEL_PATH
+    model_dir: str = Field(default="../ml_models/models", alias="MODEL_DIR")
+    model_name: str | None = Field(default=None, alias="MODEL_NAME")
+    model_watch_interval_seconds: float = Field(default=30.0, alias="MODEL_WATCH_INTERVAL_SECONDS")
+    # Synthetic predictions run at startup before /health reports ready (0 only loads the model)
+    model_warmup_predictions: int = Field(default=4, alias="MODEL_WARMUP_PREDICTIONS")
+    # A failed warm-up is retried in the background, first after this delay, doubling up to a minute
+    model_warmup_retry_seconds: float = Field(default=5.0, gt=0, alias="MODEL_WARMUP_RETRY_SECONDS")
+    admin_token: str | None = Field(default=None, alias="ADMIN_TOKEN")
+    # Regressors: pass probability = sigmoid((grade - center) / scale)
+    grade_pass_center: float = Field(default=10.5, alias="GRADE_PASS_CENTER")
+    grade_pass_scale: float = Field(default=5.0, alias="GRADE_PASS_SCALE")
+
+    curriculum_path: str = Field(default="../ml_models/data/malla_curricular_2016.csv", alias="CURRICULUM_PATH")
+    # How often the courses table is checked for changes (e.g. load_curriculum.py runs); 0 disables
+    curriculum_refresh_interval_seconds: float = Field(default=30.0, alias="CURRICULUM_REFRESH_INTERVAL_SECONDS")
+
+    # Known users/courses, so request context loading can skip existence checks (size 0 disables it)
+    identity_cache_size: int = Field(default=10000, alias="IDENTITY_CACHE_SIZE")
+    identity_cache_ttl_seconds: float = Field(default=60.0, alias="IDENTITY_CACHE_TTL_SECONDS")
+
+    # Prediction cache (size 0 disables it; URL selects memory://, local:// or redis://)
+    prediction_cache_size: int = Field(default=4096, alias="PREDICTION_CACHE_SIZE")
+    prediction_cache_ttl_seconds: float = Field(default=300.0, alias="PREDICTION_CACHE_TTL_SECONDS")
+    prediction_cache_url: str | None = Field(default=None, alias="PREDICTION_CACHE_URL")
+
+    # Inference worker pool (thread | process); 0 workers means min(4, CPU count)
+    inference_executor: str = Field(default="thread", alias="INFERENCE_EXECUTOR")
+    inference_workers: int = Field(default=0, alias="INFERENCE_WORKERS")
+    inference_max_queue: int = Field(default=64, alias="INFERENCE_MAX_QUEUE")
+    inference_retry_after_seconds: int = Field(default=1, alias="INFERENCE_RETRY_AFTER_SECONDS")
+
+    # Micro-batching of concurrent predictions (max wait 0 disables it)
+    inference_batch_max_size: int = Field(default=32, alias="INFERENCE_BATCH_MAX_SIZE")
+    inference_batch_max_wait_ms: float = Field(default=2.0, alias="INFERENCE_BATCH_MAX_WAIT_MS")
+
+    whatif_sweep_max_points: int = Field(default=2000, alias="WHATIF_SWEEP_MAX_POINTS")
+
+    # Opt-in /history?total=cached reuses a user's history count for this long; the count is
+    # per process, so writes handled by other workers only show up once it expires
+    history_total_cache_seconds: float = Field(default=30.0, alias="HISTORY_TOTAL_CACHE_SECONDS")
+    # Write-behind of history rows: bounded queue flushed in bulk batches by a background task
+    history_queue_size: int = Field(default=10000, alias="HISTORY_QUEUE_SIZE")
+    history_batch_size: int = Field(default=500, alias="HISTORY_BATCH_SIZE")
+    history_flush_interval_ms: float = Field(default=200.0, alias="HISTORY_FLUSH_INTERVAL_MS")
 
     cors_allow_origins: List[AnyHttpUrl] | None = None
 
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict
+
+_lock = threading.Lock()
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Register a callable returning a JSON-serializable stats dict under ``name``."""
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        providers = dict(_providers)
+    return {name: provider() for name, provider in sorted(providers.items())}
@@ -3,19 +3,31 @@ Password hashing utilities using bcrypt
 """
 import bcrypt
 
+from app.core.config import get_settings
 
-def hash_password(password: str) -> str:
+# Stored for users that authenticate elsewhere (Supabase, mock tokens). It is not a
+# bcrypt hash, so no password can ever match it and creating it costs nothing.
+UNUSABLE_PASSWORD_HASH = "!external-auth"
+
+
+def is_usable_password_hash(hashed_password: str | None) -> bool:
+    """Whether a stored hash can be checked against a password at all"""
+    return bool(hashed_password) and not hashed_password.startswith("!")
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
     """
     Hash a password using bcrypt
 
     Args:
         password: Plain text password
+        rounds: bcrypt cost factor, defaults to the BCRYPT_ROUNDS setting
 
     Returns:
         Hashed password as string
     """
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or get_settings().bcrypt_rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -31,6 +43,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    if not is_usable_password_hash(hashed_password):
+        return False
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def needs_rehash(hashed_password: str, rounds: int | None = None) -> bool:
+    """
+    Check whether a bcrypt hash was made with a different cost factor
+
+    Args:
+        hashed_password: Stored hash (``$2b$<cost>$...``)
+        rounds: Expected cost factor, defaults to the BCRYPT_ROUNDS setting
+
+    Returns:
+        True if the hash should be recomputed on the next successful login
+    """
+    if not is_usable_password_hash(hashed_password):
+        return False
+    try:
+        cost = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != (rounds or get_settings().bcrypt_rounds)
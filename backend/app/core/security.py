@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any, Dict, Optional
@@ -8,6 +12,7 @@ from typing import Any, Dict, Optional
 import httpx
 from jose import ExpiredSignatureError, JWTError, jwt
 
+from app.core import metrics
 from app.core.config import Settings, get_settings
 
 
@@ -22,32 +27,248 @@ class AuthenticatedUser:
     raw_claims: Dict[str, Any] | None = None
 
 
+def _find_key(jwks: Dict[str, Any], kid: str | None) -> Dict[str, Any] | None:
+    return next((k for k in jwks["keys"] if k.get("kid") == kid), None)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Background refreshes may fail without anyone awaiting them; failures are counted instead
+    if not task.cancelled():
+        task.exception()
+
+
 class JWKSCache:
-    """Very small helper to cache JWKS responses."""
+    """
+    JWKS document cache with a pooled HTTP client and single-flight refresh.
+
+    Within ``ttl_seconds - refresh_ahead_seconds`` of the last fetch keys are served
+    as is; after that a background refresh starts while the cached keys keep being
+    served, also once the TTL has passed (stale-while-revalidate) for up to
+    ``max_stale_seconds``. Concurrent callers share one in-flight fetch. An unknown
+    ``kid`` forces a refresh, at most once every ``min_refresh_interval_seconds``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        refresh_ahead_seconds: float = 60.0,
+        max_stale_seconds: float = 3600.0,
+        min_refresh_interval_seconds: float = 30.0,
+        timeout_seconds: float = 5.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds)
+        self._max_stale_seconds = max_stale_seconds
+        self._min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._timeout_seconds = timeout_seconds
+        self._transport = transport
         self._keys: Dict[str, Any] | None = None
         self._fetched_at: float = 0.0
-        self._ttl_seconds: int = 300
+        self._attempted_at: float = float("-inf")
+        self._refresh: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self.fetches = 0
+        self.failures = 0
+        self.stale_served = 0
+        self.kid_miss_refreshes = 0
 
-    async def get_keys(self, url: str) -> Dict[str, Any]:
-        now = time.time()
-        if self._keys and now - self._fetched_at < self._ttl_seconds:
-            return self._keys
+    def _http(self) -> httpx.AsyncClient:
+        # One pooled client per event loop, so connections (and TLS sessions) are reused
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self._timeout_seconds, transport=self._transport)
+            self._client_loop = loop
+        return self._client
 
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(url)
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        self._attempted_at = time.monotonic()
+        self.fetches += 1
+        try:
+            response = await self._http().get(url)
             response.raise_for_status()
             data = response.json()
-
+            if not isinstance(data.get("keys"), list):
+                raise ValueError("JWKS document without keys")
+        except Exception:
+            self.failures += 1
+            raise
         self._keys = data
-        self._fetched_at = now
+        self._fetched_at = time.monotonic()
         return data
 
+    def _start_refresh(self, url: str) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._refresh
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(url))
+            task.add_done_callback(_retrieve_exception)
+            self._refresh = task
+        return task
+
+    async def get_keys(self, url: str, *, force: bool = False) -> Dict[str, Any]:
+        if self._keys is None:
+            # Shielded so a cancelled request does not cancel the fetch other callers wait on
+            return await asyncio.shield(self._start_refresh(url))
+
+        if force:
+            if time.monotonic() - self._attempted_at < self._min_refresh_interval_seconds:
+                return self._keys
+            return await asyncio.shield(self._start_refresh(url))
+
+        age = time.monotonic() - self._fetched_at
+        if age < self._ttl_seconds - self._refresh_ahead_seconds:
+            return self._keys
+        if age < self._ttl_seconds + self._max_stale_seconds:
+            if age >= self._ttl_seconds:
+                self.stale_served += 1
+            # Rate limited too, so a failing provider is not retried on every request
+            if time.monotonic() - self._attempted_at >= self._min_refresh_interval_seconds:
+                self._start_refresh(url)
+            return self._keys
+        return await asyncio.shield(self._start_refresh(url))
+
+    async def get_key(self, url: str, kid: str | None) -> Dict[str, Any] | None:
+        """Signing key for ``kid``, refreshing once (rate limited) when it is unknown, e.g. after rotation."""
+        key = _find_key(await self.get_keys(url), kid)
+        if key is None:
+            self.kid_miss_refreshes += 1
+            key = _find_key(await self.get_keys(url, force=True), kid)
+        return key
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": self._keys is not None,
+            "age_seconds": time.monotonic() - self._fetched_at if self._keys is not None else None,
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "stale_served": self.stale_served,
+            "kid_miss_refreshes": self.kid_miss_refreshes,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
 
 @lru_cache
 def _jwks_cache() -> JWKSCache:
-    return JWKSCache()
+    settings = get_settings()
+    cache = JWKSCache(
+        ttl_seconds=settings.jwks_ttl_seconds,
+        refresh_ahead_seconds=settings.jwks_refresh_ahead_seconds,
+        max_stale_seconds=settings.jwks_max_stale_seconds,
+        min_refresh_interval_seconds=settings.jwks_min_refresh_interval_seconds,
+        timeout_seconds=settings.jwks_timeout_seconds,
+    )
+    metrics.register("jwks", cache.stats)
+    return cache
+
+
+async def close_jwks_client() -> None:
+    """Close the pooled JWKS client (application shutdown)."""
+    if _jwks_cache.cache_info().currsize:
+        await _jwks_cache().aclose()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature and claims were already verified.
+
+    Entries are keyed by a SHA-256 digest of the token (the token itself is never
+    stored) and expire at the token's ``exp``, capped at ``max_ttl_seconds`` so a
+    revoked user is not served from the cache forever.
+    """
+
+    def __init__(self, max_entries: int, max_ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def digest(token: str, scope: str = "") -> str:
+        return hashlib.sha256(f"{scope}:{token}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> AuthenticatedUser | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, user: AuthenticatedUser) -> None:
+        if self.max_entries <= 0:
+            return
+        expires = time.time() + self.max_ttl_seconds
+        exp = (user.raw_claims or {}).get("exp")
+        if isinstance(exp, (int, float)):
+            expires = min(expires, float(exp))
+        with self._lock:
+            self._entries[key] = (expires, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def invalidate_user(self, user_id: str) -> int:
+        with self._lock:
+            keys = [key for key, (_, user) in self._entries.items() if user.id == user_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+@lru_cache
+def get_token_cache() -> VerifiedTokenCache:
+    settings = get_settings()
+    cache = VerifiedTokenCache(settings.token_cache_size, settings.token_cache_max_ttl_seconds)
+    metrics.register("token_cache", cache.stats)
+    return cache
+
+
+def invalidate_token(token: str | None = None, *, user_id: str | None = None, settings: Settings | None = None) -> int:
+    """Drop one token, or every cached token of a user, so the next request is verified again."""
+    settings = settings or get_settings()
+    cache = get_token_cache()
+    removed = 0
+    if token is not None:
+        removed += cache.invalidate(cache.digest(token, settings.auth_mode.lower()))
+    if user_id is not None:
+        removed += cache.invalidate_user(user_id)
+    return removed
 
 
 async def verify_access_token(token: str, settings: Settings | None = None) -> AuthenticatedUser:
@@ -58,6 +279,19 @@ async def verify_access_token(token: str, settings: Settings | None = None) -> A
             raise AuthenticationError("Missing token")
         return AuthenticatedUser(id="00000000-0000-0000-0000-000000000000", email="mock@unitrack.local")
 
+    # Tokens are reused for days; skip decoding and signature checks for ones already verified
+    cache = get_token_cache()
+    key = cache.digest(token, settings.auth_mode.lower())
+    user = cache.get(key)
+    if user is not None:
+        return user
+
+    user = await _verify_token(token, settings)
+    cache.set(key, user)
+    return user
+
+
+async def _verify_token(token: str, settings: Settings) -> AuthenticatedUser:
     # Internal JWT verification (HS256 by default)
     if settings.is_internal_jwt:
         try:
@@ -76,12 +310,9 @@ async def verify_access_token(token: str, settings: Settings | None = None) -> A
         raise AuthenticationError("JWKS URL not configured")
 
     try:
-        cache = _jwks_cache()
-        jwks = await cache.get_keys(settings.supabase_jwks_url)
         audience = settings.supabase_audience
         unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-        key = next((k for k in jwks["keys"] if k["kid"] == kid), None)
+        key = await _jwks_cache().get_key(str(settings.supabase_jwks_url), unverified_header.get("kid"))
         if key is None:
             raise AuthenticationError("Signing key not found")
 
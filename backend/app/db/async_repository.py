@@ -0,0 +1,114 @@
+"""
+Async counterparts of ``app.db.repository`` for request handlers running on ``AsyncSession``.
+
+Queries are shared with the sync repository and awaited here; writes that need the
+sync unit-of-work logic (savepoints, bulk inserts) run it through ``AsyncSession.run_sync``,
+which still goes through the async driver.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models, repository
+from app.db.repository import RequestContext
+
+
+async def load_request_context(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    email: str | None = None,
+    course_code: str | None = None,
+) -> RequestContext:
+    """See ``repository.load_request_context``."""
+    user_uuid = uuid.UUID(user_id)
+    if repository.identities_cached(user_uuid, course_code):
+        return RequestContext(user_id, await get_student_profile(session, user_id=user_id), course_code)
+
+    result = await session.execute(repository.request_context_stmt(user_uuid, course_code))
+    found_user, found_course, profile = result.one()
+    missing = repository.missing_identities(user_uuid, email, course_code, found_user, found_course)
+    if missing:
+        session.add_all(missing)
+        await session.flush()
+    return RequestContext(user_id, profile, course_code)
+
+
+async def get_student_profile(session: AsyncSession, *, user_id: str) -> models.StudentProfileModel | None:
+    """See ``repository.get_student_profile``."""
+    return (await session.execute(repository.profile_stmt(user_id))).scalar_one_or_none()
+
+
+async def create_student_profile(
+    session: AsyncSession, *, user_id: str, profile_data: dict
+) -> models.StudentProfileModel:
+    """See ``repository.create_student_profile``."""
+    profile = models.StudentProfileModel(user_id=uuid.UUID(user_id), profile_data=profile_data)
+    session.add(profile)
+    await session.flush()
+    # Timestamps are SQL defaults; load them now since attributes cannot lazy-load in async code
+    await session.refresh(profile)
+    return profile
+
+
+async def update_student_profile(
+    session: AsyncSession, *, user_id: str, profile_data: dict
+) -> models.StudentProfileModel:
+    """See ``repository.update_student_profile``."""
+    profile = (await session.execute(repository.profile_stmt(user_id))).scalar_one()
+    profile.profile_data = profile_data
+    await session.flush()
+    await session.refresh(profile)
+    return profile
+
+
+async def get_or_create_courses(session: AsyncSession, *, course_codes: list[str]) -> dict[str, models.Course]:
+    """See ``repository.get_or_create_courses``."""
+    stmt = select(models.Course).where(models.Course.cod_curso.in_(course_codes))
+    courses = {course.cod_curso: course for course in (await session.execute(stmt)).scalars().all()}
+
+    missing = [code for code in dict.fromkeys(course_codes) if code not in courses]
+    for code in missing:
+        course = models.Course(cod_curso=code, nombre=code)
+        session.add(course)
+        courses[code] = course
+    if missing:
+        await session.flush()
+    return courses
+
+
+async def create_inferences(session: AsyncSession, *, user_id: str, records: list[dict]) -> int:
+    """See ``repository.create_inferences``."""
+    return await session.run_sync(repository.create_inferences, user_id=user_id, records=records)
+
+
+async def list_user_inferences(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_payloads: bool = True,
+) -> tuple[list[Row], str | None]:
+    """See ``repository.list_user_inferences``."""
+    stmt = repository.history_page_stmt(
+        user_id=user_id, limit=limit, offset=offset, cursor=cursor, include_payloads=include_payloads
+    )
+    return repository.history_page(list((await session.execute(stmt)).all()), limit)
+
+
+async def count_user_inferences(session: AsyncSession, *, user_id: str, max_age_seconds: float = 0.0) -> int:
+    """See ``repository.count_user_inferences``."""
+    cached = repository.cached_history_total(user_id, max_age_seconds)
+    if cached is not None:
+        return cached
+    counted_at = time.monotonic()
+    total = (await session.execute(repository.history_total_stmt(user_id))).scalar_one()
+    repository.remember_history_total(user_id, counted_at, total)
+    return total
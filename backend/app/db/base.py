@@ -1,49 +1,183 @@
 from __future__ import annotations
 
+import threading
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Dict, Iterator
 
-from sqlalchemy import Engine, create_engine, event
+from sqlalchemy import URL, Engine, create_engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool, StaticPool
 
-from app.core.config import get_settings
+from app.core import metrics
+from app.core.config import Settings, get_settings
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def _create_engine() -> Engine:
-    settings = get_settings()
-    connect_args = {}
-    if settings.database_url.startswith("sqlite"):
-        connect_args["check_same_thread"] = False  # type: ignore[dict-item]
-        # Add timeout for database locks (30 seconds)
-        connect_args["timeout"] = 30  # type: ignore[dict-item]
-    return create_engine(
-        settings.database_url,
-        pool_pre_ping=True,
-        connect_args=connect_args,
-        # Use NullPool for SQLite to avoid connection pooling issues
-        poolclass=None if settings.database_url.startswith("sqlite") else None,
+class PoolStats:
+    """Checkout latency of an engine pool; kept outside the pool so it survives ``engine.dispose()``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def snapshot(self, pool: Pool, capacity: int | None) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "pool": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.wait_ms_total / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": self.wait_ms_max,
+        }
+        if isinstance(pool, QueuePool):
+            checked_out = pool.checkedout()
+            stats.update(
+                size=pool.size(),
+                checked_out=checked_out,
+                overflow=pool.overflow(),
+                utilization=checked_out / capacity if capacity else 0.0,
+            )
+        return stats
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection in ``stats``."""
+
+    stats: PoolStats
+
+    def connect(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.stats.record(1000.0 * (time.perf_counter() - started), timed_out=True)
+            raise
+        self.stats.record(1000.0 * (time.perf_counter() - started))
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    stats = PoolStats()
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+# Async drivers used when ASYNC_DATABASE_URL is not set, by backend of DATABASE_URL
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def to_async_url(database_url: str | URL) -> URL:
+    """The async-driver equivalent of a sync database URL."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'; set ASYNC_DATABASE_URL")
+    url = url.set(drivername=_ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in url.query:
+        # asyncpg spells libpq's sslmode as ssl
+        url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+    return url
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
     )
 
 
-engine = _create_engine()
+def _engine_options(
+    settings: Settings, url: URL, poolclass: type[Pool], pool_size: int, max_overflow: int
+) -> Dict[str, Any]:
+    connect_args: Dict[str, Any] = {}
+    if url.get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+        # Add timeout for database locks (30 seconds)
+        connect_args["timeout"] = 30
+
+    if _is_memory_sqlite(url):
+        # An in-memory database only exists inside its connection: share exactly one
+        return {"connect_args": connect_args, "poolclass": StaticPool}
+
+    # Connections are recycled before the server (or a proxy in front of it) drops them
+    # idle, instead of pinging on every checkout; pre-ping stays available as an opt-in.
+    # LIFO checkout keeps the hot connections busy so burst overflow ages out quickly
+    return {
+        "connect_args": connect_args,
+        "poolclass": poolclass,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": True,
+    }
+
+
+def _create_engine(settings: Settings, database_url: str | None = None) -> Engine:
+    url = make_url(database_url or settings.database_url)
+    options = _engine_options(settings, url, TimedQueuePool, settings.db_sync_pool_size, settings.db_sync_max_overflow)
+    return create_engine(url, **options)
+
+
+def _create_async_engine(settings: Settings, database_url: str | None = None) -> AsyncEngine:
+    url = make_url(database_url or settings.async_database_url or to_async_url(settings.database_url))
+    options = _engine_options(settings, url, TimedAsyncQueuePool, settings.db_pool_size, settings.db_max_overflow)
+    return create_async_engine(url, **options)
+
+
+def set_sqlite_pragma(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")  # 30 seconds
+    cursor.close()
+
+
+engine = _create_engine(get_settings())
+# Request handlers use the async engine so waiting on the database never blocks the event
+# loop; the sync engine stays for background threads, scripts and migrations
+async_engine = _create_async_engine(get_settings())
+
+_sync_capacity = get_settings().db_sync_pool_size + get_settings().db_sync_max_overflow
+_async_capacity = get_settings().db_pool_size + get_settings().db_max_overflow
+metrics.register("db_pool", lambda: TimedQueuePool.stats.snapshot(engine.pool, _sync_capacity))
+metrics.register("db_pool_async", lambda: TimedAsyncQueuePool.stats.snapshot(async_engine.pool, _async_capacity))
 
 # Enable SQLite Write-Ahead Logging (WAL) mode for better concurrency
-if get_settings().database_url.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_conn, connection_record):
-        cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA synchronous=NORMAL")
-        cursor.execute("PRAGMA busy_timeout=30000")  # 30 seconds
-        cursor.close()
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", set_sqlite_pragma)
 
 SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
 
 
+class AsyncBackedSession(Session):
+    """Sync session class behind ``AsyncSessionLocal``; session events for async sessions target it."""
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, expire_on_commit=False, class_=AsyncSession, sync_session_class=AsyncBackedSession
+)
+
+
 @contextmanager
 def session_scope() -> Iterator[Session]:
     session = SessionLocal()
@@ -0,0 +1,98 @@
+"""
+Compact encoding of inference history rows.
+
+Feature dicts are stored as a packed little-endian float32 array whose column names
+live once in ``feature_schemas``; label, score and estimated grade get typed columns.
+Whatever else the payloads carry (metadata, deltas, details, mode) stays in the JSON
+columns as a much smaller remainder.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+_FLOAT32 = np.dtype("<f4")
+# Output keys that move to typed columns; version already has its own column
+_TYPED_OUTPUT_KEYS = ("label", "score", "version")
+
+
+@dataclass(frozen=True)
+class EncodedRow:
+    feature_names: Tuple[str, ...] | None
+    features_blob: bytes | None
+    input_remainder: Dict[str, Any]
+    label: str | None
+    score: float | None
+    estimated_grade: float | None
+    output_remainder: Dict[str, Any]
+
+
+def schema_digest(names: Sequence[str]) -> str:
+    return hashlib.sha1(json.dumps(list(names)).encode("utf-8")).hexdigest()
+
+
+def pack_features(values: Sequence[float]) -> bytes:
+    return np.asarray(values, dtype=_FLOAT32).tobytes()
+
+
+def unpack_features(blob: bytes) -> list[float]:
+    # str() of a float32 is its shortest round-trip repr, so 14.3 comes back as 14.3
+    return [float(value) for value in np.frombuffer(blob, dtype=_FLOAT32).astype(str)]
+
+
+def _numeric_features(features: Any) -> bool:
+    return (
+        isinstance(features, dict)
+        and bool(features)
+        and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in features.values())
+    )
+
+
+def encode(input_payload: Dict[str, Any], output_payload: Dict[str, Any]) -> EncodedRow:
+    """Split one history row into its compact parts."""
+    input_remainder = dict(input_payload or {})
+    names = blob = None
+    features = input_remainder.get("features")
+    if _numeric_features(features):
+        names = tuple(sorted(features))
+        blob = pack_features([features[name] for name in names])
+        del input_remainder["features"]
+
+    output_remainder = {key: value for key, value in (output_payload or {}).items() if key not in _TYPED_OUTPUT_KEYS}
+    score = output_payload.get("score")
+    details = output_payload.get("details")
+    estimated_grade = details.get("estimated_grade") if isinstance(details, dict) else None
+    return EncodedRow(
+        feature_names=names,
+        features_blob=blob,
+        input_remainder=input_remainder,
+        label=output_payload.get("label"),
+        score=float(score) if score is not None else None,
+        estimated_grade=float(estimated_grade) if estimated_grade is not None else None,
+        output_remainder=output_remainder,
+    )
+
+
+def decode_input(remainder: Dict[str, Any] | None, names: Sequence[str] | None, blob: bytes | None) -> Dict[str, Any]:
+    payload = dict(remainder or {})
+    if names is not None and blob is not None:
+        payload["features"] = dict(zip(names, unpack_features(blob)))
+    return payload
+
+
+def decode_output(
+    remainder: Dict[str, Any] | None, label: str | None, score: float | None, version: str | None
+) -> Dict[str, Any]:
+    payload = dict(remainder or {})
+    if label is not None:
+        payload["label"] = label
+    if score is not None:
+        payload["score"] = score
+    if version is not None:
+        payload.setdefault("version", version)
+    return payload
@@ -0,0 +1,82 @@
+"""
+Identity cache: remembers for a short while which users and courses already exist in the database.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable
+
+from app.core import metrics
+from app.core.config import get_settings
+
+
+class IdentityCache:
+    """
+    Bounded, expiring set of ``(kind, key)`` pairs known to exist.
+
+    Only rows read back from the database are recorded, never rows created by the
+    current (not yet committed) transaction, so a rolled back request cannot leave a
+    stale entry behind.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, Hashable], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains(self, kind: str, key: Hashable) -> bool:
+        if self.max_entries <= 0:
+            return False
+        with self._lock:
+            expires = self._entries.get((kind, key))
+            if expires is None or expires <= time.monotonic():
+                self._entries.pop((kind, key), None)
+                self.misses += 1
+                return False
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            return True
+
+    def add(self, kind: str, key: Hashable) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(kind, key)] = time.monotonic() + self.ttl_seconds
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, kind: str, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop((kind, key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache
+def get_identity_cache() -> IdentityCache:
+    settings = get_settings()
+    cache = IdentityCache(settings.identity_cache_size, settings.identity_cache_ttl_seconds)
+    metrics.register("identity_cache", cache.stats)
+    return cache
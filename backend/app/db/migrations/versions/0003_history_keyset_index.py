@@ -0,0 +1,28 @@
+"""keyset pagination index for inference history
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[Sequence[str], None] = None
+depends_on: Union[Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (user_id, created_at, id) matches the history cursor exactly, including the id
+    # tie-breaker, and supersedes the (user_id, created_at) index
+    op.create_index("idx_inferences_user_created_id", "inferences", ["user_id", "created_at", "id"], unique=False)
+    op.drop_index("idx_inferences_user_id_created", table_name="inferences")
+
+
+def downgrade() -> None:
+    op.create_index("idx_inferences_user_id_created", "inferences", ["user_id", "created_at"], unique=False)
+    op.drop_index("idx_inferences_user_created_id", table_name="inferences")
@@ -0,0 +1,134 @@
+"""compact inference history: packed feature arrays and typed output columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import history_codec
+from app.db.models import GUID
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[Sequence[str], None] = None
+depends_on: Union[Sequence[str], None] = None
+
+_BATCH = 1000
+
+feature_schemas = sa.table(
+    "feature_schemas",
+    sa.column("id", sa.Integer),
+    sa.column("digest", sa.String),
+    sa.column("names", sa.JSON),
+)
+inferences = sa.table(
+    "inferences",
+    sa.column("id", GUID()),
+    sa.column("input", sa.JSON),
+    sa.column("output", sa.JSON),
+    sa.column("version", sa.String),
+    sa.column("feature_schema_id", sa.Integer),
+    sa.column("features_blob", sa.LargeBinary),
+    sa.column("label", sa.String),
+    sa.column("score", sa.Float),
+    sa.column("estimated_grade", sa.Float),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feature_schemas",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("digest", sa.String(length=40), nullable=False),
+        sa.Column("names", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("digest"),
+    )
+    with op.batch_alter_table("inferences", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("feature_schema_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("features_blob", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("label", sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column("score", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("estimated_grade", sa.Float(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_inferences_feature_schema_id", "feature_schemas", ["feature_schema_id"], ["id"]
+        )
+
+    # Re-encode existing rows in batches, keyed on id so each pass only sees unconverted rows
+    bind = op.get_bind()
+    schema_ids: dict[str, int] = {}
+    last_id = None
+    while True:
+        stmt = sa.select(inferences.c.id, inferences.c.input, inferences.c.output).order_by(inferences.c.id).limit(_BATCH)
+        if last_id is not None:
+            stmt = stmt.where(inferences.c.id > last_id)
+        rows = bind.execute(stmt).all()
+        if not rows:
+            break
+        for row in rows:
+            encoded = history_codec.encode(row.input or {}, row.output or {})
+            schema_id = None
+            if encoded.feature_names:
+                digest = history_codec.schema_digest(encoded.feature_names)
+                if digest not in schema_ids:
+                    bind.execute(feature_schemas.insert().values(digest=digest, names=list(encoded.feature_names)))
+                    schema_ids[digest] = bind.execute(
+                        sa.select(feature_schemas.c.id).where(feature_schemas.c.digest == digest)
+                    ).scalar_one()
+                schema_id = schema_ids[digest]
+            bind.execute(
+                inferences.update()
+                .where(inferences.c.id == row.id)
+                .values(
+                    input=encoded.input_remainder,
+                    output=encoded.output_remainder,
+                    feature_schema_id=schema_id,
+                    features_blob=encoded.features_blob,
+                    label=encoded.label,
+                    score=encoded.score,
+                    estimated_grade=encoded.estimated_grade,
+                )
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    names_by_id = {row.id: row.names for row in bind.execute(sa.select(feature_schemas.c.id, feature_schemas.c.names))}
+    rows = bind.execute(
+        sa.select(
+            inferences.c.id,
+            inferences.c.input,
+            inferences.c.output,
+            inferences.c.version,
+            inferences.c.feature_schema_id,
+            inferences.c.features_blob,
+            inferences.c.label,
+            inferences.c.score,
+        )
+    ).all()
+    for row in rows:
+        bind.execute(
+            inferences.update()
+            .where(inferences.c.id == row.id)
+            .values(
+                input=history_codec.decode_input(row.input, names_by_id.get(row.feature_schema_id), row.features_blob),
+                output=history_codec.decode_output(row.output, row.label, row.score, row.version),
+            )
+        )
+
+    with op.batch_alter_table("inferences", schema=None) as batch_op:
+        batch_op.drop_constraint("fk_inferences_feature_schema_id", type_="foreignkey")
+        batch_op.drop_column("estimated_grade")
+        batch_op.drop_column("score")
+        batch_op.drop_column("label")
+        batch_op.drop_column("features_blob")
+        batch_op.drop_column("feature_schema_id")
+    op.drop_table("feature_schemas")
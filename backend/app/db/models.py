@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, ForeignKey, String, func
+from sqlalchemy import JSON, Float, ForeignKey, Index, Integer, LargeBinary, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import CHAR, TypeDecorator
 
@@ -70,17 +70,38 @@ class Course(Base):
 
 class Inference(Base):
     __tablename__ = "inferences"
+    # Backs keyset pagination of a user's history on (created_at, id)
+    __table_args__ = (Index("idx_inferences_user_created_id", "user_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     cod_curso: Mapped[str] = mapped_column(String(length=32), ForeignKey("courses.cod_curso"), nullable=False)
+    # Payload remainders; features and the label/score/grade live in the compact columns below
+    # (see app.db.history_codec)
     input_payload: Mapped[dict[str, Any]] = mapped_column("input", JSON, nullable=False)
     output_payload: Mapped[dict[str, Any]] = mapped_column("output", JSON, nullable=False)
+    feature_schema_id: Mapped[int | None] = mapped_column(ForeignKey("feature_schemas.id"), nullable=True)
+    features_blob: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # Packed float32
+    label: Mapped[str | None] = mapped_column(String(length=32), nullable=True)
+    score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    estimated_grade: Mapped[float | None] = mapped_column(Float, nullable=True)
     version: Mapped[str] = mapped_column(String(length=32), nullable=False, default="v1")
     created_at: Mapped[datetime] = mapped_column(default=func.now())
 
     user: Mapped["User"] = relationship(back_populates="inferences")
     course: Mapped["Course"] = relationship(back_populates="inferences")
+    feature_schema: Mapped["FeatureSchema | None"] = relationship()
+
+
+class FeatureSchema(Base):
+    """Ordered feature names shared by every history row whose features were packed with them."""
+
+    __tablename__ = "feature_schemas"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    digest: Mapped[str] = mapped_column(String(length=40), nullable=False, unique=True)
+    names: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
 
 
 class StudentProfileModel(Base):
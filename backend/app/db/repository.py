@@ -1,14 +1,36 @@
 from __future__ import annotations
 
+import base64
+import threading
+import time
 import uuid
-from typing import Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Tuple
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import Row, Select, and_, func, insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.orm import Session
 
-from app.db import models
-from app.core.password import hash_password
+from app.db import history_codec, models
+from app.db.identity_cache import get_identity_cache
+from app.core.password import UNUSABLE_PASSWORD_HASH
+
+
+# Per-user history totals: user_id -> (counted at, total). Dropped whenever the user's history grows.
+_history_totals: Dict[str, tuple[float, int]] = {}
+_history_totals_lock = threading.Lock()
+# feature_schemas digest -> id; schema rows are immutable once committed
+_feature_schema_ids: Dict[str, int] = {}
+
+
+@dataclass
+class RequestContext:
+    """User, profile and course resolved for one request."""
+
+    user_id: str
+    profile: models.StudentProfileModel | None
+    course_code: str | None = None
 
 
 def get_or_create_user(session: Session, user_id: str, email: str | None = None) -> models.User:
@@ -19,15 +41,135 @@ def get_or_create_user(session: Session, user_id: str, email: str | None = None)
     except (NoResultFound, ValueError):
         pass
 
-    # Create a placeholder user. For external/mock auth flows, set a dummy password hash
-    # to satisfy NOT NULL constraints while ensuring it's not a usable credential.
-    dummy_hash = hash_password("external-auth-placeholder")
-    user = models.User(id=uuid.UUID(user_id), email=email or None, password_hash=dummy_hash)
+    return _create_placeholder_user(session, uuid.UUID(user_id), email)
+
+
+def _placeholder_user(user_id: uuid.UUID, email: str | None) -> models.User:
+    # Create a placeholder user. For external/mock auth flows, store a sentinel instead of
+    # hashing a dummy password: it satisfies NOT NULL, never verifies and skips bcrypt.
+    return models.User(id=user_id, email=email or None, password_hash=UNUSABLE_PASSWORD_HASH)
+
+
+def _create_placeholder_user(session: Session, user_id: uuid.UUID, email: str | None) -> models.User:
+    user = _placeholder_user(user_id, email)
     session.add(user)
     session.flush()
     return user
 
 
+def request_context_stmt(user_uuid: uuid.UUID, course_code: str | None) -> Select:
+    user_column = select(models.User.id).where(models.User.id == user_uuid).scalar_subquery()
+    course_column = (
+        select(models.Course.cod_curso).where(models.Course.cod_curso == course_code).scalar_subquery()
+        if course_code is not None
+        else literal(None)
+    )
+    # One-row anchor so the existence columns come back even when there is no profile
+    anchor = select(literal(1).label("one")).subquery()
+    return (
+        select(user_column.label("user_id"), course_column.label("cod_curso"), models.StudentProfileModel)
+        .select_from(anchor)
+        .outerjoin(models.StudentProfileModel, models.StudentProfileModel.user_id == user_uuid)
+    )
+
+
+def missing_identities(
+    user_uuid: uuid.UUID,
+    email: str | None,
+    course_code: str | None,
+    found_user: uuid.UUID | None,
+    found_course: str | None,
+) -> list[models.User | models.Course]:
+    """Rows to create for what the context query did not find; found ones go to the identity cache."""
+    identities = get_identity_cache()
+    missing: list[models.User | models.Course] = []
+    if found_user is None:
+        missing.append(_placeholder_user(user_uuid, email))
+    else:
+        identities.add("user", user_uuid)
+
+    if course_code is not None:
+        if found_course is None:
+            missing.append(models.Course(cod_curso=course_code, nombre=course_code))
+        else:
+            identities.add("course", course_code)
+    return missing
+
+
+def identities_cached(user_uuid: uuid.UUID, course_code: str | None) -> bool:
+    identities = get_identity_cache()
+    return identities.contains("user", user_uuid) and (
+        course_code is None or identities.contains("course", course_code)
+    )
+
+
+def load_request_context(
+    session: Session,
+    *,
+    user_id: str,
+    email: str | None = None,
+    course_code: str | None = None,
+) -> RequestContext:
+    """
+    Resolve the user, their profile and optionally a course with a single SELECT.
+
+    Missing user and course rows are created like ``get_or_create_user`` and
+    ``get_or_create_course`` do. Users and courses seen recently are taken from the
+    identity cache, which leaves only the profile lookup.
+    """
+    user_uuid = uuid.UUID(user_id)
+    if identities_cached(user_uuid, course_code):
+        return RequestContext(user_id, get_student_profile(session, user_id=user_id), course_code)
+
+    found_user, found_course, profile = session.execute(request_context_stmt(user_uuid, course_code)).one()
+    missing = missing_identities(user_uuid, email, course_code, found_user, found_course)
+    if missing:
+        session.add_all(missing)
+        session.flush()
+    return RequestContext(user_id, profile, course_code)
+
+
+def get_feature_schema_id(session: Session, names: tuple[str, ...]) -> int:
+    """Id of the ``feature_schemas`` row for ``names``, creating it on first use."""
+    digest = history_codec.schema_digest(names)
+    schema_id = _feature_schema_ids.get(digest)
+    if schema_id is not None:
+        return schema_id
+
+    stmt = select(models.FeatureSchema.id).where(models.FeatureSchema.digest == digest)
+    schema_id = session.execute(stmt).scalar_one_or_none()
+    if schema_id is not None:
+        # Only ids read back from the database are remembered, never ones from an uncommitted insert
+        _feature_schema_ids[digest] = schema_id
+        return schema_id
+
+    try:
+        with session.begin_nested():
+            schema = models.FeatureSchema(digest=digest, names=list(names))
+            session.add(schema)
+        return schema.id
+    except IntegrityError:
+        # Another worker registered the same schema concurrently
+        return session.execute(stmt).scalar_one()
+
+
+def _inference_row(session: Session, user_id: uuid.UUID, record: dict) -> dict:
+    encoded = history_codec.encode(record["input_payload"], record["output_payload"])
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "cod_curso": record["course_code"],
+        "input_payload": encoded.input_remainder,
+        "output_payload": encoded.output_remainder,
+        "feature_schema_id": get_feature_schema_id(session, encoded.feature_names) if encoded.feature_names else None,
+        "features_blob": encoded.features_blob,
+        "label": encoded.label,
+        "score": encoded.score,
+        "estimated_grade": encoded.estimated_grade,
+        "version": record["version"],
+    }
+
+
 def create_inference(
     session: Session,
     *,
@@ -37,18 +179,34 @@ def create_inference(
     output_payload: dict,
     version: str,
 ) -> models.Inference:
-    inference = models.Inference(
-        user_id=uuid.UUID(user_id),
-        cod_curso=course_code,
-        input_payload=input_payload,
-        output_payload=output_payload,
-        version=version,
-    )
+    record = {
+        "course_code": course_code,
+        "input_payload": input_payload,
+        "output_payload": output_payload,
+        "version": version,
+    }
+    inference = models.Inference(**_inference_row(session, uuid.UUID(user_id), record))
     session.add(inference)
     session.flush()
+    _forget_history_total(user_id)
     return inference
 
 
+def create_inferences(session: Session, *, user_id: str, records: list[dict]) -> int:
+    """Bulk insert several inference rows for one user in a single executemany round trip.
+
+    Each record carries ``course_code``, ``input_payload``, ``output_payload`` and ``version``;
+    payloads are stored in the compact form of ``app.db.history_codec``.
+    """
+    if not records:
+        return 0
+    user_uuid = uuid.UUID(user_id)
+    rows = [_inference_row(session, user_uuid, record) for record in records]
+    session.execute(insert(models.Inference), rows)
+    _forget_history_total(user_id)
+    return len(rows)
+
+
 def get_or_create_course(
     session: Session,
     *,
@@ -69,19 +227,145 @@ def get_or_create_course(
     return course
 
 
-def list_user_inferences(session: Session, *, user_id: str, limit: int = 50, offset: int = 0) -> tuple[list[models.Inference], int]:
-    stmt = (
-        select(models.Inference)
-        .where(models.Inference.user_id == uuid.UUID(user_id))
-        .order_by(models.Inference.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+def get_or_create_courses(session: Session, *, course_codes: list[str]) -> dict[str, models.Course]:
+    """Resolve several courses with one SELECT, creating placeholders for unknown codes."""
+    stmt = select(models.Course).where(models.Course.cod_curso.in_(course_codes))
+    courses = {course.cod_curso: course for course in session.execute(stmt).scalars().all()}
+
+    missing = [code for code in dict.fromkeys(course_codes) if code not in courses]
+    for code in missing:
+        course = models.Course(cod_curso=code, nombre=code)
+        session.add(course)
+        courses[code] = course
+    if missing:
+        session.flush()
+    return courses
+
+
+def encode_history_cursor(created_at: datetime, inference_id: uuid.UUID) -> str:
+    """Opaque cursor pointing just after one history row."""
+    raw = f"{created_at.isoformat()}|{inference_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of ``encode_history_cursor``; raises ``ValueError`` for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, inference_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(inference_id)
+    except (ValueError, TypeError) as exc:
+        # Bad base64 or UTF-8, a missing "|", or an unparsable timestamp or id
+        raise ValueError("Invalid cursor") from exc
+
+
+def history_page_stmt(
+    *, user_id: str, limit: int, offset: int, cursor: str | None, include_payloads: bool
+) -> Select:
+    inference = models.Inference
+    columns = [
+        inference.id,
+        inference.cod_curso,
+        inference.version,
+        inference.created_at,
+        inference.label,
+        inference.score,
+        inference.estimated_grade,
+    ]
+    if include_payloads:
+        # Compact parts only; the API decodes them into payload dicts when it needs them
+        columns += [
+            inference.input_payload,
+            inference.output_payload,
+            inference.features_blob,
+            models.FeatureSchema.names.label("feature_names"),
+        ]
+
+    stmt = select(*columns).where(inference.user_id == uuid.UUID(user_id))
+    if include_payloads:
+        stmt = stmt.outerjoin(models.FeatureSchema, models.FeatureSchema.id == inference.feature_schema_id)
+    if cursor is not None:
+        created_at, inference_id = decode_history_cursor(cursor)
+        # Compare against the stored timestamp of the cursor row so the comparison does not
+        # depend on how the backend renders datetimes (SQLite keeps them as text)
+        anchor = select(inference.created_at).where(inference.id == inference_id).scalar_subquery()
+        created_at = func.coalesce(anchor, created_at)
+        stmt = stmt.where(
+            or_(
+                inference.created_at < created_at,
+                and_(inference.created_at == created_at, inference.id < inference_id),
+            )
+        )
+    elif offset:
+        stmt = stmt.offset(offset)
+    return stmt.order_by(inference.created_at.desc(), inference.id.desc()).limit(limit + 1)
+
+
+def history_page(rows: list[Row], limit: int) -> tuple[list[Row], str | None]:
+    # The statement fetches one extra row to tell whether another page follows
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_history_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, None
+
+
+def list_user_inferences(
+    session: Session,
+    *,
+    user_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_payloads: bool = True,
+) -> tuple[list[Row], str | None]:
+    """
+    One page of a user's history, newest first, and the cursor of the next page.
+
+    With ``cursor`` the page starts right after the row it points to (keyset
+    pagination on ``(created_at, id)``); ``offset`` is only used without one. Rows
+    expose ``id``, ``cod_curso``, ``version``, ``created_at``, ``label``, ``score`` and
+    ``estimated_grade``, plus the still encoded ``input_payload``, ``output_payload``,
+    ``features_blob`` and ``feature_names`` when ``include_payloads`` is set.
+    """
+    stmt = history_page_stmt(
+        user_id=user_id, limit=limit, offset=offset, cursor=cursor, include_payloads=include_payloads
     )
-    items = list(session.execute(stmt).scalars().all())
+    return history_page(list(session.execute(stmt).all()), limit)
+
+
+def cached_history_total(user_id: str, max_age_seconds: float) -> int | None:
+    if max_age_seconds <= 0:
+        return None
+    with _history_totals_lock:
+        cached = _history_totals.get(user_id)
+    if cached is not None and time.monotonic() - cached[0] < max_age_seconds:
+        return cached[1]
+    return None
+
 
-    total_stmt = select(func.count(models.Inference.id)).where(models.Inference.user_id == uuid.UUID(user_id))
-    total = session.execute(total_stmt).scalar_one()
-    return items, total
+def remember_history_total(user_id: str, counted_at: float, total: int) -> None:
+    with _history_totals_lock:
+        _history_totals[user_id] = (counted_at, total)
+
+
+def history_total_stmt(user_id: str) -> Select:
+    return select(func.count(models.Inference.id)).where(models.Inference.user_id == uuid.UUID(user_id))
+
+
+def count_user_inferences(session: Session, *, user_id: str, max_age_seconds: float = 0.0) -> int:
+    """Number of history rows of a user, reusing a count up to ``max_age_seconds`` old."""
+    cached = cached_history_total(user_id, max_age_seconds)
+    if cached is not None:
+        return cached
+    counted_at = time.monotonic()
+    total = session.execute(history_total_stmt(user_id)).scalar_one()
+    remember_history_total(user_id, counted_at, total)
+    return total
+
+
+def _forget_history_total(user_id: str) -> None:
+    with _history_totals_lock:
+        _history_totals.pop(user_id, None)
 
 
 def create_student_profile(session: Session, *, user_id: str, profile_data: dict) -> models.StudentProfileModel:
@@ -95,16 +379,18 @@ def create_student_profile(session: Session, *, user_id: str, profile_data: dict
     return profile
 
 
+def profile_stmt(user_id: str) -> Select:
+    return select(models.StudentProfileModel).where(models.StudentProfileModel.user_id == uuid.UUID(user_id))
+
+
 def get_student_profile(session: Session, *, user_id: str) -> models.StudentProfileModel | None:
     """Get student profile by user_id"""
-    stmt = select(models.StudentProfileModel).where(models.StudentProfileModel.user_id == uuid.UUID(user_id))
-    return session.execute(stmt).scalar_one_or_none()
+    return session.execute(profile_stmt(user_id)).scalar_one_or_none()
 
 
 def update_student_profile(session: Session, *, user_id: str, profile_data: dict) -> models.StudentProfileModel:
     """Update existing student profile"""
-    stmt = select(models.StudentProfileModel).where(models.StudentProfileModel.user_id == uuid.UUID(user_id))
-    profile = session.execute(stmt).scalar_one()
+    profile = session.execute(profile_stmt(user_id)).scalar_one()
     profile.profile_data = profile_data
     session.flush()
     return profile
@@ -31,6 +31,30 @@ class WhatIfRequest(PredictRequest):
     deltas: Dict[str, float] = Field(default_factory=dict)
 
 
+class SweepAxis(BaseModel):
+    key: str  # Simplified profile field (e.g. promedio_general) or raw model feature
+    values: list[float] | None = None  # Explicit grid; otherwise start/stop/steps
+    start: float | None = None
+    stop: float | None = None
+    steps: int = Field(default=11, ge=2, le=500)
+    relative: bool = False  # Values are deltas over the current value instead of absolute values
+
+
+class WhatIfSweepRequest(BaseModel):
+    course_code: str = Field(..., alias="cod_curso")
+    axes: list[SweepAxis] = Field(..., min_length=1, max_length=3)
+    features: Dict[str, float] = Field(default_factory=dict)
+    metadata: Dict[str, Any] | None = None
+
+    model_config = {"populate_by_name": True}
+
+
+class SweepPoint(BaseModel):
+    values: Dict[str, float]
+    score: float
+    estimated_grade: float | None = None
+
+
 class PredictionResult(BaseModel):
     course_code: str = Field(..., alias="cod_curso")
     prediction_label: str
@@ -43,24 +67,84 @@ class PredictionResult(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+class BatchPredictRequest(BaseModel):
+    course_codes: list[str] = Field(default_factory=list, alias="cod_cursos", max_length=200)
+    all_available: bool = False  # Score every course returned by /courses/available
+    max_next_semesters: int = Field(default=1, ge=0, le=3)
+    features: Dict[str, float] = Field(default_factory=dict)
+    metadata: Dict[str, Any] | None = None
+
+    model_config = {"populate_by_name": True}
+
+
+class BatchPredictionResult(BaseModel):
+    items: list[PredictionResult]
+    version: str
+
+
+class WhatIfSweepResult(BaseModel):
+    course_code: str = Field(..., alias="cod_curso")
+    version: str
+    axes: list[str]
+    base: SweepPoint
+    points: list[SweepPoint]
+
+    model_config = {"populate_by_name": True}
+
+
+class StudyPlanRequest(BaseModel):
+    max_credits: int = Field(default=24, ge=1, le=40)  # Credit cap per semester
+    max_semesters: int = Field(default=12, ge=1, le=20)
+    electives: int = Field(default=0, ge=0, le=20)  # Elective courses to include, best pass probability first
+    features: Dict[str, float] = Field(default_factory=dict)
+
+
+class PlannedCourse(BaseModel):
+    course_code: str = Field(..., alias="cod_curso")
+    nombre: str
+    creditos: int
+    score: float
+    estimated_grade: float | None = None
+    requirements: list[str] = Field(default_factory=list)  # Non-course prerequisites assumed met
+
+    model_config = {"populate_by_name": True}
+
+
+class PlannedSemester(BaseModel):
+    index: int
+    courses: list[PlannedCourse]
+    credits: int
+    expected_credits: float  # Credits weighted by pass probability
+
+
+class StudyPlanResult(BaseModel):
+    semesters: list[PlannedSemester]
+    unscheduled: list[str]  # Targets that do not fit in max_semesters / max_credits
+    critical_path: int  # Lower bound on the number of semesters left
+    expected_passes: float
+    version: str
+
+
 class InferenceRead(BaseModel):
     id: str
     course_code: str = Field(..., alias="cod_curso")
     prediction_label: str
     score: float
+    estimated_grade: float | None = None
     version: str
     created_at: datetime
-    input_payload: Dict[str, Any]
-    output_payload: Dict[str, Any]
+    input_payload: Dict[str, Any] | None = None  # Omitted with fields=summary
+    output_payload: Dict[str, Any] | None = None
 
     model_config = {"from_attributes": True, "populate_by_name": True}
 
 
 class HistoryResponse(BaseModel):
     items: list[InferenceRead]
-    total: int
+    total: int | None  # None with total=none
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 class CourseRead(BaseModel):
@@ -75,3 +159,24 @@ class CourseRead(BaseModel):
     nivel: int | None = None
 
     model_config = {"from_attributes": True}
+
+
+class CourseRef(BaseModel):
+    cod_curso: str
+    nombre: str
+    semestre: int | None = None
+
+
+class CourseDependencies(BaseModel):
+    cod_curso: str
+    direct: list[str]  # Immediate prerequisites / dependents
+    courses: list[CourseRef]  # Transitive, in catalog order
+    requirements: list[str] = Field(default_factory=list)  # Prerequisites that are not courses
+    curriculum_version: str
+
+
+class CriticalPath(BaseModel):
+    cod_curso: str
+    length: int  # Semesters needed to reach the course from scratch, itself included
+    path: list[CourseRef]  # Longest prerequisite chain ending at the course
+    curriculum_version: str
@@ -1,12 +1,76 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 import structlog
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.api.v1 import auth, health, history, predict, profile, whatif, courses
+from app.api.v1 import admin, auth, health, history, plan, predict, profile, whatif, courses
 from app.api.deps import get_app_settings
 from app.core.logging import configure_logging
+from app.core.security import close_jwks_client
+from app.db.base import async_engine
+from app.ml.course_index import CourseIndex
+from app.ml.model_loader import ModelLoader
+from app.ml.model_registry import get_model_registry, watch_models
+from app.services.executor import ExecutorSaturated, get_inference_executor, get_password_executor
+from app.services.curriculum_graph import CurriculumGraph, watch_curriculum
+from app.services.history_writer import get_history_writer
+from app.services.warmup import retry_warm_up, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Build the course encoding table and prerequisite graph once so requests only do in-memory reads
+    CourseIndex.refresh()
+    try:
+        CurriculumGraph.refresh()
+    except SQLAlchemyError:
+        structlog.get_logger(__name__).warning("curriculum_graph_unavailable", exc_info=True)
+    get_inference_executor()
+
+    # Load the model and warm it up before the first request; /health stays 503 until then
+    settings = get_app_settings()
+    app.state.ready = False
+    watchers = []
+    try:
+        app.state.warmup = await warm_up(settings.model_warmup_predictions)
+        app.state.ready = True
+    except Exception:
+        structlog.get_logger(__name__).exception("model_warmup_failed")
+        watchers.append(
+            asyncio.create_task(
+                retry_warm_up(app.state, settings.model_warmup_predictions, settings.model_warmup_retry_seconds)
+            )
+        )
+
+    if settings.model_watch_interval_seconds > 0:
+        watchers.append(
+            asyncio.create_task(
+                watch_models(get_model_registry(), settings.model_watch_interval_seconds, ModelLoader.notify_reloaded)
+            )
+        )
+    if settings.curriculum_refresh_interval_seconds > 0:
+        watchers.append(asyncio.create_task(watch_curriculum(settings.curriculum_refresh_interval_seconds)))
+    get_history_writer().start()
+    yield
+    # Persist queued history before the pools go away
+    await get_history_writer().drain()
+    for watcher in watchers:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+    await close_jwks_client()
+    # Async connections belong to this event loop
+    await async_engine.dispose()
+    for get_executor in (get_inference_executor, get_password_executor):
+        get_executor().shutdown()
+        get_executor.cache_clear()
 
 
 def create_app() -> FastAPI:
@@ -18,6 +82,7 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         version=settings.model_version,
         openapi_url=f"{settings.api_prefix}/openapi.json",
+        lifespan=lifespan,
     )
 
     # Configure CORS to allow frontend requests
@@ -42,6 +107,14 @@ def create_app() -> FastAPI:
         expose_headers=["*"],
     )
 
+    @app.exception_handler(ExecutorSaturated)
+    async def executor_saturated_handler(request: Request, exc: ExecutorSaturated) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
     api_router = APIRouter()
     api_router.include_router(health.router, tags=["health"])
     api_router.include_router(auth.router, tags=["auth"])
@@ -50,6 +123,8 @@ def create_app() -> FastAPI:
     api_router.include_router(whatif.router, tags=["prediction"])
     api_router.include_router(history.router, tags=["history"])
     api_router.include_router(courses.router, tags=["courses"])
+    api_router.include_router(plan.router, tags=["planning"])
+    api_router.include_router(admin.router, tags=["admin"])
 
     app.include_router(api_router, prefix=settings.api_prefix)
 
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import csv
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Sequence
+
+import numpy as np
+import structlog
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Columns that depend on the course rather than on the student
+COURSE_FEATURES: tuple[str, ...] = (
+    "COD_CURSO",
+    "CREDITOS",
+    "TIPO_CURSO",
+    "HRS_CURSO",
+    "CLUSTER_CURSO",
+    "NIVEL_CURSO",
+    "CODIGO_y",
+    "CURSO",
+)
+
+# Course cluster mapping (simplified - based on course code prefix)
+CLUSTER_MAP: Dict[str, int] = {
+    "CS1": 1,  # Discrete Math & Theory
+    "CS2": 7,  # Advanced Programming
+    "CS3": 2,  # Systems & Engineering
+    "FG": 3,   # General Education
+    "MA": 5,   # Mathematics
+    "CB": 5,   # Basic Sciences
+    "ET": 2,   # Engineering
+}
+
+TIPO_CURSO_MAP: Dict[str, int] = {"O": 0, "EH": 1, "EP": 2}
+
+# Defaults for courses that are not part of the curriculum
+DEFAULT_CREDITOS = 3.0
+DEFAULT_HORAS = 4.0
+DEFAULT_NIVEL = 2.0
+
+
+def course_cluster(course_code: str) -> int:
+    # Two-character prefix, as in training: the CS1/CS2/CS3 entries never match and CS courses
+    # get cluster 0. Changing this changes model inputs, so it needs a retrained model
+    prefix = course_code[:2] if len(course_code) >= 2 else "CS"
+    return CLUSTER_MAP.get(prefix, 0)
+
+
+def course_level(course_code: str) -> int | None:
+    """Level encoded in the course code, e.g. ``CS2H1`` -> 2, ``MA100`` -> 1."""
+    for char in course_code:
+        if char.isdigit():
+            return int(char)
+    return None
+
+
+def stable_code(value: str, modulo: int) -> int:
+    """Process-independent replacement for ``hash(value) % modulo``."""
+    return zlib.crc32(value.encode("utf-8")) % modulo
+
+
+class CourseIndex:
+    """
+    Array-backed encoding table for curriculum courses.
+
+    Label-encoded ids come from the sorted curriculum catalog, so every worker
+    built from the same catalog produces identical feature values. Rows are laid
+    out in ``COURSE_FEATURES`` order and looked up with one dict probe per code.
+    """
+
+    _lock = threading.Lock()
+    _current: "CourseIndex | None" = None
+
+    def __init__(self, records: Iterable[Dict[str, Any]], catalog_codes: Iterable[str]) -> None:
+        catalog = sorted({code for code in catalog_codes})
+        code_ids = {code: idx for idx, code in enumerate(catalog)}
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            merged.setdefault(record["cod_curso"], {}).update(
+                {key: value for key, value in record.items() if value is not None}
+            )
+        catalog_names = {str(record.get("nombre", code)).upper() for code, record in merged.items() if code in code_ids}
+        name_ids = {name: idx for idx, name in enumerate(sorted(catalog_names))}
+
+        self.codes: tuple[str, ...] = tuple(sorted(merged))
+        self._position: Dict[str, int] = {code: idx for idx, code in enumerate(self.codes)}
+        self.table = np.empty((len(self.codes), len(COURSE_FEATURES)), dtype=np.float64)
+        for idx, code in enumerate(self.codes):
+            record = merged[code]
+            if code in code_ids:
+                name_id = name_ids[str(record.get("nombre", code)).upper()]
+                self.table[idx] = self._encode(code, record, code_ids[code], name_id)
+            else:
+                self.table[idx] = self._encode(code, record)
+        self.table.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, course_code: str) -> bool:
+        return course_code in self._position
+
+    @staticmethod
+    def _encode(
+        code: str, record: Dict[str, Any], code_id: int | None = None, name_id: int | None = None
+    ) -> tuple[float, ...]:
+        """Course columns for one course; codes outside the catalog get digest-based ids."""
+        return (
+            float(code_id if code_id is not None else stable_code(code, 1000)),
+            float(record.get("creditos") or DEFAULT_CREDITOS),
+            float(TIPO_CURSO_MAP.get(str(record.get("tipo") or "O").upper(), 0)),
+            float(record.get("horas") or DEFAULT_HORAS),
+            float(course_cluster(code)),
+            float(record.get("nivel") or course_level(code) or DEFAULT_NIVEL),
+            float(code_id if code_id is not None else stable_code(code, 100)),
+            float(name_id if name_id is not None else stable_code(code, 500)),
+        )
+
+    def rows(self, course_codes: Sequence[str]) -> np.ndarray:
+        """Gather course columns for several codes into an ``(n, len(COURSE_FEATURES))`` array."""
+        positions = [self._position.get(code, -1) for code in course_codes]
+        if all(pos >= 0 for pos in positions):
+            return self.table[positions]
+        out = np.empty((len(course_codes), len(COURSE_FEATURES)), dtype=np.float64)
+        for idx, (code, pos) in enumerate(zip(course_codes, positions)):
+            # Codes outside the index come from clients; encode them on the fly rather than
+            # remembering them, which would let any caller grow this object without bound
+            out[idx] = self.table[pos] if pos >= 0 else self._encode(code, {})
+        return out
+
+    @staticmethod
+    def _read_catalog(path: Path) -> list[Dict[str, Any]]:
+        roman_to_int = {
+            "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6,
+            "VII": 7, "VIII": 8, "IX": 9, "X": 10, "XI": 11, "XII": 12,
+        }
+        records: list[Dict[str, Any]] = []
+        with path.open("r", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                records.append(
+                    {
+                        "cod_curso": row["CODIGO"].strip(),
+                        "nombre": row["CURSO"].strip(),
+                        "tipo": row["TIPO"].strip() or None,
+                        "horas": int(row["HORAS"]) if row["HORAS"] else None,
+                        "creditos": int(row["CREDITOS"]) if row["CREDITOS"] else None,
+                        "semestre": roman_to_int.get(row["SEM"].strip()),
+                    }
+                )
+        return records
+
+    @staticmethod
+    def _read_courses_table() -> list[Dict[str, Any]]:
+        from app.db.base import SessionLocal
+        from app.db.models import Course
+
+        stmt = select(
+            Course.cod_curso, Course.nombre, Course.tipo, Course.horas, Course.creditos, Course.semestre, Course.nivel
+        )
+        with SessionLocal() as session:
+            return [dict(row._mapping) for row in session.execute(stmt)]
+
+    @classmethod
+    def build(cls) -> "CourseIndex":
+        """Build an index from the curriculum CSV overlaid with the ``courses`` table."""
+        settings = get_settings()
+        catalog: list[Dict[str, Any]] = []
+        catalog_path = Path(settings.curriculum_path)
+        if catalog_path.exists():
+            catalog = cls._read_catalog(catalog_path)
+        else:
+            logger.warning("curriculum_file_missing", path=str(catalog_path))
+
+        try:
+            db_records = cls._read_courses_table()
+        except SQLAlchemyError:
+            logger.warning("course_index_db_unavailable")
+            db_records = []
+
+        catalog_codes = [record["cod_curso"] for record in catalog]
+        if not catalog_codes:
+            # Without the CSV, fall back to the curated rows of the courses table
+            catalog_codes = [record["cod_curso"] for record in db_records if record.get("semestre")]
+        return cls(catalog + db_records, catalog_codes)
+
+    @classmethod
+    def refresh(cls) -> "CourseIndex":
+        index = cls.build()
+        with cls._lock:
+            cls._current = index
+        logger.info("course_index_built", courses=len(index))
+        return index
+
+    @classmethod
+    def current(cls) -> "CourseIndex":
+        index = cls._current
+        if index is not None:
+            return index
+        return cls.refresh()
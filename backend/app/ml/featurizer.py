@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Sequence
 
 import numpy as np
 from fastapi import HTTPException, status
@@ -27,3 +27,18 @@ def to_feature_vector(features: Dict[str, float], expected_order: Iterable[str]
         ordered_values = [float(features[key]) for key in ordered_keys]
 
     return np.array([ordered_values], dtype=float)
+
+
+def to_feature_matrix(rows: Sequence[Dict[str, float]], expected_order: Iterable[str] | None = None) -> np.ndarray:
+    """Stack several feature dicts into one 2-D matrix using a shared column order."""
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="features payload is empty")
+
+    order: List[str] = list(expected_order) if expected_order else sorted(rows[0].keys())
+    missing = {key for row in rows for key in order if key not in row}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Missing feature(s): {', '.join(sorted(missing))}",
+        )
+    return np.array([[float(row[key]) for key in order] for row in rows], dtype=float)
@@ -1,15 +1,9 @@
 from __future__ import annotations
 
-import threading
-from pathlib import Path
-from typing import Any
-
-import joblib
-import structlog
+from typing import Any, Callable
 
 from app.core.config import get_settings
-
-logger = structlog.get_logger(__name__)
+from app.ml.model_registry import ModelEntry, get_model_registry
 
 
 class ModelNotAvailable(Exception):
@@ -26,21 +20,19 @@ class _MockModel:
     def predict_proba(self, X):
         import numpy as np
 
-        # Generate pseudo-random but deterministic predictions based on input
-        # This ensures same input always gives same prediction
-        np.random.seed(42)
-
-        # Use feature values to influence the prediction
+        # Generate pseudo-random but deterministic predictions based on input.
+        # Each row is scored on its own so that batched and single-row calls agree.
+        X = np.asarray(X, dtype=float)
         if X.shape[1] > 0:
-            # Use sum of features normalized to create a "score"
+            # Use the sum of features to create a "score" in [0, 1)
             feature_sum = np.sum(X, axis=1)
-            # Normalize to 0-1 range and add some randomness
-            normalized = (feature_sum - np.min(feature_sum)) / (np.max(feature_sum) - np.min(feature_sum) + 1e-8)
-            # Add noise and clip to [0.2, 0.9] range for realistic predictions
-            pass_prob = np.clip(0.5 + normalized * 0.3 + np.random.randn(len(X)) * 0.1, 0.2, 0.9)
+            normalized = 0.5 + 0.5 * np.tanh(feature_sum / 1000.0)
+            # Deterministic per-row noise, clipped to [0.2, 0.9] for realistic predictions
+            noise = np.sin(feature_sum * 12.9898) * 0.1
+            pass_prob = np.clip(0.35 + normalized * 0.3 + noise, 0.2, 0.9)
         else:
             # Fallback for empty features
-            pass_prob = np.random.uniform(0.4, 0.8, size=len(X))
+            pass_prob = np.full(len(X), 0.6)
 
         fail_prob = 1 - pass_prob
         return np.column_stack([fail_prob, pass_prob])
@@ -53,39 +45,40 @@ class _MockModel:
 
 
 class ModelLoader:
-    _lock = threading.Lock()
-    _model: Any | None = None
-    _version: str | None = None
+    """Facade over the model registry for callers that only need the active model."""
+
+    _reload_listeners: list[Callable[[], None]] = []
 
     @classmethod
     def load(cls) -> Any:
-        with cls._lock:
-            if cls._model is not None:
-                return cls._model
-
-            settings = get_settings()
-            model_path = Path(settings.model_path)
-            if not model_path.exists():
-                logger.warning("model_file_missing", path=str(model_path))
-                cls._model = _MockModel()
-                cls._version = "mock"
-                return cls._model
-
-            logger.info("loading_model", path=str(model_path))
-            try:
-                cls._model = joblib.load(model_path)
-            except Exception:
-                logger.exception("model_load_failed", path=str(model_path))
-                cls._model = _MockModel()
-                cls._version = "mock"
-                return cls._model
-
-            cls._version = getattr(cls._model, "version", settings.model_version)
-            return cls._model
+        return cls.entry().model
+
+    @classmethod
+    def entry(cls) -> ModelEntry:
+        """Snapshot of the active model; keep it for the whole request so its version matches its scores."""
+        return get_model_registry().get()
+
+    @classmethod
+    def add_reload_listener(cls, listener: Callable[[], None]) -> None:
+        """Register a callback run after the model is reloaded (e.g. to drop cached predictions)."""
+        cls._reload_listeners.append(listener)
+
+    @classmethod
+    def reload(cls, name: str | None = None) -> Any:
+        """Load, warm and swap in ``name`` (the active model by default) and make it active."""
+        entry = get_model_registry().reload(name, activate=True)
+        cls.notify_reloaded()
+        return entry.model
+
+    @classmethod
+    def notify_reloaded(cls) -> None:
+        for listener in list(cls._reload_listeners):
+            listener()
 
     @classmethod
     def version(cls) -> str:
-        if cls._version:
-            return cls._version
+        entry = get_model_registry().peek()
+        if entry is not None:
+            return entry.version
         settings = get_settings()
         return settings.model_version
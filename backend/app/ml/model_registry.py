@@ -0,0 +1,281 @@
+"""
+Model registry: named models from the models directory, reloaded in the background and swapped atomically.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import joblib
+import numpy as np
+import structlog
+
+from app.core import metrics
+from app.core.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+# Rows scored when validating a freshly loaded model, before it serves traffic
+_WARMUP_ROWS = 4
+
+
+class ModelValidationError(Exception):
+    """Raised when a loaded artifact cannot score a feature matrix."""
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    """One loaded model; entries are immutable so in-flight callers keep a consistent snapshot."""
+
+    name: str
+    model: Any
+    version: str
+    path: str | None
+    mtime: float | None
+    loaded_at: float
+    load_ms: float
+    warmup_ms: float
+
+
+def validate_model(model: Any, n_features: int) -> float:
+    """Score a few zero rows with ``model`` and return the elapsed milliseconds."""
+    width = getattr(model, "n_features_in_", None) or n_features
+    rows = np.zeros((_WARMUP_ROWS, int(width)), dtype=np.float64)
+    started = time.perf_counter()
+    if hasattr(model, "predict_proba"):
+        output = np.asarray(model.predict_proba(rows), dtype=float)
+    elif hasattr(model, "predict"):
+        output = np.asarray(model.predict(rows), dtype=float)
+    else:
+        raise ModelValidationError(f"{type(model).__name__} has neither predict_proba nor predict")
+    elapsed = 1000.0 * (time.perf_counter() - started)
+
+    if len(output) != _WARMUP_ROWS:
+        raise ModelValidationError(f"Expected {_WARMUP_ROWS} predictions, got {len(output)}")
+    if not np.all(np.isfinite(output)):
+        raise ModelValidationError("Model returned non-finite predictions")
+    return elapsed
+
+
+class ModelRegistry:
+    """
+    Holds the models found in ``model_dir`` (``<name>.pkl``) and which one is active.
+
+    Loading, validation and warm-up happen outside the lock; only the final swap of
+    the entry is guarded, so requests keep scoring on the previous entry until the
+    new one is ready. Callers that already took an entry finish on it.
+    """
+
+    def __init__(
+        self,
+        model_dir: str | Path,
+        active: str,
+        active_path: str | Path | None = None,
+        default_version: str = "v1",
+        n_features: int = 1,
+        fallback: Callable[[], Any] | None = None,
+    ) -> None:
+        self.model_dir = Path(model_dir)
+        self.default_version = default_version
+        self.n_features = n_features
+        self.fallback = fallback
+        self._paths: Dict[str, Path] = {}
+        if active_path is not None:
+            self._paths[active] = Path(active_path)
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._entries: Dict[str, ModelEntry] = {}
+        self._active = active
+        self._configured = active
+        self.swaps = 0
+        self.failures = 0
+
+    @property
+    def active(self) -> str:
+        return self._active
+
+    def path_for(self, name: str) -> Path:
+        path = self._paths.get(name)
+        if path is not None:
+            return path
+        # Names come from admin requests, and loading a pickle runs code: stay inside model_dir
+        if not name or name in (".", "..") or "/" in name or "\\" in name or Path(name).name != name:
+            raise FileNotFoundError(f"Invalid model name: {name!r}")
+        return self.model_dir / f"{name}.pkl"
+
+    def available(self) -> List[str]:
+        names = {path.stem for path in self.model_dir.glob("*.pkl")} if self.model_dir.is_dir() else set()
+        names.update(self._entries)
+        names.update(name for name, path in self._paths.items() if path.exists())
+        return sorted(names)
+
+    def get(self, name: str | None = None) -> ModelEntry:
+        """Current entry for ``name`` (the active model by default), loading it on first use."""
+        name = name or self._active
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+        with self._load_lock(name):
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._build(name)
+                self._swap(entry)
+        return entry
+
+    def peek(self, name: str | None = None) -> ModelEntry | None:
+        """Current entry for ``name`` without loading it."""
+        return self._entries.get(name or self._active)
+
+    def reload(self, name: str | None = None, *, activate: bool = False) -> ModelEntry:
+        """
+        Load, validate and warm ``name`` from disk, then swap it in.
+
+        On failure the previous entry keeps serving and the error is raised.
+        With ``activate`` the reloaded model also becomes the active one.
+        """
+        name = name or self._active
+        with self._load_lock(name):
+            try:
+                entry = self._build(name, strict=True)
+            except Exception:
+                self.failures += 1
+                logger.exception("model_reload_failed", name=name, path=str(self.path_for(name)))
+                raise
+            self._swap(entry, activate=activate)
+        return entry
+
+    def changed(self) -> List[str]:
+        """Loaded models whose file was modified or (re)appeared since it was loaded."""
+        stale = []
+        for name, entry in list(self._entries.items()):
+            path = self.path_for(name)
+            if not path.exists():
+                continue
+            mtime = path.stat().st_mtime
+            if entry.mtime is None or mtime != entry.mtime:
+                stale.append(name)
+        return stale
+
+    def scan(self) -> List[str]:
+        """Reload every changed model; returns the names that were swapped."""
+        reloaded = []
+        for name in self.changed():
+            try:
+                self.reload(name)
+            except Exception:
+                continue
+            reloaded.append(name)
+        return reloaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "models": {
+                name: {
+                    "version": entry.version,
+                    "path": entry.path,
+                    "loaded_at": entry.loaded_at,
+                    "load_ms": entry.load_ms,
+                    "warmup_ms": entry.warmup_ms,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+    def _load_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    def _swap(self, entry: ModelEntry, activate: bool = False) -> None:
+        with self._lock:
+            previous = self._entries.get(entry.name)
+            self._entries[entry.name] = entry
+            if activate:
+                self._active = entry.name
+            self.swaps += 1
+        logger.info(
+            "model_swapped",
+            name=entry.name,
+            version=entry.version,
+            previous_version=previous.version if previous else None,
+            active=self._active,
+            load_ms=round(entry.load_ms, 2),
+            warmup_ms=round(entry.warmup_ms, 2),
+        )
+
+    def _build(self, name: str, strict: bool = False) -> ModelEntry:
+        path = self.path_for(name)
+        started = time.perf_counter()
+        try:
+            if not path.exists():
+                raise FileNotFoundError(str(path))
+            mtime = path.stat().st_mtime
+            digest = _file_digest(path)
+            model = joblib.load(path)
+            load_ms = 1000.0 * (time.perf_counter() - started)
+            warmup_ms = validate_model(model, self.n_features)
+        except Exception:
+            if strict or self.fallback is None:
+                raise
+            logger.warning("model_unavailable_using_fallback", name=name, path=str(path), exc_info=True)
+            model = self.fallback()
+            return ModelEntry(name, model, "mock", None, None, time.time(), 0.0, 0.0)
+
+        # Artifacts without an embedded version report the configured version for the
+        # startup model and their own name otherwise, suffixed with a digest of the file so
+        # a replaced artifact never shares history rows or cache keys with the previous one
+        version = getattr(model, "version", None)
+        if version is None:
+            base = self.default_version if name == self._configured else name
+            version = f"{base}+{digest[:8]}"
+        version = str(version)
+        return ModelEntry(name, model, version, str(path), mtime, time.time(), load_ms, warmup_ms)
+
+
+def _file_digest(path: Path) -> str:
+    sha = hashlib.sha1()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+async def watch_models(registry: ModelRegistry, interval: float, on_reload: Callable[[], None]) -> None:
+    """Poll the loaded model files every ``interval`` seconds and hot-swap the ones that changed."""
+    while True:
+        await asyncio.sleep(interval)
+        reloaded = await asyncio.to_thread(registry.scan)
+        if reloaded:
+            on_reload()
+
+
+@lru_cache
+def get_model_registry() -> ModelRegistry:
+    from app.ml.model_loader import _MockModel
+    from app.services.profile_mapper import FEATURE_NAMES
+
+    settings = get_settings()
+    if settings.model_name:
+        active, active_path = settings.model_name, None
+    else:
+        active_path = Path(settings.model_path)
+        active = active_path.stem
+    registry = ModelRegistry(
+        settings.model_dir,
+        active=active,
+        active_path=active_path,
+        default_version=settings.model_version,
+        n_features=len(FEATURE_NAMES),
+        fallback=_MockModel,
+    )
+    metrics.register("model_registry", registry.stats)
+    return registry
@@ -0,0 +1,114 @@
+"""
+Micro-batching: coalesces concurrent scoring requests into one vectorized model call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import numpy as np
+
+Runner = Callable[[np.ndarray], Awaitable[Sequence[Any]]]
+
+# Upper bounds of the batch-size histogram buckets
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class BatchStats:
+    """Achieved batch sizes, shared by every batcher in the process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self.max_batch_size = 0
+        self.histogram: Dict[str, int] = {f"<={bound}": 0 for bound in _SIZE_BUCKETS}
+        self.histogram[f">{_SIZE_BUCKETS[-1]}"] = 0
+
+    def record(self, rows: int, requests: int) -> None:
+        bucket = next((f"<={bound}" for bound in _SIZE_BUCKETS if rows <= bound), f">{_SIZE_BUCKETS[-1]}")
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.requests += requests
+            self.max_batch_size = max(self.max_batch_size, rows)
+            self.histogram[bucket] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "requests": self.requests,
+                "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_histogram": dict(self.histogram),
+            }
+
+
+class MicroBatcher:
+    """
+    Collects feature rows from concurrent coroutines and scores them together.
+
+    A batch is dispatched once ``max_batch_size`` rows are pending or ``max_wait_ms``
+    has passed since the first pending submission, whichever comes first. Rows of
+    different widths are scored in separate model calls.
+    """
+
+    def __init__(self, runner: Runner, max_batch_size: int, max_wait_ms: float, stats: BatchStats | None = None) -> None:
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = stats or BatchStats()
+        self._pending: List[tuple[np.ndarray, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, vectors: np.ndarray) -> List[Any]:
+        """Queue a 2-D feature matrix and wait for its per-row results."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((vectors, future))
+        self._pending_rows += len(vectors)
+
+        if self._pending_rows >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple[np.ndarray, asyncio.Future]]) -> None:
+        groups: Dict[int, List[tuple[np.ndarray, asyncio.Future]]] = {}
+        for vectors, future in batch:
+            groups.setdefault(vectors.shape[1], []).append((vectors, future))
+
+        for group in groups.values():
+            matrix = np.vstack([vectors for vectors, _ in group])
+            self.stats.record(len(matrix), len(group))
+            try:
+                results = await self.runner(matrix)
+            except Exception as exc:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            offset = 0
+            for vectors, future in group:
+                if not future.done():
+                    future.set_result(list(results[offset : offset + len(vectors)]))
+                offset += len(vectors)
@@ -0,0 +1,41 @@
+"""
+Course availability: resolves which curriculum courses a student can take next.
+"""
+
+from __future__ import annotations
+
+from app.db.models import StudentProfileModel
+from app.services.curriculum_graph import CurriculumCourse, CurriculumGraph, approved_sets
+
+
+def list_available_courses(
+    profile: StudentProfileModel | None,
+    max_next_semesters: int = 1,
+    graph: CurriculumGraph | None = None,
+) -> list[CurriculumCourse]:
+    """
+    Return the courses available to a student based on their profile.
+
+    Minimal viable logic:
+    - If the user has a profile, use `semestres_cursados` to allow courses up to next semester window.
+    - Only include courses whose prerequisites are all approved (by name in `cursos_aprobados`
+      or by code in `cursos_aprobados_codigos`), and that are not approved themselves.
+    - If no profile, return all courses without prerequisites as a fallback.
+
+    Works on the in-memory ``CurriculumGraph``; no query is issued.
+    """
+    graph = graph or CurriculumGraph.current()
+    profile_data = profile.profile_data if profile is not None else None
+
+    semestre_limit: int | None = None
+    if profile_data is not None:
+        try:
+            semestre_limit = int(profile_data.get("semestres_cursados", 0)) + max_next_semesters
+        except (TypeError, ValueError):
+            semestre_limit = None
+
+    # The window is not widened from the approved courses' semesters: the previous query-based
+    # version computed that limit after filtering, so it never took effect, and clients rely on it
+    approved_names, approved_codes = approved_sets(profile_data)
+    approved = graph.approved_mask(approved_names, approved_codes)
+    return graph.available(approved, semestre_limit)
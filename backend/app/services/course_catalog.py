@@ -0,0 +1,85 @@
+"""
+Course catalog: JSON bodies of the catalog endpoints, rendered once per curriculum version.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Iterable
+
+import structlog
+
+from app.db.schemas import CourseRead
+from app.services.curriculum_graph import CurriculumCourse, CurriculumGraph
+
+logger = structlog.get_logger(__name__)
+
+
+def _render(course: CurriculumCourse) -> bytes:
+    return CourseRead(
+        cod_curso=course.cod_curso,
+        nombre=course.nombre,
+        semestre=course.semestre,
+        tipo=course.tipo,
+        horas=course.horas,
+        creditos=course.creditos,
+        prerequisitos=list(course.prerequisitos),
+        familia=course.familia,
+        nivel=course.nivel,
+    ).model_dump_json().encode("utf-8")
+
+
+class CourseCatalog:
+    """
+    Serialized ``CourseRead`` of every course of one curriculum version.
+
+    The version is the content hash of the ``courses`` table (``CurriculumGraph.version``),
+    so it doubles as the strong ETag of the full catalog. Subsets such as the courses
+    available to a student are joined from the per-course fragments, never re-serialized.
+    """
+
+    _lock = threading.Lock()
+    _current: "CourseCatalog | None" = None
+
+    def __init__(self, graph: CurriculumGraph) -> None:
+        self.graph = graph
+        self.version = graph.version
+        self.fragments: tuple[bytes, ...] = tuple(_render(course) for course in graph.courses)
+        self.body = b"[" + b",".join(self.fragments) + b"]"
+        self.etag = f'"{self.version}"'
+
+    def subset(self, courses: Iterable[CurriculumCourse]) -> tuple[bytes, str]:
+        """Body and strong ETag of a list of courses of this version."""
+        nodes = [course.node for course in courses]
+        body = b"[" + b",".join(self.fragments[node] for node in nodes) + b"]"
+        digest = hashlib.sha1(",".join(map(str, nodes)).encode("ascii")).hexdigest()[:16]
+        return body, f'"{self.version[:24]}-{digest}"'
+
+    @classmethod
+    def for_graph(cls, graph: CurriculumGraph) -> "CourseCatalog":
+        """Catalog of ``graph``, rendered once per curriculum version."""
+        current = cls._current
+        if current is not None and current.version == graph.version:
+            return current
+        with cls._lock:
+            current = cls._current
+            if current is not None and current.version == graph.version:
+                return current
+            catalog = cls(graph)
+            cls._current = catalog
+        logger.info("course_catalog_rendered", courses=len(graph), bytes=len(catalog.body))
+        return catalog
+
+    @classmethod
+    def current(cls) -> "CourseCatalog":
+        return cls.for_graph(CurriculumGraph.current())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` check; weak comparison, as RFC 9110 prescribes for this header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
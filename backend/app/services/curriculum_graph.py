@@ -0,0 +1,237 @@
+"""
+Curriculum graph: the ``courses`` table as a prerequisite DAG over integer nodes with bitset masks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.ml.course_index import CourseIndex
+
+logger = structlog.get_logger(__name__)
+
+
+def normalize(value: Any) -> str:
+    """Lookup key for course names and codes: trimmed, single-spaced, upper case."""
+    return " ".join(str(value).split()).upper()
+
+
+@dataclass(frozen=True)
+class CurriculumCourse:
+    """One course of the curriculum; ``node`` is its bit in every mask of the graph."""
+
+    node: int
+    cod_curso: str
+    nombre: str
+    semestre: int | None
+    tipo: str | None
+    horas: int | None
+    creditos: int | None
+    prerequisitos: tuple[str, ...]
+    familia: str | None
+    nivel: int | None
+
+
+def iter_nodes(mask: int) -> Iterator[int]:
+    """Nodes set in a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _catalog_order(row: Mapping[str, Any]) -> tuple:
+    # Same order the catalog endpoints use: semester ascending with NULLs first, then code
+    return (row.get("semestre") is not None, row.get("semestre") or 0, row["cod_curso"])
+
+
+def content_hash(rows: Iterable[Mapping[str, Any]]) -> str:
+    """Digest of the course rows; changes whenever any course column changes."""
+    ordered = sorted((dict(row) for row in rows), key=lambda row: row["cod_curso"])
+    payload = json.dumps(ordered, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CurriculumGraph:
+    """
+    Prerequisite graph of the curriculum, built once per version of the ``courses`` table.
+
+    Courses are numbered in catalog order and a set of courses is a Python int with
+    one bit per node, so "are all prerequisites approved" is a single mask test.
+    Prerequisite names that match no course (typos, "100 CREDITOS APROBADOS") get
+    bits past the course nodes; as before they only count as met when the student
+    lists that exact name as approved.
+    """
+
+    _lock = threading.Lock()
+    _current: "CurriculumGraph | None" = None
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        rows = sorted(rows, key=_catalog_order)
+        self.version = content_hash(rows)
+        self.courses: tuple[CurriculumCourse, ...] = tuple(
+            CurriculumCourse(
+                node=node,
+                cod_curso=row["cod_curso"],
+                nombre=row.get("nombre") or row["cod_curso"],
+                semestre=row.get("semestre"),
+                tipo=row.get("tipo"),
+                horas=row.get("horas"),
+                creditos=row.get("creditos"),
+                prerequisitos=tuple(str(name) for name in row.get("prerequisitos") or ()),
+                familia=row.get("familia"),
+                nivel=row.get("nivel"),
+            )
+            for node, row in enumerate(rows)
+        )
+        self.codes: tuple[str, ...] = tuple(course.cod_curso for course in self.courses)
+        self._by_code: Dict[str, int] = {normalize(course.cod_curso): course.node for course in self.courses}
+        self._by_name: Dict[str, int] = {}
+        for course in self.courses:
+            self._by_name.setdefault(normalize(course.nombre), course.node)
+
+        self._requirements: Dict[str, int] = {}
+        masks: List[int] = []
+        for course in self.courses:
+            mask = 0
+            for name in course.prerequisitos:
+                mask |= 1 << self._prerequisite_node(normalize(name))
+            masks.append(mask)
+        self.prerequisite_masks: tuple[int, ...] = tuple(masks)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def _prerequisite_node(self, key: str) -> int:
+        node = self._by_name.get(key)
+        if node is None:
+            node = self._requirements.setdefault(key, len(self.courses) + len(self._requirements))
+        return node
+
+    def node(self, name_or_code: str) -> int | None:
+        """Node of a course given its code or name."""
+        key = normalize(name_or_code)
+        node = self._by_code.get(key)
+        return node if node is not None else self._by_name.get(key)
+
+    def requirement_names(self, mask: int) -> tuple[str, ...]:
+        """Prerequisites in ``mask`` that match no course."""
+        return tuple(name for name, node in self._requirements.items() if mask >> node & 1)
+
+    def approved_mask(self, names: Iterable[str] = (), codes: Iterable[str] = ()) -> int:
+        """Bitset of the approved courses (and unmatched requirements) of one student."""
+        mask = 0
+        for name in names:
+            key = normalize(name)
+            node = self._by_name.get(key, self._requirements.get(key))
+            if node is not None:
+                mask |= 1 << node
+        for code in codes:
+            node = self._by_code.get(normalize(code))
+            if node is not None:
+                mask |= 1 << node
+        return mask
+
+    def available(self, approved: int, semester_limit: int | None = None) -> List[CurriculumCourse]:
+        """Courses not yet approved whose prerequisites are all in ``approved``, in catalog order."""
+        return [
+            course
+            for course, prerequisites in zip(self.courses, self.prerequisite_masks)
+            if not prerequisites & ~approved
+            and not approved >> course.node & 1
+            and (semester_limit is None or course.semestre is None or course.semestre <= semester_limit)
+        ]
+
+    @staticmethod
+    def _read_courses_table() -> List[Dict[str, Any]]:
+        from app.db.base import SessionLocal
+        from app.db.models import Course
+
+        stmt = select(
+            Course.cod_curso,
+            Course.nombre,
+            Course.semestre,
+            Course.tipo,
+            Course.horas,
+            Course.creditos,
+            Course.prerequisitos,
+            Course.familia,
+            Course.nivel,
+        )
+        with SessionLocal() as session:
+            return [dict(row._mapping) for row in session.execute(stmt)]
+
+    @classmethod
+    def build(cls) -> "CurriculumGraph":
+        return cls(cls._read_courses_table())
+
+    @classmethod
+    def _install(cls, graph: "CurriculumGraph") -> "CurriculumGraph":
+        with cls._lock:
+            cls._current = graph
+        logger.info("curriculum_graph_built", courses=len(graph), version=graph.version[:12])
+        return graph
+
+    @classmethod
+    def refresh(cls) -> "CurriculumGraph":
+        return cls._install(cls.build())
+
+    @classmethod
+    def refresh_if_changed(cls) -> bool:
+        """Rebuild the graph when the ``courses`` table no longer matches it."""
+        graph = cls.build()
+        current = cls._current
+        if current is not None and current.version == graph.version:
+            return False
+        cls._install(graph)
+        return True
+
+    @classmethod
+    def current(cls) -> "CurriculumGraph":
+        graph = cls._current
+        if graph is not None:
+            return graph
+        return cls.refresh()
+
+    @classmethod
+    async def current_async(cls) -> "CurriculumGraph":
+        """``current`` for request handlers: a missing graph is built off the event loop."""
+        graph = cls._current
+        if graph is not None:
+            return graph
+        return await asyncio.to_thread(cls.current)
+
+
+async def watch_curriculum(interval: float) -> None:
+    """Poll the ``courses`` table every ``interval`` seconds; picks up ``load_curriculum.py`` runs."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changed = await asyncio.to_thread(CurriculumGraph.refresh_if_changed)
+        except SQLAlchemyError:
+            logger.warning("curriculum_refresh_failed", exc_info=True)
+            continue
+        if changed:
+            # Model features read course columns from the index, built from the same table
+            await asyncio.to_thread(CourseIndex.refresh)
+
+
+def approved_sets(profile_data: Mapping[str, Any] | None) -> tuple[set[str], set[str]]:
+    """Approved course names and codes declared in a simplified profile."""
+    if not isinstance(profile_data, Mapping):
+        return set(), set()
+    try:
+        names = {normalize(x) for x in (profile_data.get("cursos_aprobados", []) or [])}
+        codes = {normalize(x) for x in (profile_data.get("cursos_aprobados_codigos", []) or [])}
+    except TypeError:
+        return set(), set()
+    return names, codes
@@ -0,0 +1,166 @@
+"""
+Bounded worker pool that keeps CPU-bound inference off the asyncio event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+from app.core import metrics
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a bounded pool has no free slot for another task."""
+
+    def __init__(self, retry_after: int, name: str = "inference") -> None:
+        super().__init__(f"{name.capitalize()} capacity exhausted, retry later")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable[..., T], enqueued_at: float, args: tuple, kwargs: dict) -> Tuple[float, T]:
+    # Wall clock so the wait is comparable when the call runs in a child process
+    waited = time.time() - enqueued_at
+    return waited, fn(*args, **kwargs)
+
+
+class InferenceExecutor:
+    """
+    Thread or process pool with a bounded number of in-flight tasks.
+
+    At most ``max_workers`` tasks run at once and ``max_queue`` more may wait;
+    anything beyond that is rejected immediately with ``ExecutorSaturated``.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        retry_after: int = 1,
+        name: str = "inference",
+    ) -> None:
+        if kind not in {"thread", "process"}:
+            raise ValueError(f"Unsupported {name} executor: {kind}")
+        self.kind = kind
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pool: Executor = self._new_pool()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _new_pool(self) -> Executor:
+        if self.kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(self.retry_after, self.name)
+            self._in_flight += 1
+            self.submitted += 1
+
+        call = functools.partial(_timed_call, fn, time.time(), args, kwargs)
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is held until the job itself is done, not until the caller stops waiting:
+        # a cancelled request cannot cancel a running job, so it must keep counting
+        future.add_done_callback(self._release)
+        _, result = await asyncio.wrap_future(future)
+        return result
+
+    def _release(self, future: Future | None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future is None or future.cancelled() or future.exception() is not None:
+                return
+            waited = future.result()[0]
+            self.completed += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": 1000.0 * self._wait_total / self.completed if self.completed else 0.0,
+            "max_wait_ms": 1000.0 * self._wait_max,
+        }
+
+    def recycle(self) -> None:
+        """
+        Replace the worker processes, e.g. after a model swap: each child scores with the
+        copy of the registry it was started with. Tasks already submitted finish on the old
+        pool. Threads share the parent's registry, so a thread pool is kept as is.
+        """
+        if self.kind != "process":
+            return
+        with self._lock:
+            previous, self._pool = self._pool, self._new_pool()
+        previous.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache
+def get_inference_executor() -> InferenceExecutor:
+    settings = get_settings()
+    executor = InferenceExecutor(
+        kind=settings.inference_executor,
+        max_workers=settings.inference_workers or min(4, os.cpu_count() or 1),
+        max_queue=settings.inference_max_queue,
+        retry_after=settings.inference_retry_after_seconds,
+    )
+    if executor.kind == "process":
+        from app.ml.model_loader import ModelLoader
+
+        ModelLoader.add_reload_listener(executor.recycle)
+    metrics.register("inference_executor", executor.stats)
+    return executor
+
+
+@lru_cache
+def get_password_executor() -> InferenceExecutor:
+    """Small dedicated pool for bcrypt, so a login storm cannot take the inference workers."""
+    settings = get_settings()
+    executor = InferenceExecutor(
+        kind="thread",
+        max_workers=settings.password_hash_workers,
+        max_queue=settings.password_hash_max_queue,
+        retry_after=settings.inference_retry_after_seconds,
+        name="password",
+    )
+    metrics.register("password_executor", executor.stats)
+    return executor
@@ -0,0 +1,234 @@
+"""
+Write-behind for inference history: requests enqueue rows, a background task inserts them in bulk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.db import async_repository, repository
+from app.db.base import AsyncBackedSession, SessionLocal, session_scope
+
+logger = structlog.get_logger(__name__)
+
+# Session.info key holding {writer: rows} that wait for the request transaction to commit
+_PENDING_KEY = "pending_history"
+
+
+class HistoryWriter:
+    """
+    Bounded queue of inference rows flushed by one background task.
+
+    Rows are handed over only once the request transaction committed, so the user
+    and course rows they reference exist. The queue holds at most ``max_queue`` rows;
+    rows that do not fit are dropped and counted rather than slowing the request.
+    When the writer is not running (e.g. outside the application lifespan) rows are
+    inserted inline in the request session, as before.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval_ms: float) -> None:
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.max_delay_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = self._loop.create_task(self._run())
+
+    async def drain(self) -> None:
+        """Flush everything still queued and stop the background task."""
+        if not self.running:
+            return
+        assert self._queue is not None and self._task is not None
+        await asyncio.sleep(0)  # let hand-overs already scheduled on the loop land in the queue
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Rows handed over by commits that raced with the drain
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await asyncio.to_thread(self._flush, leftover)
+
+    def record(self, session: Session, *, user_id: str, records: List[Dict[str, Any]]) -> None:
+        """Persist history rows for ``user_id`` (same record format as ``repository.create_inferences``)."""
+        if not records:
+            return
+        if not self.running:
+            repository.create_inferences(session, user_id=user_id, records=records)
+            return
+        self._defer(session, user_id, records)
+
+    async def record_async(self, session: AsyncSession, *, user_id: str, records: List[Dict[str, Any]]) -> None:
+        """``record`` for request handlers on an ``AsyncSession``."""
+        if not records:
+            return
+        if not self.running:
+            await async_repository.create_inferences(session, user_id=user_id, records=records)
+            return
+        self._defer(session.sync_session, user_id, records)
+
+    def _defer(self, session: Session, user_id: str, records: List[Dict[str, Any]]) -> None:
+        pending = session.info.setdefault(_PENDING_KEY, {})
+        pending.setdefault(self, []).extend((user_id, record) for record in records)
+
+    def _enqueue(self, rows: List[tuple[str, Dict[str, Any]]]) -> None:
+        # Called from the session's after_commit hook, on the loop or on a worker thread
+        loop = self._loop
+        if loop is None or not self.running:
+            with self._lock:
+                self.dropped += len(rows)
+            return
+        loop.call_soon_threadsafe(self._put, time.monotonic(), rows)
+
+    def _put(self, enqueued_at: float, rows: List[tuple[str, Dict[str, Any]]]) -> None:
+        assert self._queue is not None
+        accepted = 0
+        for row in rows:
+            try:
+                self._queue.put_nowait((enqueued_at, row))
+            except asyncio.QueueFull:
+                break
+            accepted += 1
+        with self._lock:
+            self.enqueued += accepted
+            self.dropped += len(rows) - accepted
+        if accepted < len(rows):
+            logger.warning("history_rows_dropped", rows=len(rows) - accepted, queue_size=self.max_queue)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self._flush, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _flush(self, batch: List[tuple[float, tuple[str, Dict[str, Any]]]]) -> None:
+        by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for _, (user_id, record) in batch:
+            by_user[user_id].append(record)
+        failed = self._write(list(by_user.items()))
+
+        delay_ms = 1000.0 * (time.monotonic() - min(enqueued_at for enqueued_at, _ in batch))
+        with self._lock:
+            self.written += len(batch) - failed
+            self.failed += failed
+            self.flushes += 1
+            self.max_delay_ms = max(self.max_delay_ms, delay_ms)
+
+    def _write(self, groups: List[tuple[str, List[Dict[str, Any]]]]) -> int:
+        """
+        Insert ``groups`` (user id, records) in one transaction; returns the rows dropped.
+
+        A failed transaction is split in halves, by user and then by record, and retried,
+        so one bad row costs only itself rather than every other user's history.
+        """
+        try:
+            with session_scope() as session:
+                for user_id, records in groups:
+                    repository.create_inferences(session, user_id=user_id, records=records)
+            return 0
+        except Exception:
+            rows = sum(len(records) for _, records in groups)
+            if rows == 1:
+                logger.exception("history_row_failed", user_id=groups[0][0])
+                return 1
+            logger.warning("history_flush_retrying", rows=rows, users=len(groups))
+
+        if len(groups) > 1:
+            middle = len(groups) // 2
+            halves = [groups[:middle], groups[middle:]]
+        else:
+            user_id, records = groups[0]
+            middle = len(records) // 2
+            halves = [[(user_id, records[:middle])], [(user_id, records[middle:])]]
+        return sum(self._write(half) for half in halves)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "avg_batch_size": self.written / self.flushes if self.flushes else 0.0,
+            "max_delay_ms": self.max_delay_ms,
+        }
+
+
+def _hand_over_committed_history(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    for writer, rows in (pending or {}).items():
+        writer._enqueue(rows)
+
+
+def _discard_rolled_back_history(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+for _sessions in (SessionLocal, AsyncBackedSession):
+    event.listen(_sessions, "after_commit", _hand_over_committed_history)
+    event.listen(_sessions, "after_rollback", _discard_rolled_back_history)
+
+
+@lru_cache
+def get_history_writer() -> HistoryWriter:
+    settings = get_settings()
+    writer = HistoryWriter(
+        max_queue=settings.history_queue_size,
+        batch_size=settings.history_batch_size,
+        flush_interval_ms=settings.history_flush_interval_ms,
+    )
+    metrics.register("history_writer", writer.stats)
+    return writer
@@ -1,49 +1,148 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
+import asyncio
+import weakref
+from typing import Any, Dict, List, Sequence, Tuple
 
 import numpy as np
 
+from app.core import metrics
+from app.core.config import get_settings
 from app.ml.featurizer import to_feature_vector
 from app.ml.model_loader import ModelLoader
+from app.services.batcher import BatchStats, MicroBatcher
+from app.services.executor import get_inference_executor
+from app.services.prediction_cache import get_prediction_cache
+from app.services.profile_mapper import simplified_to_feature_matrix
+
+PredictionTuple = Tuple[str, float, Dict[str, Any], float | None]
+
+_batch_stats = BatchStats()
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MicroBatcher]" = weakref.WeakKeyDictionary()
+metrics.register("inference_batcher", _batch_stats.snapshot)
+
+
+async def _score_in_pool(vectors: np.ndarray) -> List[PredictionTuple]:
+    return await get_inference_executor().run(InferenceService.predict_batch, vectors)
+
+
+def _micro_batcher() -> MicroBatcher | None:
+    """Batcher bound to the running event loop, or ``None`` when batching is disabled."""
+    settings = get_settings()
+    if settings.inference_batch_max_size <= 1 or settings.inference_batch_max_wait_ms <= 0:
+        return None
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = MicroBatcher(
+            _score_in_pool,
+            max_batch_size=settings.inference_batch_max_size,
+            max_wait_ms=settings.inference_batch_max_wait_ms,
+            stats=_batch_stats,
+        )
+        _batchers[loop] = batcher
+    return batcher
 
 
 class InferenceService:
     pass_mark = 0.5
 
     @classmethod
-    def predict(cls, *, features: Dict[str, float]) -> Tuple[str, float, Dict[str, float], float | None]:
-        model = ModelLoader.load()
+    def predict(cls, *, features: Dict[str, float]) -> PredictionTuple:
         # Convert features dict to vector (sorted by key for consistency)
         vector = to_feature_vector(features, allow_empty=False)
-        proba, est_grade = cls._predict_proba_and_grade(model, vector)
-        score = float(proba[0][1])
+        return cls.predict_batch(vector)[0]
+
+    @classmethod
+    def predict_batch(cls, vectors: np.ndarray) -> List[PredictionTuple]:
+        """Score every row of a 2-D feature matrix with a single model call."""
+        entry = ModelLoader.entry()
+        proba, est_grades = cls._predict_proba_and_grade(entry.model, vectors)
+        grades = est_grades.tolist() if est_grades is not None else [None] * len(proba)
+        return [
+            cls._build_result(row, grade, entry.version)
+            for row, grade in zip(np.asarray(proba, dtype=float).tolist(), grades)
+        ]
+
+    @classmethod
+    def predict_arrays(cls, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray | None, str]:
+        """Pass probabilities, estimated grades (regressors only) and model version, without per-row objects."""
+        entry = ModelLoader.entry()
+        proba, est_grades = cls._predict_proba_and_grade(entry.model, vectors)
+        return np.asarray(proba, dtype=float)[:, 1], est_grades, entry.version
+
+    @classmethod
+    async def score(cls, vectors: np.ndarray) -> List[PredictionTuple]:
+        """Score a feature matrix off the event loop, coalescing with concurrent callers when enabled."""
+        batcher = _micro_batcher()
+        if batcher is None:
+            return await _score_in_pool(vectors)
+        return await batcher.submit(vectors)
+
+    @classmethod
+    async def predict_profile(
+        cls,
+        *,
+        user_id: str,
+        profile_data: dict,
+        revision: str,
+        course_codes: Sequence[str],
+    ) -> List[PredictionTuple]:
+        """Score a stored profile for several courses, reusing cached predictions where possible."""
+        model_version = ModelLoader.entry().version
+        cache = get_prediction_cache()
+
+        keys = [cache.key(user_id, revision, code, model_version) for code in course_codes]
+        results: List[PredictionTuple | None] = await cache.get_many(keys)
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            vectors = simplified_to_feature_matrix(profile_data, [course_codes[idx] for idx in missing])
+            fresh = []
+            for idx, result in zip(missing, await cls.score(vectors)):
+                results[idx] = result
+                # Key by the version that actually scored the row, in case a swap happened meanwhile
+                key = cache.key(user_id, revision, course_codes[idx], result[2]["model_version"])
+                fresh.append((key, user_id, result))
+            await cache.set_many(fresh)
+        return results  # type: ignore[return-value]
+
+    @classmethod
+    def _build_result(cls, row_proba: Sequence[float], est_grade: float | None, version: str) -> PredictionTuple:
+        score = float(row_proba[1])
         label = "Aprobar" if score >= cls.pass_mark else "Desaprobar"
-        details: Dict[str, float] = {"probabilities": {"fail": float(proba[0][0]), "pass": score}}
+        details: Dict[str, Any] = {
+            "probabilities": {"fail": float(row_proba[0]), "pass": score},
+            "model_version": version,
+        }
         if est_grade is not None:
-            details["estimated_grade"] = float(est_grade)
+            details["estimated_grade"] = est_grade
         return label, score, details, est_grade
 
     @staticmethod
-    def _predict_proba_and_grade(model, vector: np.ndarray) -> Tuple[np.ndarray, float | None]:
+    def _grade_sigmoid(model) -> Tuple[float, float]:
+        """Centre and scale of the grade-to-probability sigmoid; models may override the settings."""
+        settings = get_settings()
+        center = getattr(model, "grade_pass_center", None)
+        scale = getattr(model, "grade_pass_scale", None)
+        return (
+            float(center if center is not None else settings.grade_pass_center),
+            float(scale if scale is not None else settings.grade_pass_scale),
+        )
+
+    @classmethod
+    def _predict_proba_and_grade(cls, model, vector: np.ndarray) -> Tuple[np.ndarray, np.ndarray | None]:
         if hasattr(model, "predict_proba"):
             # Classifier - return probabilities directly
             return model.predict_proba(vector), None
 
         # Regressor - convert grade prediction (0-20) to pass/fail probability
         if hasattr(model, "predict"):
-            prediction = model.predict(vector)
-            proba = np.zeros((len(vector), 2), dtype=float)
-
-            for idx, grade in enumerate(prediction):
-                # Convert grade (0-20) to pass probability
-                # Passing grade is 10.5 (standard Peruvian university passing grade)
-                # Use sigmoid-like conversion for smooth probability transition
-                normalized = (grade - 10.5) / 5.0  # Scale around threshold
-                pass_prob = 1 / (1 + np.exp(-normalized))  # Sigmoid function
-                proba[idx, 1] = pass_prob  # Probability of passing
-                proba[idx, 0] = 1 - pass_prob  # Probability of failing
-
-            return proba, float(prediction[0]) if len(prediction) > 0 else None
+            grades = np.asarray(model.predict(vector), dtype=float).reshape(-1)
+            # Sigmoid around the passing grade (10.5 by default, the standard Peruvian
+            # university passing grade) for a smooth probability transition
+            center, scale = cls._grade_sigmoid(model)
+            with np.errstate(over="ignore"):
+                pass_prob = 1.0 / (1.0 + np.exp(-(grades - center) / scale))
+            return np.column_stack([1.0 - pass_prob, pass_prob]), grades
 
         raise RuntimeError("Model does not support prediction")
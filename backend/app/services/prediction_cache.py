@@ -0,0 +1,246 @@
+"""
+Prediction cache: memoizes model outputs per (user, profile revision, course, model version).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Protocol, Sequence, Tuple
+
+from app.core import metrics
+from app.core.config import get_settings
+
+PredictionTuple = Tuple[str, float, Dict[str, Any], float | None]
+
+
+def profile_revision(profile_data: dict, updated_at: Any = None) -> str:
+    """Digest identifying one revision of a student profile."""
+    payload = json.dumps(profile_data, sort_keys=True, default=str) + "|" + str(updated_at or "")
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> PredictionTuple | None: ...
+
+    def set(self, key: str, user_id: str, value: PredictionTuple) -> None: ...
+
+    def invalidate_user(self, user_id: str) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, str, PredictionTuple]]" = OrderedDict()
+        self._by_user: Dict[str, set[str]] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        _, user_id, _ = self._entries.pop(key)
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def get(self, key: str) -> PredictionTuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, user_id: str, value: PredictionTuple) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, user_id, value)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> int:
+        with self._lock:
+            keys = list(self._by_user.get(user_id, ()))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+
+class KeyValueClient(Protocol):
+    """Subset of the redis-py client API used by ``SharedCacheBackend``."""
+
+    def get(self, name: str) -> bytes | str | None: ...
+
+    def set(self, name: str, value: str, px: int | None = None) -> Any: ...
+
+
+class LocalKeyValueStore:
+    """In-process stand-in for a shared key-value store (dev and tests)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, tuple[float | None, str]] = {}
+
+    def get(self, name: str) -> str | None:
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                del self._data[name]
+                return None
+            return entry[1]
+
+    def set(self, name: str, value: str, px: int | None = None) -> bool:
+        with self._lock:
+            self._data[name] = (time.monotonic() + px / 1000.0 if px else None, value)
+        return True
+
+
+class SharedCacheBackend:
+    """
+    Cache stored in a key-value service shared by every worker (e.g. Redis).
+
+    Nothing is ever deleted: keys carry the profile revision and the model version, so
+    entries of an old profile or model can no longer be looked up and just expire.
+    Scanning the store on each profile update, or clearing it on one worker's model
+    reload, would cost a keyspace walk and drop entries other workers still serve.
+    """
+
+    def __init__(self, client: KeyValueClient, ttl_seconds: float, namespace: str = "unitrack:pred:") -> None:
+        self.client = client
+        # Milliseconds, at least 1: the store rejects a zero expiry
+        self.ttl_ms = max(1, int(ttl_seconds * 1000))
+        self.namespace = namespace
+
+    def get(self, key: str) -> PredictionTuple | None:
+        raw = self.client.get(self.namespace + key)
+        if raw is None:
+            return None
+        label, score, details, est_grade = json.loads(raw)
+        return label, score, details, est_grade
+
+    def set(self, key: str, user_id: str, value: PredictionTuple) -> None:
+        self.client.set(self.namespace + key, json.dumps(list(value)), px=self.ttl_ms)
+
+    def invalidate_user(self, user_id: str) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+class PredictionCache:
+    """Front for a cache backend that keeps hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(user_id: str, revision: str, course_code: str, model_version: str) -> str:
+        return f"{user_id}:{revision}:{course_code}:{model_version}"
+
+    def get(self, key: str) -> PredictionTuple | None:
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, user_id: str, value: PredictionTuple) -> None:
+        if self.enabled:
+            self.backend.set(key, user_id, value)
+
+    async def get_many(self, keys: Sequence[str]) -> List[PredictionTuple | None]:
+        """Look up several keys; a shared store is queried off the event loop, in one thread hop."""
+        if not self.enabled:
+            return [None] * len(keys)
+        return await self._run(lambda: [self.get(key) for key in keys])
+
+    async def set_many(self, items: Sequence[Tuple[str, str, PredictionTuple]]) -> None:
+        """Store several ``(key, user_id, value)`` entries, off the event loop for a shared store."""
+        if self.enabled and items:
+            await self._run(lambda: [self.set(key, user_id, value) for key, user_id, value in items])
+
+    async def _run(self, call: Callable[[], Any]) -> Any:
+        # The in-process LRU never blocks; a shared store is a network round trip per key
+        if isinstance(self.backend, MemoryCacheBackend):
+            return call()
+        return await asyncio.to_thread(call)
+
+    def invalidate_user(self, user_id: str) -> int:
+        return self.backend.invalidate_user(user_id)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            # Only in-process backends can count cheaply; counting a shared store means a full SCAN
+            "entries": len(self.backend) if isinstance(self.backend, MemoryCacheBackend) else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+def _build_backend() -> CacheBackend:
+    settings = get_settings()
+    url = settings.prediction_cache_url
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend(settings.prediction_cache_size, settings.prediction_cache_ttl_seconds)
+    if url.startswith("local://"):
+        return SharedCacheBackend(LocalKeyValueStore(), settings.prediction_cache_ttl_seconds)
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("PREDICTION_CACHE_URL uses redis but the 'redis' package is not installed") from exc
+        return SharedCacheBackend(redis.Redis.from_url(url), settings.prediction_cache_ttl_seconds)
+    raise ValueError(f"Unsupported PREDICTION_CACHE_URL: {url}")
+
+
+@lru_cache
+def get_prediction_cache() -> PredictionCache:
+    from app.ml.model_loader import ModelLoader
+
+    settings = get_settings()
+    cache = PredictionCache(_build_backend(), enabled=settings.prediction_cache_size > 0)
+    ModelLoader.add_reload_listener(cache.clear)
+    metrics.register("prediction_cache", cache.stats)
+    return cache
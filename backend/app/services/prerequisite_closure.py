@@ -0,0 +1,166 @@
+"""
+Prerequisite closure: transitive prerequisites, reverse dependencies ("unlocks") and
+critical-path lengths of every curriculum course, as bitsets over ``CurriculumGraph`` nodes.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import List, Sequence
+
+import structlog
+
+from app.services.curriculum_graph import CurriculumGraph, iter_nodes
+
+logger = structlog.get_logger(__name__)
+
+
+class PrerequisiteClosure:
+    """
+    Closure of one curriculum version.
+
+    ``requires[node]`` holds every prerequisite of a course, direct or not (unmatched
+    requirements included), ``unlocks[node]`` every course that needs it, and
+    ``depth[node]`` the number of courses on the longest prerequisite chain ending at it.
+    When the previous version has the same courses in the same order, only courses
+    whose prerequisites changed, or that depend on one that did, are recomputed.
+    """
+
+    _lock = threading.Lock()
+    _current: "PrerequisiteClosure | None" = None
+
+    def __init__(self, graph: CurriculumGraph, previous: "PrerequisiteClosure | None" = None) -> None:
+        self.graph = graph
+        self.version = graph.version
+        size = len(graph)
+        course_mask = (1 << size) - 1
+        masks = graph.prerequisite_masks
+        direct = [mask & course_mask for mask in masks]
+        order, cyclic = _topological_order(direct)
+        if cyclic:
+            logger.warning("curriculum_prerequisite_cycle", courses=[graph.courses[node].cod_curso for node in cyclic])
+
+        reuse = previous is not None and previous.graph.codes == graph.codes
+        if reuse:
+            requires = list(previous.requires)
+            unlocks = list(previous.unlocks)
+            depth = list(previous.depth)
+            via = list(previous.via)
+            old_masks = previous.graph.prerequisite_masks
+            dirty = 0
+            for node in order:
+                if masks[node] != old_masks[node] or direct[node] & dirty:
+                    dirty |= 1 << node
+            for node in cyclic:
+                dirty |= 1 << node
+        else:
+            requires = [0] * size
+            unlocks = [0] * size
+            depth = [0] * size
+            via: List[int | None] = [None] * size
+            dirty = course_mask
+        old_requires = list(requires)
+
+        for node in order:
+            if not dirty >> node & 1:
+                continue
+            closure = masks[node]
+            deepest = None
+            for prerequisite in iter_nodes(direct[node]):
+                closure |= requires[prerequisite]
+                if deepest is None or depth[prerequisite] > depth[deepest]:
+                    deepest = prerequisite
+            requires[node] = closure
+            depth[node] = 1 + (depth[deepest] if deepest is not None else 0)
+            via[node] = deepest
+        if cyclic:
+            self._close_cycles(cyclic, masks, direct, requires, depth, via)
+
+        # Reverse index, patched with what each recomputed course gained or lost
+        for node in iter_nodes(dirty):
+            before = old_requires[node] & course_mask
+            after = requires[node] & course_mask
+            for prerequisite in iter_nodes(before & ~after):
+                unlocks[prerequisite] &= ~(1 << node)
+            for prerequisite in iter_nodes(after & ~before):
+                unlocks[prerequisite] |= 1 << node
+
+        self.requires: tuple[int, ...] = tuple(requires)
+        self.unlocks: tuple[int, ...] = tuple(unlocks)
+        self.depth: tuple[int, ...] = tuple(depth)
+        self.via: tuple[int | None, ...] = tuple(via)
+        self.recomputed = bin(dirty).count("1")
+
+    @staticmethod
+    def _close_cycles(
+        cyclic: Sequence[int],
+        masks: Sequence[int],
+        direct: Sequence[int],
+        requires: List[int],
+        depth: List[int],
+        via: List[int | None],
+    ) -> None:
+        # Courses on a prerequisite cycle or after one: iterate to a fixed point; chains stop there
+        for node in cyclic:
+            requires[node] = masks[node]
+            depth[node], via[node] = 1, None
+        changed = True
+        while changed:
+            changed = False
+            for node in cyclic:
+                closure = requires[node]
+                for prerequisite in iter_nodes(direct[node]):
+                    closure |= requires[prerequisite]
+                if closure != requires[node]:
+                    requires[node] = closure
+                    changed = True
+
+    def critical_path(self, node: int) -> List[int]:
+        """Longest prerequisite chain ending at ``node``, first course first."""
+        path = []
+        current: int | None = node
+        while current is not None and current not in path:
+            path.append(current)
+            current = self.via[current]
+        return path[::-1]
+
+    @classmethod
+    def for_graph(cls, graph: CurriculumGraph) -> "PrerequisiteClosure":
+        """Closure of ``graph``, computed once per curriculum version."""
+        current = cls._current
+        if current is not None and current.version == graph.version:
+            return current
+        with cls._lock:
+            current = cls._current
+            if current is not None and current.version == graph.version:
+                return current
+            closure = cls(graph, previous=current)
+            cls._current = closure
+        logger.info("prerequisite_closure_built", version=graph.version[:12], recomputed=closure.recomputed)
+        return closure
+
+    @classmethod
+    def current(cls) -> "PrerequisiteClosure":
+        return cls.for_graph(CurriculumGraph.current())
+
+
+def _topological_order(direct: Sequence[int]) -> tuple[List[int], List[int]]:
+    """Kahn's algorithm over course prerequisites; returns the order and the nodes left on cycles."""
+    dependents: List[List[int]] = [[] for _ in direct]
+    pending = []
+    for node, mask in enumerate(direct):
+        prerequisites = list(iter_nodes(mask))
+        pending.append(len(prerequisites))
+        for prerequisite in prerequisites:
+            dependents[prerequisite].append(node)
+    queue = [node for node, count in enumerate(pending) if count == 0]
+    order = []
+    while queue:
+        node = queue.pop()
+        order.append(node)
+        for child in dependents[node]:
+            pending[child] -= 1
+            if pending[child] == 0:
+                queue.append(child)
+    placed = set(order)
+    return order, [node for node in range(len(direct)) if node not in placed]
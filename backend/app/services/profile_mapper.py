@@ -1,44 +1,107 @@
 """
 Profile Mapper: Converts simplified student profile to 41 features for ML model
+
+The mapper is columnar: profile-only columns are computed once per profile and
+broadcast over every requested course, while course columns are gathered from
+the precomputed ``CourseIndex`` table. Columns follow ``FEATURE_NAMES`` (sorted
+feature keys), the same order ``to_feature_vector`` uses for dict payloads.
 """
 
+from __future__ import annotations
+
 from datetime import datetime
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Sequence
+
+import numpy as np
+
+from app.ml.course_index import COURSE_FEATURES, CourseIndex
+
+FEATURE_NAMES: tuple[str, ...] = (
+    "ASIST_PROM_CLUSTER_HIST",
+    "ASIST_PROM_HIST",
+    "BECA_VIGENTE",
+    "CANT_RESERVAS",
+    "CLUSTER_CURSO",
+    "CODIGO_y",
+    "COD_CURSO",
+    "CREDITOS",
+    "CRED_APROB_CLUSTER_HIST",
+    "CRED_APROB_HIST",
+    "CURSO",
+    "ESTADO_CIVIL",
+    "ESTADO_PASADO",
+    "FAMILIA",
+    "FECHA_NACIMIENTO",
+    "HRS_CURSO",
+    "HRS_INASISTENCIA_ACUM_PASADO_y",
+    "NIVEL_CURSO",
+    "NOTA_MAX_CLUSTER_HIST",
+    "NOTA_MAX_HIST",
+    "NOTA_MEDIAN_CLUSTER_HIST",
+    "NOTA_MEDIAN_HIST",
+    "NOTA_MIN_CLUSTER_HIST",
+    "NOTA_MIN_HIST",
+    "NOTA_Q1_CLUSTER_HIST",
+    "NOTA_Q1_HIST",
+    "NOTA_Q3_CLUSTER_HIST",
+    "NOTA_Q3_HIST",
+    "PER_INGRESO_NUM",
+    "PER_MATRICULA_NUM",
+    "POBREZA_PRO",
+    "POBREZA_RES",
+    "PROM_POND_CLUSTER_HIST",
+    "PROM_POND_HIST",
+    "PTJE_INGRESO",
+    "SEM",
+    "SEM_CURSADOS",
+    "SEXO",
+    "TIPO_CICLO",
+    "TIPO_COLEGIO_COD",
+    "TIPO_CURSO",
+)
+FEATURE_INDEX: Dict[str, int] = {name: idx for idx, name in enumerate(FEATURE_NAMES)}
+
+COURSE_COLUMNS = np.array([FEATURE_INDEX[name] for name in COURSE_FEATURES], dtype=np.intp)
+
+# Map tipo_colegio to code
+TIPO_COLEGIO_MAP: Dict[str, str] = {
+    "Público": "1",
+    "Privado": "2",
+    "Público - Provincial": "3",
+    "Privado - Religioso": "4",
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_birth_date(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
 
 
-def simplified_to_full_features(profile_data: dict, course_code: str = "CS2H1") -> Dict[str, float]:
+def profile_feature_row(profile_data: dict) -> np.ndarray:
     """
-    Convert simplified profile (from form) to 41 features required by the model.
+    Compute the profile-only columns of the feature matrix.
 
     Args:
         profile_data: Dictionary with simplified profile fields
-        course_code: Course code for the prediction
 
     Returns:
-        Dictionary with all 41 features ready for model input
+        ``float64`` row ordered by ``FEATURE_NAMES``; course columns are left at 0
     """
-
     # Parse period (e.g., "2024-1" -> 2024.1)
     periodo = profile_data.get("periodo_ingreso", "2024-1")
     year, semester = periodo.split("-")
     per_ingreso_num = float(f"{year}.{semester}")
     per_matricula_num = per_ingreso_num  # Assume same for simplicity
 
-    # Map tipo_colegio to code
-    tipo_colegio_map = {
-        "Público": "1",
-        "Privado": "2",
-        "Público - Provincial": "3",
-        "Privado - Religioso": "4",
-    }
-    tipo_colegio_cod = tipo_colegio_map.get(profile_data.get("tipo_colegio", "Público"), "1")
+    tipo_colegio_cod = TIPO_COLEGIO_MAP.get(profile_data.get("tipo_colegio", "Público"), "1")
 
     # Calculate age from fecha_nacimiento
-    try:
-        fecha_nac = datetime.fromisoformat(profile_data.get("fecha_nacimiento", "2000-01-01"))
-        edad_actual = (datetime.now() - fecha_nac).days / 365.25
-    except:
-        edad_actual = 20  # Default age
+    fecha_nac = _parse_birth_date(profile_data.get("fecha_nacimiento", "2000-01-01"))
+    edad_actual = (datetime.now() - fecha_nac).days / 365.25 if fecha_nac else 20  # Default age
 
     # Get simplified fields with defaults
     promedio = profile_data.get("promedio_general", 14.0)
@@ -47,22 +110,9 @@ def simplified_to_full_features(profile_data: dict, course_code: str = "CS2H1")
     semestres = profile_data.get("semestres_cursados", 0)
     tiene_beca = 1 if profile_data.get("tiene_beca", False) else 0
     cantidad_reservas = profile_data.get("cantidad_reservas", 0)
+    has_history = semestres > 0
 
-    # Course cluster mapping (simplified - based on course code prefix)
-    cluster_map = {
-        "CS1": 1,  # Discrete Math & Theory
-        "CS2": 7,  # Advanced Programming
-        "CS3": 2,  # Systems & Engineering
-        "FG": 3,   # General Education
-        "MA": 5,   # Mathematics
-        "CB": 5,   # Basic Sciences
-        "ET": 2,   # Engineering
-    }
-    prefix = course_code[:2] if len(course_code) >= 2 else "CS"
-    cluster_curso = cluster_map.get(prefix, 0)
-
-    # Build the 41 features
-    features = {
+    values = {
         # Demographic & Background (5)
         "SEXO": 1 if profile_data.get("sexo", "M") == "M" else 0,
         "ESTADO_CIVIL": 0,  # 0=Soltero (most common for students)
@@ -71,44 +121,35 @@ def simplified_to_full_features(profile_data: dict, course_code: str = "CS2H1")
         "PTJE_INGRESO": puntaje_ingreso,
 
         # Academic History (8) - estimated from promedio_general
-        "PROM_POND_HIST": promedio if semestres > 0 else 0.0,
-        "NOTA_MAX_HIST": min(promedio + 2.0, 20.0) if semestres > 0 else 0.0,
-        "NOTA_MIN_HIST": max(promedio - 3.0, 0.0) if semestres > 0 else 0.0,
-        "NOTA_MEDIAN_HIST": promedio if semestres > 0 else 0.0,
-        "NOTA_Q1_HIST": max(promedio - 1.5, 0.0) if semestres > 0 else 0.0,
-        "NOTA_Q3_HIST": min(promedio + 1.5, 20.0) if semestres > 0 else 0.0,
-        "ASIST_PROM_HIST": 0.92 if semestres > 0 else 0.95,  # Slightly lower avg attendance
+        "PROM_POND_HIST": promedio if has_history else 0.0,
+        "NOTA_MAX_HIST": min(promedio + 2.0, 20.0) if has_history else 0.0,
+        "NOTA_MIN_HIST": max(promedio - 3.0, 0.0) if has_history else 0.0,
+        "NOTA_MEDIAN_HIST": promedio if has_history else 0.0,
+        "NOTA_Q1_HIST": max(promedio - 1.5, 0.0) if has_history else 0.0,
+        "NOTA_Q3_HIST": min(promedio + 1.5, 20.0) if has_history else 0.0,
+        "ASIST_PROM_HIST": 0.92 if has_history else 0.95,  # Slightly lower avg attendance
         "CRED_APROB_HIST": float(creditos_aprobados),
 
         # Course Cluster History (8) - estimated from overall history
-        "PROM_POND_CLUSTER_HIST": promedio * 0.95 if semestres > 0 else 0.0,
-        "NOTA_MAX_CLUSTER_HIST": min(promedio + 1.5, 20.0) if semestres > 0 else 0.0,
-        "NOTA_MIN_CLUSTER_HIST": max(promedio - 2.5, 0.0) if semestres > 0 else 0.0,
-        "NOTA_MEDIAN_CLUSTER_HIST": promedio * 0.98 if semestres > 0 else 0.0,
-        "NOTA_Q1_CLUSTER_HIST": max(promedio - 1.2, 0.0) if semestres > 0 else 0.0,
-        "NOTA_Q3_CLUSTER_HIST": min(promedio + 1.2, 20.0) if semestres > 0 else 0.0,
-        "ASIST_PROM_CLUSTER_HIST": 0.93 if semestres > 0 else 0.95,
+        "PROM_POND_CLUSTER_HIST": promedio * 0.95 if has_history else 0.0,
+        "NOTA_MAX_CLUSTER_HIST": min(promedio + 1.5, 20.0) if has_history else 0.0,
+        "NOTA_MIN_CLUSTER_HIST": max(promedio - 2.5, 0.0) if has_history else 0.0,
+        "NOTA_MEDIAN_CLUSTER_HIST": promedio * 0.98 if has_history else 0.0,
+        "NOTA_Q1_CLUSTER_HIST": max(promedio - 1.2, 0.0) if has_history else 0.0,
+        "NOTA_Q3_CLUSTER_HIST": min(promedio + 1.2, 20.0) if has_history else 0.0,
+        "ASIST_PROM_CLUSTER_HIST": 0.93 if has_history else 0.95,
         "CRED_APROB_CLUSTER_HIST": float(creditos_aprobados * 0.3),  # ~30% in same cluster
 
-        # Current Course Details (5)
-        "COD_CURSO": float(hash(course_code) % 1000),  # Simple encoding
-        "CREDITOS": 3.0,  # Default 3 credits
-        "TIPO_CURSO": 0.0,  # 0=Obligatorio (most common)
-        "HRS_CURSO": 4.0,  # Default 4 hours
-        "CLUSTER_CURSO": float(cluster_curso),
-
-        # Student Progress & Status (7)
+        # Student Progress & Status (7, course level filled per course)
         "SEM_CURSADOS": float(semestres),
         "CANT_RESERVAS": float(cantidad_reservas),
         "SEM": float(semestres + 1),  # Current semester
-        "NIVEL_CURSO": 2.0,  # Default level 2
         "BECA_VIGENTE": float(tiene_beca),
         "ESTADO_PASADO": 0.0,  # 0=Regular
         "HRS_INASISTENCIA_ACUM_PASADO_y": 0.0,  # Assume no absences for new prediction
 
-        # Institutional/Socioeconomic (4)
+        # Institutional/Socioeconomic (4, course variant filled per course)
         "FAMILIA": 0.0,  # 0=CS (Computer Science - most common)
-        "CODIGO_y": float(hash(course_code) % 100),
         "POBREZA_RES": 0.2,  # Default low poverty index
         "POBREZA_PRO": 0.25,  # Default low poverty index
 
@@ -116,9 +157,48 @@ def simplified_to_full_features(profile_data: dict, course_code: str = "CS2H1")
         "PER_INGRESO_NUM": per_ingreso_num,
         "PER_MATRICULA_NUM": per_matricula_num,
 
-        # Additional encoded categorical features (2)
+        # Additional encoded categorical features (course encoding filled per course)
         "TIPO_CICLO": 0.0,  # 0=Regular (most common cycle type)
-        "CURSO": float(hash(course_code) % 500),  # Alternative course encoding
     }
 
-    return features
+    row = np.zeros(len(FEATURE_NAMES), dtype=np.float64)
+    for name, value in values.items():
+        row[FEATURE_INDEX[name]] = value
+    return row
+
+
+def course_feature_table(course_codes: Sequence[str]) -> np.ndarray:
+    """Gather the course columns for several courses into an ``(n, len(COURSE_FEATURES))`` array."""
+    return CourseIndex.current().rows(course_codes)
+
+
+def simplified_to_feature_matrix(profile_data: dict, course_codes: Sequence[str]) -> np.ndarray:
+    """
+    Build the model input for one profile and several courses.
+
+    Args:
+        profile_data: Dictionary with simplified profile fields
+        course_codes: Course codes to score, one row each
+
+    Returns:
+        ``float64`` matrix of shape ``(len(course_codes), len(FEATURE_NAMES))``
+    """
+    row = profile_feature_row(profile_data)
+    matrix = np.repeat(row[np.newaxis, :], len(course_codes), axis=0)
+    matrix[:, COURSE_COLUMNS] = course_feature_table(course_codes)
+    return matrix
+
+
+def simplified_to_full_features(profile_data: dict, course_code: str = "CS2H1") -> Dict[str, float]:
+    """
+    Convert simplified profile (from form) to 41 features required by the model.
+
+    Args:
+        profile_data: Dictionary with simplified profile fields
+        course_code: Course code for the prediction
+
+    Returns:
+        Dictionary with all 41 features ready for model input
+    """
+    matrix = simplified_to_feature_matrix(profile_data, [course_code])
+    return dict(zip(FEATURE_NAMES, matrix[0].tolist()))
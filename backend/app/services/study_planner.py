@@ -0,0 +1,182 @@
+"""
+Study planner: orders the remaining curriculum into semesters under a credit cap.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from app.ml.course_index import DEFAULT_CREDITOS
+from app.services.curriculum_graph import CurriculumCourse, CurriculumGraph, iter_nodes
+
+# Course types that are optional in the curriculum (elective in specialty / humanities)
+ELECTIVE_TYPES = frozenset({"EP", "EH"})
+
+
+@dataclass(frozen=True)
+class PlannedCourse:
+    course: CurriculumCourse
+    score: float
+    # Prerequisites that are not courses (e.g. "100 CREDITOS APROBADOS"), assumed met by then
+    requirements: tuple[str, ...] = ()
+
+
+@dataclass
+class StudyPlan:
+    semesters: List[List[PlannedCourse]] = field(default_factory=list)
+    unscheduled: List[CurriculumCourse] = field(default_factory=list)
+    # Longest prerequisite chain left: no plan can finish in fewer semesters
+    critical_path: int = 0
+
+
+def _bits(mask: int) -> List[int]:
+    return list(iter_nodes(mask))
+
+
+def credits_of(course: CurriculumCourse) -> int:
+    return int(course.creditos or DEFAULT_CREDITOS)
+
+
+def _pick(
+    ready: Sequence[int],
+    credits: Dict[int, int],
+    priority: Dict[int, int],
+    scores: Dict[int, float],
+    max_credits: int,
+) -> List[int]:
+    """
+    0/1 knapsack over the credit cap: the subset of ``ready`` with the highest total
+    priority, then the highest total pass probability.
+    """
+    # best[c] = (priority, score, nodes) of the best subset using exactly c credits
+    best: List[tuple[int, float, tuple[int, ...]] | None] = [None] * (max_credits + 1)
+    best[0] = (0, 0.0, ())
+    for node in ready:
+        weight = credits[node]
+        for used in range(max_credits - weight, -1, -1):
+            current = best[used]
+            if current is None:
+                continue
+            candidate = (current[0] + priority[node], current[1] + scores[node], current[2] + (node,))
+            slot = best[used + weight]
+            if slot is None or candidate[:2] > slot[:2]:
+                best[used + weight] = candidate
+    chosen = max((entry for entry in best if entry is not None), key=lambda entry: entry[:2])
+    return list(chosen[2])
+
+
+def build_plan(
+    graph: CurriculumGraph,
+    approved: int,
+    scores: Dict[int, float],
+    *,
+    max_credits: int,
+    max_semesters: int,
+    electives: int = 0,
+) -> StudyPlan:
+    """
+    Plan the courses left for a student.
+
+    Targets are every mandatory curriculum course not yet approved plus the ``electives`` elective
+    courses with the best pass probability, together with whatever they require.
+    Each semester takes the courses whose prerequisites are planned in earlier
+    semesters, preferring those that head the longest remaining prerequisite chain
+    (critical-path list scheduling), and fills the credit cap with a knapsack that
+    breaks ties by pass probability.
+
+    Args:
+        graph: Curriculum graph
+        approved: Approved-course mask of the student (``CurriculumGraph.approved_mask``)
+        scores: Pass probability per course node; every unapproved course needs one
+        max_credits: Credit cap per semester
+        max_semesters: Number of semesters to plan at most
+        electives: Elective courses to include
+    """
+    courses = graph.courses
+    course_mask = (1 << len(courses)) - 1
+    # Only course prerequisites are scheduled; other requirements are reported per course
+    prerequisites = [mask & course_mask for mask in graph.prerequisite_masks]
+    remaining = course_mask & ~approved
+
+    target = 0
+    elective_nodes = []
+    for node in _bits(remaining):
+        if courses[node].semestre is None:
+            continue  # Placeholder rows for codes outside the curriculum
+        if courses[node].tipo in ELECTIVE_TYPES:
+            elective_nodes.append(node)
+        else:
+            target |= 1 << node
+    elective_nodes.sort(key=lambda node: (-scores[node], courses[node].cod_curso))
+    for node in elective_nodes[:electives]:
+        target |= 1 << node
+    # Add what the targets require, transitively
+    while True:
+        required = 0
+        for node in _bits(target):
+            required |= prerequisites[node]
+        required &= remaining & ~target
+        if not required:
+            break
+        target |= required
+
+    plan = StudyPlan()
+    credits = {node: credits_of(courses[node]) for node in _bits(target)}
+    # A course above the cap can never be taken, nor can anything that requires it
+    too_large = [node for node, weight in credits.items() if weight > max_credits]
+    for node in too_large:
+        target &= ~(1 << node)
+
+    # Height of each target in the dependency DAG, from dependents back to their prerequisites
+    dependents: Dict[int, List[int]] = {node: [] for node in _bits(target)}
+    for node in dependents:
+        for prerequisite in _bits(prerequisites[node] & target):
+            dependents[prerequisite].append(node)
+    order = _topological_order(dependents, prerequisites, target)
+    height: Dict[int, int] = {}
+    for node in reversed(order):
+        height[node] = 1 + max((height[child] for child in dependents[node]), default=0)
+    plan.critical_path = max(height.values(), default=0)
+    # Exponential weights: heading a longer chain beats any number of courses on shorter ones
+    base = len(courses) + 1
+    priority = {node: base ** level for node, level in height.items()}
+
+    done = approved
+    left = 0
+    for node in order:
+        left |= 1 << node
+    for _ in range(max_semesters):
+        ready = [node for node in _bits(left) if not prerequisites[node] & ~done]
+        if not ready:
+            break
+        chosen = sorted(
+            _pick(ready, credits, priority, scores, max_credits),
+            key=lambda node: (courses[node].semestre or 0, courses[node].cod_curso),
+        )
+        semester = []
+        for node in chosen:
+            requirements = graph.requirement_names(graph.prerequisite_masks[node])
+            semester.append(PlannedCourse(courses[node], scores[node], requirements))
+            done |= 1 << node
+            left &= ~(1 << node)
+        plan.semesters.append(semester)
+
+    unscheduled = (target & ~done) | sum(1 << node for node in too_large)
+    plan.unscheduled = [courses[node] for node in _bits(unscheduled)]
+    return plan
+
+
+def _topological_order(dependents: Dict[int, List[int]], prerequisites: Sequence[int], target: int) -> List[int]:
+    """Kahn's algorithm over the targets; courses on a prerequisite cycle are left out."""
+    pending = {node: len(_bits(prerequisites[node] & target)) for node in dependents}
+    queue = sorted(node for node, count in pending.items() if count == 0)
+    order = []
+    while queue:
+        node = queue.pop()
+        order.append(node)
+        for child in dependents[node]:
+            pending[child] -= 1
+            if pending[child] == 0:
+                queue.append(child)
+    return order
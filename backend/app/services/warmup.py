@@ -0,0 +1,85 @@
+"""
+Startup warm-up: loads the active model and runs synthetic predictions before traffic arrives.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict
+
+import structlog
+
+from app.ml.course_index import CourseIndex
+from app.ml.model_loader import ModelLoader
+from app.services.executor import get_inference_executor
+from app.services.inference import InferenceService
+from app.services.profile_mapper import simplified_to_feature_matrix
+
+logger = structlog.get_logger(__name__)
+
+# Plausible student used for warm-up rows; the values only need to exercise the mapper and model
+_SYNTHETIC_PROFILE = {
+    "sexo": "M",
+    "fecha_nacimiento": "2003-01-01",
+    "tipo_colegio": "Privado",
+    "promedio_general": 13.5,
+    "puntaje_ingreso": 75.0,
+    "semestres_cursados": 3,
+    "periodo_ingreso": "2022-1",
+}
+_WARMUP_COURSES = 8
+
+
+async def warm_up(predictions: int) -> Dict[str, Any]:
+    """
+    Load the active model and score ``predictions`` synthetic batches through the inference pool.
+
+    Returns the timings that are also logged, so they can be reported by ``/health``.
+    """
+    started = time.perf_counter()
+    entry = await asyncio.to_thread(ModelLoader.entry)
+    load_ms = 1000.0 * (time.perf_counter() - started)
+
+    codes = list(CourseIndex.current().codes[:_WARMUP_COURSES]) or ["WARMUP"]
+    matrix = simplified_to_feature_matrix(_SYNTHETIC_PROFILE, codes)
+    executor = get_inference_executor()
+
+    # Spread the calls over the pool so every worker has run the model at least once; at most
+    # ``max_workers`` at a time, so the warm-up never overflows the queue and gets rejected
+    warm_started = time.perf_counter()
+    step = max(1, executor.max_workers)
+    for done in range(0, predictions, step):
+        rounds = [executor.run(InferenceService.predict_batch, matrix) for _ in range(min(step, predictions - done))]
+        await asyncio.gather(*rounds)
+    warmup_ms = 1000.0 * (time.perf_counter() - warm_started)
+
+    timings = {
+        "model": entry.name,
+        "model_version": entry.version,
+        "load_ms": round(load_ms, 2),
+        "warmup_predictions": predictions,
+        "warmup_ms": round(warmup_ms, 2),
+    }
+    logger.info("model_warmed_up", **timings)
+    return timings
+
+
+async def retry_warm_up(state: Any, predictions: int, interval: float, max_interval: float = 60.0) -> None:
+    """
+    Retry a failed warm-up until it succeeds, then mark ``state`` (``app.state``) ready.
+
+    Without this a single failure at startup would keep ``/health`` at 503 for the life of
+    the process, even though the registry can still serve (e.g. its fallback model).
+    """
+    delay = interval
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            state.warmup = await warm_up(predictions)
+        except Exception:
+            logger.warning("model_warmup_retry_failed", retry_in=min(delay * 2, max_interval), exc_info=True)
+            delay = min(delay * 2, max_interval)
+            continue
+        state.ready = True
+        return
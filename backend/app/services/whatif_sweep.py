@@ -0,0 +1,103 @@
+"""
+What-if sweeps: builds the perturbation matrix for a grid of feature values in one pass.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from app.db.schemas import SweepAxis
+from app.services.profile_mapper import COURSE_COLUMNS, FEATURE_INDEX, course_feature_table, profile_feature_row
+
+
+class SweepError(ValueError):
+    """Raised when a sweep request cannot be turned into a feature grid."""
+
+
+def axis_values(axis: SweepAxis) -> np.ndarray:
+    if axis.values:
+        return np.asarray(axis.values, dtype=np.float64)
+    if axis.start is None or axis.stop is None:
+        raise SweepError(f"Axis '{axis.key}' needs either values or start/stop")
+    return np.linspace(axis.start, axis.stop, axis.steps)
+
+
+def _is_simplified_key(profile_data: dict, key: str) -> bool:
+    return key in profile_data and isinstance(profile_data[key], (int, float))
+
+
+def build_sweep_matrix(
+    *,
+    course_code: str,
+    axes: Sequence[SweepAxis],
+    profile_data: dict | None,
+    features: Dict[str, float],
+    max_points: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the model input for every point of a what-if grid.
+
+    Args:
+        course_code: Course the sweep is evaluated for
+        axes: Swept keys; simplified profile fields are re-mapped, raw features are overwritten
+        profile_data: Stored simplified profile, or None to sweep over ``features``
+        features: Raw features used when there is no profile
+        max_points: Upper bound on the grid size
+
+    Returns:
+        ``(matrix, grid)`` where ``matrix[0]`` is the unperturbed input, ``matrix[1:]`` the
+        grid points, and ``grid`` holds the absolute value of each axis per grid point
+    """
+    steps = [axis_values(axis) for axis in axes]
+    n_points = int(np.prod([len(values) for values in steps]))
+    if n_points > max_points:
+        raise SweepError(f"Sweep has {n_points} points, the maximum is {max_points}")
+
+    if profile_data is not None:
+        base_row = profile_feature_row(profile_data)
+        base_row[COURSE_COLUMNS] = course_feature_table([course_code])[0]
+        columns: Dict[str, int] = FEATURE_INDEX
+        for axis in axes:
+            if not _is_simplified_key(profile_data, axis.key) and axis.key not in columns:
+                raise SweepError(f"Unknown feature: {axis.key}")
+        simplified = [_is_simplified_key(profile_data, axis.key) for axis in axes]
+        base_values = [
+            float(profile_data[axis.key]) if is_simplified else float(base_row[columns[axis.key]])
+            for axis, is_simplified in zip(axes, simplified)
+        ]
+    else:
+        base = {**{axis.key: 0.0 for axis in axes}, **features}
+        order = sorted(base)
+        columns = {key: idx for idx, key in enumerate(order)}
+        base_row = np.array([float(base[key]) for key in order], dtype=np.float64)
+        simplified = [False] * len(axes)
+        base_values = [float(base[axis.key]) for axis in axes]
+
+    for idx, axis in enumerate(axes):
+        if axis.relative:
+            steps[idx] = steps[idx] + base_values[idx]
+    grid = np.stack([mesh.ravel() for mesh in np.meshgrid(*steps, indexing="ij")], axis=1)
+
+    # Profile-level columns only depend on the simplified axes: map each distinct
+    # combination once and gather the rows for the whole grid
+    simplified_idx = [idx for idx, is_simplified in enumerate(simplified) if is_simplified]
+    if simplified_idx:
+        combos, inverse = np.unique(grid[:, simplified_idx], axis=0, return_inverse=True)
+        course_row = base_row[COURSE_COLUMNS]
+        block = np.empty((len(combos), len(base_row)), dtype=np.float64)
+        for row_idx, combo in enumerate(combos):
+            adjusted = dict(profile_data or {})
+            adjusted.update({axes[idx].key: float(value) for idx, value in zip(simplified_idx, combo)})
+            block[row_idx] = profile_feature_row(adjusted)
+        block[:, COURSE_COLUMNS] = course_row
+        points = block[inverse.reshape(-1)]
+    else:
+        points = np.repeat(base_row[np.newaxis, :], len(grid), axis=0)
+
+    for idx, axis in enumerate(axes):
+        if not simplified[idx]:
+            points[:, columns[axis.key]] = grid[:, idx]
+
+    return np.vstack([base_row[np.newaxis, :], points]), grid
@@ -1,16 +1,34 @@
 """
 Script to load curriculum data (malla_curricular_2016.csv) into the database
+
+The whole catalog is read and compared with the ``courses`` table in one query; only
+new or changed rows are written, with a single ``INSERT ... ON CONFLICT DO UPDATE``.
+Running it again on the same files writes nothing, so it is safe on every deploy.
 """
+import argparse
 import csv
+import json
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable, Dict, List
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
 from app.db.base import SessionLocal
 from app.db.models import Course
 
+DATA_DIR = Path(__file__).parent.parent / "ml_models" / "data"
+CURRICULUM_CSV = DATA_DIR / "malla_curricular_2016.csv"
+METADATA_JSON = DATA_DIR / "raw" / "cursos.json"
+
+# Course columns owned by the curriculum files
+COLUMNS = ("nombre", "semestre", "tipo", "horas", "creditos", "prerequisitos", "familia", "nivel")
+
 
 def parse_semester(sem_str: str) -> int:
     """Convert semester string (I, II, III, etc.) to number"""
@@ -39,72 +57,162 @@ def parse_prerequisites(prereq_str: str) -> list:
     return [p for p in prereqs if p]
 
 
-def load_curriculum(csv_path: str):
+def course_family(cod_curso: str) -> str | None:
+    """Program family of a course: the letters before the first digit, e.g. ``CS2H1`` -> ``CS``."""
+    prefix = ""
+    for char in cod_curso:
+        if char.isdigit():
+            break
+        prefix += char
+    return prefix.upper() or None
+
+
+def read_curriculum(csv_path: str | Path, metadata_path: str | Path | None = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Course rows keyed by code, from the curriculum CSV and the course metadata file.
+
+    ``nivel`` is the curriculum semester, which is what NIVEL_CURSO holds in the training
+    data. Names stay as in the CSV, since prerequisites refer to courses by that name;
+    the metadata only names courses missing from the CSV.
+    """
+    courses: Dict[str, Dict[str, Any]] = {}
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            cod_curso = row['CODIGO'].strip()
+            semestre = parse_semester(row['SEM'])
+            courses[cod_curso] = {
+                "cod_curso": cod_curso,
+                "nombre": row['CURSO'].strip(),
+                "semestre": semestre,
+                "tipo": row['TIPO'].strip(),
+                "horas": int(row['HORAS']) if row['HORAS'] else None,
+                "creditos": int(row['CREDITOS']) if row['CREDITOS'] else None,
+                "prerequisitos": parse_prerequisites(row['PREREQUISITO']),
+                "familia": course_family(cod_curso),
+                "nivel": semestre or None,
+            }
+
+    if metadata_path is not None and Path(metadata_path).exists():
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            for entry in json.load(f):
+                cod_curso = str(entry['CODIGO']).strip()
+                if cod_curso in courses:
+                    continue
+                courses[cod_curso] = {
+                    "cod_curso": cod_curso,
+                    "nombre": str(entry.get('CURSO') or cod_curso).strip(),
+                    "semestre": None,
+                    "tipo": None,
+                    "horas": None,
+                    "creditos": None,
+                    "prerequisitos": [],
+                    "familia": course_family(cod_curso),
+                    "nivel": None,
+                }
+    return courses
+
+
+@dataclass
+class CurriculumDiff:
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    # Changed rows with the columns that differ
+    updated: List[tuple[Dict[str, Any], List[str]]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        """Rows to write."""
+        return self.added + [row for row, _ in self.updated]
+
+
+def diff_curriculum(db: Session, courses: Dict[str, Dict[str, Any]]) -> CurriculumDiff:
+    """Compare the curriculum with the ``courses`` table, read in a single query."""
+    stmt = select(Course.cod_curso, *(getattr(Course, column) for column in COLUMNS))
+    existing = {row.cod_curso: row._mapping for row in db.execute(stmt)}
+
+    diff = CurriculumDiff()
+    for cod_curso, course in courses.items():
+        current = existing.get(cod_curso)
+        if current is None:
+            diff.added.append(course)
+            continue
+        changed = [column for column in COLUMNS if current[column] != course[column]]
+        if changed:
+            diff.updated.append((course, changed))
+        else:
+            diff.unchanged += 1
+    return diff
+
+
+def upsert_courses(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert or update ``rows`` with one ``INSERT ... ON CONFLICT (cod_curso) DO UPDATE``."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upsert not supported for '{dialect}'")
+
+    stmt = insert(Course)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Course.cod_curso],
+        set_={column: stmt.excluded[column] for column in COLUMNS},
+    )
+    # executemany: SQLAlchemy packs the rows into multi-row VALUES batches sized to the driver limits
+    db.execute(stmt, rows)
+
+
+def load_curriculum(
+    csv_path: str | Path,
+    metadata_path: str | Path | None = None,
+    *,
+    dry_run: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> CurriculumDiff:
     """Load curriculum from CSV file into database"""
-    db = SessionLocal()
+    courses = read_curriculum(csv_path, metadata_path)
+    db = session_factory()
 
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-
-            courses_added = 0
-            courses_updated = 0
-
-            for row in reader:
-                cod_curso = row['CODIGO'].strip()
-                nombre = row['CURSO'].strip()
-                semestre = parse_semester(row['SEM'])
-                tipo = row['TIPO'].strip()
-                horas = int(row['HORAS']) if row['HORAS'] else None
-                creditos = int(row['CREDITOS']) if row['CREDITOS'] else None
-                prerequisitos = parse_prerequisites(row['PREREQUISITO'])
-
-                # Check if course exists
-                existing = db.query(Course).filter(Course.cod_curso == cod_curso).first()
-
-                if existing:
-                    # Update existing course
-                    existing.nombre = nombre
-                    existing.semestre = semestre
-                    existing.tipo = tipo
-                    existing.horas = horas
-                    existing.creditos = creditos
-                    existing.prerequisitos = prerequisitos
-                    courses_updated += 1
-                else:
-                    # Create new course
-                    course = Course(
-                        cod_curso=cod_curso,
-                        nombre=nombre,
-                        semestre=semestre,
-                        tipo=tipo,
-                        horas=horas,
-                        creditos=creditos,
-                        prerequisitos=prerequisitos
-                    )
-                    db.add(course)
-                    courses_added += 1
-
-                print(f"{'Updated' if existing else 'Added'}: {cod_curso} - {nombre} (Sem {semestre}, Prereqs: {len(prerequisitos)})")
-
-        db.commit()
-        print(f"\n✅ Success! Added {courses_added} new courses, updated {courses_updated} existing courses.")
-
-    except Exception as e:
+        diff = diff_curriculum(db, courses)
+        if diff.rows and not dry_run:
+            upsert_courses(db, diff.rows)
+            db.commit()
+    except Exception:
         db.rollback()
-        print(f"\n❌ Error: {e}")
         raise
     finally:
         db.close()
+    return diff
 
 
-if __name__ == "__main__":
-    # Path to CSV file
-    csv_file = Path(__file__).parent.parent / "ml_models" / "data" / "malla_curricular_2016.csv"
+def print_diff(diff: CurriculumDiff) -> None:
+    for course in diff.added:
+        print(f"Added: {course['cod_curso']} - {course['nombre']} (Sem {course['semestre']})")
+    for course, changed in diff.updated:
+        print(f"Updated: {course['cod_curso']} - {course['nombre']} ({', '.join(changed)})")
+
 
-    if not csv_file.exists():
-        print(f"❌ Error: CSV file not found at {csv_file}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the curriculum into the courses table")
+    parser.add_argument("--csv", type=Path, default=CURRICULUM_CSV, help="Curriculum CSV file")
+    parser.add_argument("--metadata", type=Path, default=METADATA_JSON, help="Course metadata JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    args = parser.parse_args()
+
+    if not args.csv.exists():
+        print(f"❌ Error: CSV file not found at {args.csv}")
         sys.exit(1)
 
-    print(f"📚 Loading curriculum from: {csv_file}")
-    load_curriculum(str(csv_file))
+    print(f"📚 Loading curriculum from: {args.csv}")
+    try:
+        result = load_curriculum(args.csv, args.metadata, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        raise
+    print_diff(result)
+    summary = (
+        f"{len(result.added)} new courses, {len(result.updated)} updated, {result.unchanged} unchanged."
+    )
+    print(f"\nDry run: {summary}" if args.dry_run else f"\n✅ Success! {summary}")
@@ -17,7 +17,7 @@ from app.core.config import get_settings
 
 get_settings.cache_clear()
 
-from app.db.base import Base, SessionLocal, engine  # noqa: E402
+from app.db.base import Base, SessionLocal, async_engine, engine  # noqa: E402
 from app.main import create_app  # noqa: E402
 
 
@@ -29,9 +29,11 @@ def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
 
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_database() -> None:
+def setup_database(event_loop) -> None:
     Base.metadata.create_all(bind=engine)
     yield
+    # Pooled aiosqlite connections each keep a thread alive until closed
+    event_loop.run_until_complete(async_engine.dispose())
     Base.metadata.drop_all(bind=engine)
 
 
@@ -0,0 +1,34 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_model_call() -> None:
+    calls: list[int] = []
+
+    async def runner(matrix: np.ndarray) -> list[float]:
+        calls.append(len(matrix))
+        return matrix.sum(axis=1).tolist()
+
+    batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+    rows = [np.array([[float(i), 1.0]]) for i in range(5)]
+    results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+
+    assert calls == [5]
+    assert results == [[float(i) + 1.0] for i in range(5)]
+    assert batcher.stats.snapshot()["max_batch_size"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting_and_errors_propagate() -> None:
+    async def runner(matrix: np.ndarray) -> list[float]:
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(runner, max_batch_size=2, max_wait_ms=10_000)
+    submissions = [batcher.submit(np.zeros((1, 3))) for _ in range(2)]
+    results = await asyncio.wait_for(asyncio.gather(*submissions, return_exceptions=True), timeout=1)
+    assert all(isinstance(result, RuntimeError) for result in results)
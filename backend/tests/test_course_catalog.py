@@ -0,0 +1,68 @@
+import pytest
+
+from app.db.base import SessionLocal
+from app.db.models import Course
+from app.services.course_catalog import CourseCatalog, etag_matches
+from app.services.curriculum_graph import CurriculumGraph
+
+ROWS = [
+    {"cod_curso": "K1", "nombre": "K1", "semestre": 1, "tipo": "O", "creditos": 4, "prerequisitos": []},
+    {"cod_curso": "K2", "nombre": "K2", "semestre": 2, "tipo": "O", "creditos": 4, "prerequisitos": ["K1"]},
+]
+HEADERS = {"Authorization": "Bearer test"}
+
+
+@pytest.fixture()
+def curriculum():
+    with SessionLocal() as session:
+        session.add_all(Course(**row) for row in ROWS)
+        session.commit()
+    CurriculumGraph.refresh()
+    yield
+    with SessionLocal() as session:
+        session.query(Course).filter(Course.cod_curso.in_([row["cod_curso"] for row in ROWS])).delete()
+        session.commit()
+    CurriculumGraph.refresh()
+
+
+def test_if_none_match_parsing() -> None:
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+@pytest.mark.asyncio
+async def test_catalog_etag_follows_the_curriculum_version(async_client, curriculum) -> None:
+    response = await async_client.get("/api/v1/courses/all", headers=HEADERS)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag == f'"{CurriculumGraph.current().version}"'
+    assert [course["cod_curso"] for course in response.json()][-2:] == ["K1", "K2"]
+    assert response.json()[-1]["prerequisitos"] == ["K1"]
+
+    cached = await async_client.get("/api/v1/courses/all", headers={**HEADERS, "If-None-Match": etag})
+    assert (cached.status_code, cached.content, cached.headers["etag"]) == (304, b"", etag)
+
+    with SessionLocal() as session:
+        session.get(Course, "K2").creditos = 5
+        session.commit()
+    assert CurriculumGraph.refresh_if_changed()
+    changed = await async_client.get("/api/v1/courses/all", headers={**HEADERS, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert CourseCatalog.current().body == changed.content
+
+
+@pytest.mark.asyncio
+async def test_available_courses_are_cut_from_the_cached_catalog(async_client, curriculum) -> None:
+    response = await async_client.get("/api/v1/courses/available", headers=HEADERS)
+    assert response.status_code == 200
+    assert "K1" in [course["cod_curso"] for course in response.json()]
+    assert "K2" not in [course["cod_curso"] for course in response.json()]
+
+    etag = response.headers["etag"]
+    cached = await async_client.get("/api/v1/courses/available", headers={**HEADERS, "If-None-Match": etag})
+    assert cached.status_code == 304
+    all_courses = await async_client.get("/api/v1/courses/all", headers=HEADERS)
+    assert all_courses.headers["etag"] != etag
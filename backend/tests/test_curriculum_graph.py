@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.base import SessionLocal
+from app.db.models import Course
+from app.ml.course_index import CourseIndex
+from app.services.course_availability import list_available_courses
+from app.services.curriculum_graph import CurriculumGraph, watch_curriculum
+
+ROWS = [
+    {"cod_curso": "MA100", "nombre": "Matematica I", "semestre": 1, "prerequisitos": []},
+    {"cod_curso": "CS111", "nombre": "Programacion", "semestre": 1, "prerequisitos": []},
+    {"cod_curso": "MA101", "nombre": "Matematica II", "semestre": 2, "prerequisitos": ["MATEMATICA I"]},
+    {"cod_curso": "CS112", "nombre": "Ciencia I", "semestre": 2, "prerequisitos": ["programacion", "Matematica I"]},
+    {"cod_curso": "CS400", "nombre": "Proyecto", "semestre": 4, "prerequisitos": ["100 CREDITOS APROBADOS"]},
+    {"cod_curso": "XX999", "nombre": "XX999", "semestre": None, "prerequisitos": None},
+]
+
+
+def _profile(**data):
+    return SimpleNamespace(profile_data=data)
+
+
+def test_available_is_a_prerequisite_subset_test() -> None:
+    graph = CurriculumGraph(ROWS)
+    assert [course.cod_curso for course in graph.courses][:3] == ["XX999", "CS111", "MA100"]
+
+    # No profile: only courses without prerequisites
+    assert [c.cod_curso for c in list_available_courses(None, graph=graph)] == ["XX999", "CS111", "MA100"]
+
+    # Approved by code satisfies prerequisites named by course name; approved courses are hidden
+    profile = _profile(semestres_cursados=1, cursos_aprobados_codigos=["ma100"], cursos_aprobados=["Programacion"])
+    assert [c.cod_curso for c in list_available_courses(profile, graph=graph)] == ["XX999", "CS112", "MA101"]
+
+
+def test_courses_approved_by_code_satisfy_named_prerequisites() -> None:
+    graph = CurriculumGraph(ROWS)
+    # Only codes declared: prerequisites that name these courses are met all the same
+    profile = _profile(semestres_cursados=1, cursos_aprobados_codigos=["MA100", "cs111"])
+    assert [c.cod_curso for c in list_available_courses(profile, graph=graph)] == ["XX999", "CS112", "MA101"]
+
+
+def test_unmatched_requirements_and_semester_window() -> None:
+    graph = CurriculumGraph(ROWS)
+    approved = graph.approved_mask(["100 creditos aprobados"], ["MA100", "CS111", "MA101", "CS112"])
+    assert [c.cod_curso for c in graph.available(approved, semester_limit=4)] == ["XX999", "CS400"]
+
+    # semestres_cursados missing counts as 0: the window is not inferred from the approved courses
+    profile = _profile(
+        cursos_aprobados_codigos=["MA100", "CS111", "MA101", "CS112"], cursos_aprobados=["100 CREDITOS APROBADOS"]
+    )
+    assert [c.cod_curso for c in list_available_courses(profile, max_next_semesters=2, graph=graph)] == ["XX999"]
+    assert [c.cod_curso for c in list_available_courses(profile, max_next_semesters=4, graph=graph)] == ["XX999", "CS400"]
+    profile.profile_data["semestres_cursados"] = 3
+    assert [c.cod_curso for c in list_available_courses(profile, graph=graph)] == ["XX999", "CS400"]
+
+
+@pytest.fixture()
+def graph_course():
+    yield
+    with SessionLocal() as db:
+        db.query(Course).filter(Course.cod_curso == "GRAPH1").delete()
+        db.commit()
+    CurriculumGraph.refresh()
+    CourseIndex.refresh()
+
+
+def test_refresh_if_changed_follows_the_courses_table(graph_course) -> None:
+    CurriculumGraph.refresh()
+    assert CurriculumGraph.refresh_if_changed() is False
+
+    with SessionLocal() as db:
+        db.add(Course(cod_curso="GRAPH1", nombre="Grafo", semestre=1, prerequisitos=[]))
+        db.commit()
+    assert CurriculumGraph.refresh_if_changed() is True
+    assert CurriculumGraph.current().node("grafo") is not None
+
+
+@pytest.mark.asyncio
+async def test_watcher_refreshes_the_course_index_with_the_graph(graph_course) -> None:
+    CurriculumGraph.refresh()
+    CourseIndex.refresh()
+    with SessionLocal() as db:
+        db.add(Course(cod_curso="GRAPH1", nombre="Grafo", semestre=1, creditos=7, prerequisitos=[]))
+        db.commit()
+
+    watcher = asyncio.create_task(watch_curriculum(0.01))
+    try:
+        for _ in range(200):
+            if "GRAPH1" in CourseIndex.current():
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        watcher.cancel()
+    assert "GRAPH1" in CourseIndex.current()
+    assert CurriculumGraph.current().node("GRAPH1") is not None
+
+
+@pytest.mark.asyncio
+async def test_unreadable_curriculum_is_a_503(async_client, monkeypatch) -> None:
+    def fail():
+        raise OperationalError("SELECT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(CurriculumGraph, "_current", None)
+    monkeypatch.setattr(CurriculumGraph, "_read_courses_table", staticmethod(fail))
+    response = await async_client.get("/api/v1/courses/all", headers={"Authorization": "Bearer test"})
+    assert response.status_code == 503
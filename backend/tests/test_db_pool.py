@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import get_settings
+from app.db import base
+
+
+def test_memory_sqlite_shares_one_connection() -> None:
+    engine = base._create_engine(get_settings(), "sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar_one() == 0
+
+
+def test_file_pool_uses_settings_and_records_checkouts(tmp_path) -> None:
+    settings = get_settings().model_copy(
+        update={
+            "db_sync_pool_size": 1,
+            "db_sync_max_overflow": 0,
+            "db_pool_timeout_seconds": 0.05,
+            "db_pool_pre_ping": False,
+        }
+    )
+    engine = base._create_engine(settings, f"sqlite:///{tmp_path / 'pool.db'}")
+    assert isinstance(engine.pool, base.TimedQueuePool)
+    assert engine.pool.size() == 1
+
+    checkouts, timeouts = base.TimedQueuePool.stats.checkouts, base.TimedQueuePool.stats.timeouts
+    with engine.connect():
+        stats = base.TimedQueuePool.stats.snapshot(engine.pool, 1)
+        assert stats["checked_out"] == 1
+        assert stats["utilization"] == 1.0
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert base.TimedQueuePool.stats.checkouts == checkouts + 1
+    assert base.TimedQueuePool.stats.timeouts == timeouts + 1
+    engine.dispose()
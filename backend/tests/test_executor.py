@@ -0,0 +1,66 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.services.executor import ExecutorSaturated, InferenceExecutor
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_saturated() -> None:
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=0, retry_after=2)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ExecutorSaturated) as exc_info:
+            await executor.run(sum, [1, 2])
+        assert exc_info.value.retry_after == 2
+
+        release.set()
+        assert await running is True
+        assert await executor.run(sum, [1, 2]) == 3
+
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["in_flight"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_is_recycled() -> None:
+    executor = InferenceExecutor(kind="process", max_workers=1, max_queue=0)
+    try:
+        before = await executor.run(os.getpid)
+        executor.recycle()
+        # New children fork from the parent as it is now, with the reloaded model
+        assert await executor.run(os.getpid) != before
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_keep_the_slot_until_the_job_ends() -> None:
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(sum, [1]))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0.05)
+
+        # The queued job was dropped, but the running one still occupies its worker
+        assert executor.stats()["in_flight"] == 1
+        release.set()
+        await asyncio.sleep(0.05)
+        assert executor.stats()["in_flight"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
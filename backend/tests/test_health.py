@@ -1,7 +1,66 @@
+import time
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app import main
+from app.core.config import get_settings
+from app.services import warmup
+from app.services.executor import InferenceExecutor
+
 
 def test_health_endpoint(client: TestClient) -> None:
     response = client.get("/api/v1/healthz")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_health_reports_ready_after_warmup(client: TestClient) -> None:
+    response = client.get("/api/v1/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["warmup"]["warmup_predictions"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_health_is_not_ready_until_warmed_up(app, async_client) -> None:
+    app.state.ready = False
+    try:
+        response = await async_client.get("/api/v1/health")
+    finally:
+        app.state.ready = True
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_failed_warmup_is_retried_in_the_background(monkeypatch) -> None:
+    calls = []
+
+    async def flaky_warm_up(predictions: int) -> dict:
+        calls.append(predictions)
+        if len(calls) == 1:
+            raise RuntimeError("executor not ready")
+        return {"warmup_predictions": predictions}
+
+    monkeypatch.setattr(main, "warm_up", flaky_warm_up)
+    monkeypatch.setattr("app.services.warmup.warm_up", flaky_warm_up)
+    monkeypatch.setattr(get_settings(), "model_warmup_retry_seconds", 0.01)
+    with TestClient(main.create_app()) as client:
+        deadline = time.monotonic() + 2
+        while client.get("/api/v1/health").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get("/api/v1/health").status_code == 200
+    assert len(calls) >= 2
+
+
+@pytest.mark.asyncio
+async def test_warmup_fits_in_a_small_executor(monkeypatch) -> None:
+    executor = InferenceExecutor(max_workers=2, max_queue=0)
+    monkeypatch.setattr(warmup, "get_inference_executor", lambda: executor)
+    try:
+        timings = await warmup.warm_up(7)
+    finally:
+        executor.shutdown()
+    assert timings["warmup_predictions"] == 7
+    assert (executor.completed, executor.rejected) == (7, 0)
@@ -0,0 +1,96 @@
+import base64
+import uuid
+
+import pytest
+
+from app.db import history_codec, repository
+from app.db.base import SessionLocal
+
+MOCK_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _seed_history(user_id: str, n: int) -> None:
+    with SessionLocal() as db:
+        repository.get_or_create_user(db, user_id=user_id, email=f"{user_id}@example.com")
+        repository.get_or_create_course(db, course_code="HIST101")
+        repository.create_inferences(
+            db,
+            user_id=user_id,
+            records=[
+                {
+                    "course_code": "HIST101",
+                    "input_payload": {"features": {"x": float(i)}},
+                    "output_payload": {"label": "Aprobar", "score": 0.5 + i / 100},
+                    "version": "v1",
+                }
+                for i in range(n)
+            ],
+        )
+        db.commit()
+
+
+def test_keyset_pages_cover_every_row_once() -> None:
+    user_id = str(uuid.uuid4())
+    _seed_history(user_id, 7)
+
+    seen, cursor = [], None
+    with SessionLocal() as db:
+        while True:
+            rows, cursor = repository.list_user_inferences(
+                db, user_id=user_id, limit=3, cursor=cursor, include_payloads=False
+            )
+            seen.extend(rows)
+            if cursor is None:
+                break
+        assert repository.count_user_inferences(db, user_id=user_id) == 7
+
+    assert len(seen) == 7
+    assert len({row.id for row in seen}) == 7
+    assert sorted(row.score for row in seen) == pytest.approx([0.5 + i / 100 for i in range(7)])
+    assert not hasattr(seen[0], "input_payload")
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint_summary_and_cursor(async_client) -> None:
+    _seed_history(MOCK_USER_ID, 3)
+    headers = {"Authorization": "Bearer test"}
+
+    first = (await async_client.get("/api/v1/history?limit=2&fields=summary&total=exact", headers=headers)).json()
+    assert first["items"][0]["input_payload"] is None
+    assert first["total"] >= 3
+    assert first["next_cursor"]
+
+    second = await async_client.get(f"/api/v1/history?limit=2&cursor={first['next_cursor']}&total=none", headers=headers)
+    assert second.status_code == 200
+    assert second.json()["total"] is None
+    assert {item["id"] for item in first["items"]}.isdisjoint(item["id"] for item in second.json()["items"])
+
+    # The exact count stays the default; the cached one is opt-in
+    exact = (await async_client.get("/api/v1/history?limit=1&fields=summary", headers=headers)).json()["total"]
+    _seed_history(MOCK_USER_ID, 1)
+    assert (await async_client.get("/api/v1/history?limit=1&fields=summary", headers=headers)).json()["total"] == exact + 1
+
+    # Bad base64, valid base64 without a separator, and a bad timestamp/id all read as one error
+    bad_fields = base64.urlsafe_b64encode(b"not-a-date|not-a-uuid").decode("ascii")
+    for cursor in ("garbage", "Zm9v", bad_fields):
+        response = await async_client.get(f"/api/v1/history?cursor={cursor}", headers=headers)
+        assert (response.status_code, response.json()["detail"]) == (400, "Invalid cursor")
+
+
+def test_history_codec_roundtrip() -> None:
+    input_payload = {"features": {"b": 14.3, "a": 2}, "metadata": {"source": "test"}}
+    output_payload = {"label": "Aprobar", "score": 0.61, "details": {"estimated_grade": 12.5}, "version": "v1"}
+
+    encoded = history_codec.encode(input_payload, output_payload)
+    assert encoded.feature_names == ("a", "b")
+    assert len(encoded.features_blob) == 8
+    assert "features" not in encoded.input_remainder
+    assert encoded.estimated_grade == 12.5
+
+    decoded_input = history_codec.decode_input(encoded.input_remainder, encoded.feature_names, encoded.features_blob)
+    decoded_output = history_codec.decode_output(encoded.output_remainder, encoded.label, encoded.score, "v1")
+    assert decoded_input == {"features": {"a": 2.0, "b": 14.3}, "metadata": {"source": "test"}}
+    assert decoded_output == output_payload
+
+    # Non-numeric features stay in the JSON remainder untouched
+    assert history_codec.encode({"features": {"a": "x"}}, {}).input_remainder == {"features": {"a": "x"}}
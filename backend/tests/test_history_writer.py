@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+
+from app.db import repository
+from app.db.base import SessionLocal
+from app.services.history_writer import HistoryWriter
+
+
+def _records(n: int) -> list[dict]:
+    return [
+        {"course_code": "WB101", "input_payload": {}, "output_payload": {"label": "Aprobar", "score": 0.7}, "version": "v1"}
+        for _ in range(n)
+    ]
+
+
+def _seed_user() -> str:
+    user_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        repository.get_or_create_user(db, user_id=user_id, email=f"{user_id}@example.com")
+        repository.get_or_create_course(db, course_code="WB101")
+        db.commit()
+    return user_id
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_bulk_after_commit() -> None:
+    user_id = _seed_user()
+    writer = HistoryWriter(max_queue=100, batch_size=50, flush_interval_ms=5)
+    writer.start()
+    try:
+        for _ in range(3):
+            with SessionLocal() as db:
+                writer.record(db, user_id=user_id, records=_records(2))
+                db.commit()
+
+        # Rolled back requests leave no history behind
+        with SessionLocal() as db:
+            writer.record(db, user_id=user_id, records=_records(1))
+            db.rollback()
+    finally:
+        await writer.drain()
+
+    assert writer.stats()["written"] == 6
+    assert writer.flushes <= 3
+    with SessionLocal() as db:
+        assert repository.count_user_inferences(db, user_id=user_id) == 6
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_and_counts_rows() -> None:
+    user_id = _seed_user()
+    writer = HistoryWriter(max_queue=2, batch_size=10, flush_interval_ms=50)
+    writer.start()
+    try:
+        with SessionLocal() as db:
+            writer.record(db, user_id=user_id, records=_records(5))
+            db.commit()
+    finally:
+        await writer.drain()
+
+    assert writer.dropped == 3
+    assert writer.written == 2
+
+
+def test_writes_inline_when_not_running() -> None:
+    user_id = _seed_user()
+    writer = HistoryWriter(max_queue=10, batch_size=10, flush_interval_ms=5)
+    with SessionLocal() as db:
+        writer.record(db, user_id=user_id, records=_records(1))
+        db.commit()
+        assert repository.count_user_inferences(db, user_id=user_id) == 1
+
+
+def test_failed_flush_only_drops_the_bad_rows() -> None:
+    first, second = _seed_user(), _seed_user()
+    writer = HistoryWriter(max_queue=100, batch_size=50, flush_interval_ms=5)
+    rows = [(first, record) for record in _records(3)] + [(second, record) for record in _records(2)]
+    rows.insert(2, (first, {"course_code": "WB101"}))  # No payloads: cannot be stored
+
+    writer._flush([(0.0, row) for row in rows])
+
+    assert (writer.written, writer.failed) == (5, 1)
+    with SessionLocal() as db:
+        assert repository.count_user_inferences(db, user_id=first) == 3
+        assert repository.count_user_inferences(db, user_id=second) == 2
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from app.services.inference import InferenceService
+
+
+class _GradeRegressor:
+    def predict(self, X):
+        return X[:, 0]
+
+
+class _ShiftedGradeRegressor(_GradeRegressor):
+    grade_pass_center = 12.0
+    grade_pass_scale = 1.0
+
+
+def test_regressor_grades_convert_per_row() -> None:
+    vectors = np.array([[10.5], [15.5], [5.5]])
+    proba, grades = InferenceService._predict_proba_and_grade(_GradeRegressor(), vectors)
+
+    np.testing.assert_allclose(grades, [10.5, 15.5, 5.5])
+    expected = 1.0 / (1.0 + np.exp(-(grades - 10.5) / 5.0))
+    np.testing.assert_allclose(proba[:, 1], expected)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+
+
+def test_sigmoid_centre_and_scale_can_be_set_per_model() -> None:
+    proba, _ = InferenceService._predict_proba_and_grade(_ShiftedGradeRegressor(), np.array([[12.0], [1000.0]]))
+    assert proba[0, 1] == pytest.approx(0.5)
+    assert proba[1, 1] == pytest.approx(1.0)
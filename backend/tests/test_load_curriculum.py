@@ -0,0 +1,50 @@
+import json
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Course
+from load_curriculum import CURRICULUM_CSV, METADATA_JSON, load_curriculum, read_curriculum
+
+HEADER = "SEM,CODIGO,CURSO,TIPO,HORAS,CREDITOS,PREREQUISITO\n"
+
+
+def _session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'courses.db'}")
+    Course.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_reads_family_and_level_from_the_curriculum() -> None:
+    courses = read_curriculum(CURRICULUM_CSV, METADATA_JSON)
+    assert courses["CS1D1"]["familia"] == "CS"
+    assert courses["MA100"]["familia"] == "MA"
+    # Level is the curriculum semester, as NIVEL_CURSO in the training data
+    assert all(course["nivel"] == course["semestre"] for course in courses.values())
+
+
+def test_load_is_idempotent_and_reports_changes(tmp_path) -> None:
+    csv_path = tmp_path / "malla.csv"
+    csv_path.write_text(HEADER + "I,CS111,PROGRAMACION,O,6,4,[]\nII,CS112,CIENCIA I,O,6,4,['PROGRAMACION']\n")
+    metadata_path = tmp_path / "cursos.json"
+    metadata_path.write_text(json.dumps([{"CODIGO": "CS111", "CURSO": "Programación"}, {"CODIGO": "ID101", "CURSO": "Inglés"}]))
+    factory = _session_factory(tmp_path)
+
+    dry = load_curriculum(csv_path, metadata_path, dry_run=True, session_factory=factory)
+    assert [course["cod_curso"] for course in dry.added] == ["CS111", "CS112", "ID101"]
+    with factory() as session:
+        assert session.scalars(select(Course)).all() == []
+
+    first = load_curriculum(csv_path, metadata_path, session_factory=factory)
+    assert len(first.added) == 3
+    again = load_curriculum(csv_path, metadata_path, session_factory=factory)
+    assert (again.added, again.updated, again.unchanged) == ([], [], 3)
+
+    # Only the changed row is rewritten, and the CSV name wins over the metadata one
+    csv_path.write_text(HEADER + "I,CS111,PROGRAMACION,O,6,5,[]\nII,CS112,CIENCIA I,O,6,4,['PROGRAMACION']\n")
+    changed = load_curriculum(csv_path, metadata_path, session_factory=factory)
+    assert [(course["cod_curso"], columns) for course, columns in changed.updated] == [("CS111", ["creditos"])]
+    with factory() as session:
+        course = session.get(Course, "CS111")
+        assert (course.nombre, course.creditos, course.familia, course.nivel) == ("PROGRAMACION", 5, "CS", 1)
+        assert session.get(Course, "CS112").prerequisitos == ["PROGRAMACION"]
@@ -0,0 +1,76 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from app.api.deps import require_admin
+from app.ml.model_loader import _MockModel
+from app.ml.model_registry import ModelRegistry
+
+
+def _write_model(path, slope: float) -> None:
+    X = np.arange(12, dtype=float).reshape(4, 3)
+    joblib.dump(LinearRegression().fit(X, slope * X.sum(axis=1)), path)
+
+
+def test_reload_swaps_model_while_callers_keep_their_entry(tmp_path) -> None:
+    _write_model(tmp_path / "Ridge.pkl", slope=1.0)
+    registry = ModelRegistry(tmp_path, active="Ridge", n_features=3)
+
+    old = registry.get()
+    assert old.version.startswith("v1+")
+    assert registry.changed() == []
+
+    _write_model(tmp_path / "Ridge.pkl", slope=2.0)
+    os.utime(tmp_path / "Ridge.pkl", (old.mtime + 5, old.mtime + 5))
+    assert registry.scan() == ["Ridge"]
+
+    new = registry.get()
+    row = np.ones((1, 3))
+    assert new is not old
+    # No embedded version: the digest of the new file tells the two models apart
+    assert new.version.startswith("v1+") and new.version != old.version
+    assert new.model.predict(row)[0] == pytest.approx(2 * old.model.predict(row)[0])
+
+
+def test_failed_reload_keeps_serving_previous_model(tmp_path) -> None:
+    _write_model(tmp_path / "Lasso.pkl", slope=1.0)
+    _write_model(tmp_path / "Ridge.pkl", slope=1.0)
+    registry = ModelRegistry(tmp_path, active="Ridge", n_features=3)
+    current = registry.get()
+
+    (tmp_path / "Lasso.pkl").write_bytes(b"not a pickle")
+    with pytest.raises(Exception):
+        registry.reload("Lasso", activate=True)
+    assert registry.get() is current
+    assert registry.failures == 1
+
+    registry.reload("Ridge", activate=True)
+    assert registry.available() == ["Lasso", "Ridge"]
+
+
+def test_missing_model_falls_back_to_mock(tmp_path) -> None:
+    registry = ModelRegistry(tmp_path, active="model", n_features=3, fallback=_MockModel)
+    assert registry.get().version == "mock"
+
+
+def test_admin_endpoints_require_token(client) -> None:
+    assert client.post("/api/v1/admin/models/reload").status_code == 403
+
+
+def test_model_names_cannot_leave_the_model_dir(tmp_path, app, client) -> None:
+    registry = ModelRegistry(tmp_path / "models", active="Ridge")
+    for name in ("../evil", "a/b", "..", ""):
+        with pytest.raises(FileNotFoundError):
+            registry.path_for(name)
+
+    _write_model(tmp_path / "evil.pkl", 1.0)
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        for name in ("../evil", f"{tmp_path}/evil", "not-a-model"):
+            response = client.post("/api/v1/admin/models/reload", params={"name": name})
+            assert response.status_code == 404
+    finally:
+        app.dependency_overrides.pop(require_admin)
@@ -0,0 +1,71 @@
+import uuid
+
+import bcrypt
+import pytest
+
+from app.core.config import get_settings
+from app.core.password import UNUSABLE_PASSWORD_HASH, hash_password, needs_rehash, verify_password
+from app.db import repository
+from app.db.base import SessionLocal
+from app.db.models import User
+
+
+def test_unusable_hash_never_verifies() -> None:
+    assert not verify_password("", UNUSABLE_PASSWORD_HASH)
+    assert not verify_password("external-auth-placeholder", UNUSABLE_PASSWORD_HASH)
+    assert verify_password("secret", hash_password("secret"))
+
+
+def test_placeholder_user_creation_skips_bcrypt(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("bcrypt called while provisioning an external user")
+
+    monkeypatch.setattr(bcrypt, "hashpw", fail)
+    user_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        user = repository.get_or_create_user(db, user_id=user_id, email=f"{user_id}@example.com")
+        assert user.password_hash == UNUSABLE_PASSWORD_HASH
+
+
+def test_needs_rehash_compares_cost_factor() -> None:
+    hashed = hash_password("secret", rounds=4)
+    assert not needs_rehash(hashed, rounds=4)
+    assert needs_rehash(hashed, rounds=5)
+    assert not needs_rehash(UNUSABLE_PASSWORD_HASH, rounds=5)
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_when_cost_changes(async_client, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+    response = await async_client.post("/api/v1/register", json={"email": email, "password": "secret123"})
+    assert response.status_code == 201
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    response = await async_client.post("/api/v1/login", json={"email": email, "password": "secret123"})
+    assert response.status_code == 200
+
+    with SessionLocal() as db:
+        stored = db.query(User).filter(User.email == email).one().password_hash
+    assert stored.startswith("$2b$05$")
+    assert verify_password("secret123", stored)
+
+
+@pytest.mark.asyncio
+async def test_inactive_accounts_are_not_rehashed(async_client, monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+    assert (await async_client.post("/api/v1/register", json={"email": email, "password": "secret123"})).status_code == 201
+    with SessionLocal() as db:
+        db.query(User).filter(User.email == email).update({"is_active": False})
+        db.commit()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("inactive account rehashed")
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    monkeypatch.setattr("app.api.v1.auth.hash_password", fail)
+    response = await async_client.post("/api/v1/login", json={"email": email, "password": "secret123"})
+    assert response.status_code == 403
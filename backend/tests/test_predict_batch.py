@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_matches_single_predictions(async_client):
+    headers = {"Authorization": "Bearer test"}
+    features = {"promedio": 0.6, "creditos": 20}
+
+    response = await async_client.post(
+        "/api/v1/predict/batch",
+        json={"cod_cursos": ["CS101", "CS102"], "features": features},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["cod_curso"] for item in body["items"]] == ["CS101", "CS102"]
+
+    single = await async_client.post(
+        "/api/v1/predict", json={"cod_curso": "CS102", "features": features}, headers=headers
+    )
+    assert single.status_code == 200
+    assert body["items"][1]["score"] == pytest.approx(single.json()["score"])
+
+    history = await async_client.get("/api/v1/history", headers=headers)
+    assert any(item["cod_curso"] == "CS102" for item in history.json()["items"])
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_empty_request_returns_no_items(async_client):
+    response = await async_client.post("/api/v1/predict/batch", json={}, headers={"Authorization": "Bearer test"})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
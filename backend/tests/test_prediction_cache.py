@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from app.services.prediction_cache import (
+    LocalKeyValueStore,
+    MemoryCacheBackend,
+    PredictionCache,
+    SharedCacheBackend,
+    get_prediction_cache,
+)
+
+RESULT = ("Aprobar", 0.7, {"probabilities": {"fail": 0.3, "pass": 0.7}}, None)
+
+
+def test_memory_backend_evicts_lru_and_expires() -> None:
+    backend = MemoryCacheBackend(max_entries=2, ttl_seconds=60)
+    backend.set("a", "u1", RESULT)
+    backend.set("b", "u1", RESULT)
+    assert backend.get("a") == RESULT  # "a" becomes most recently used
+    backend.set("c", "u2", RESULT)
+    assert backend.get("b") is None
+    assert backend.invalidate_user("u1") == 1
+    assert len(backend) == 1
+
+    short = MemoryCacheBackend(max_entries=2, ttl_seconds=0.01)
+    short.set("a", "u1", RESULT)
+    time.sleep(0.02)
+    assert short.get("a") is None
+
+
+def test_shared_backend_round_trips_through_local_store() -> None:
+    backend = SharedCacheBackend(LocalKeyValueStore(), ttl_seconds=60)
+    backend.set("u1:rev:CS101:v1", "u1", RESULT)
+    assert backend.get("u1:rev:CS101:v1") == RESULT
+    # No SCAN/DEL: keys are versioned, so stale entries are unreachable and just expire
+    assert backend.invalidate_user("u1") == 0
+    backend.clear()
+    assert backend.get("u1:rev:CS101:v1") == RESULT
+
+
+@pytest.mark.asyncio
+async def test_shared_store_is_called_off_the_event_loop() -> None:
+    threads = []
+
+    class RecordingStore(LocalKeyValueStore):
+        def get(self, name):
+            threads.append(threading.get_ident())
+            return super().get(name)
+
+        def set(self, name, value, px=None):
+            threads.append(threading.get_ident())
+            return super().set(name, value, px=px)
+
+    cache = PredictionCache(SharedCacheBackend(RecordingStore(), ttl_seconds=60))
+    await cache.set_many([("u1:rev:CS101:v1", "u1", RESULT)])
+    assert await cache.get_many(["u1:rev:CS101:v1", "u1:rev:CS102:v1"]) == [RESULT, None]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(threads) == 3 and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_repeat_predictions_hit_cache_until_profile_changes(async_client):
+    headers = {"Authorization": "Bearer test"}
+    profile = {
+        "sexo": "M",
+        "fecha_nacimiento": "2002-01-01",
+        "tipo_colegio": "Público",
+        "promedio_general": 14.0,
+        "puntaje_ingreso": 70.0,
+        "periodo_ingreso": "2023-1",
+    }
+    assert (await async_client.post("/api/v1/profile", json=profile, headers=headers)).status_code == 201
+
+    cache = get_prediction_cache()
+    first = await async_client.post("/api/v1/predict", json={"cod_curso": "MA100"}, headers=headers)
+    hits = cache.hits
+    second = await async_client.post("/api/v1/predict", json={"cod_curso": "MA100"}, headers=headers)
+    assert cache.hits == hits + 1
+    assert second.json()["score"] == first.json()["score"]
+
+    profile["promedio_general"] = 18.0
+    assert (await async_client.post("/api/v1/profile", json=profile, headers=headers)).status_code == 201
+    misses = cache.misses
+    await async_client.post("/api/v1/predict", json={"cod_curso": "MA100"}, headers=headers)
+    assert cache.misses == misses + 1
+
+
+def test_shared_backend_keeps_sub_second_ttls() -> None:
+    backend = SharedCacheBackend(LocalKeyValueStore(), ttl_seconds=0.05)
+    assert backend.ttl_ms == 50
+    backend.set("u1:rev:CS101:v1", "u1", RESULT)
+    assert backend.get("u1:rev:CS101:v1") == RESULT
+    time.sleep(0.06)
+    assert backend.get("u1:rev:CS101:v1") is None
@@ -0,0 +1,87 @@
+import pytest
+
+from app.db.base import SessionLocal
+from app.db.models import Course
+from app.services.curriculum_graph import CurriculumGraph, iter_nodes
+from app.services.prerequisite_closure import PrerequisiteClosure
+
+ROWS = [
+    {"cod_curso": "A1", "nombre": "A1", "semestre": 1, "prerequisitos": []},
+    {"cod_curso": "A2", "nombre": "A2", "semestre": 2, "prerequisitos": ["A1"]},
+    {"cod_curso": "A3", "nombre": "A3", "semestre": 3, "prerequisitos": ["A2", "B1"]},
+    {"cod_curso": "B1", "nombre": "B1", "semestre": 1, "prerequisitos": []},
+    {"cod_curso": "C4", "nombre": "C4", "semestre": 4, "prerequisitos": ["A3", "100 CREDITOS APROBADOS"]},
+]
+
+
+def _codes(graph, mask):
+    course_mask = (1 << len(graph)) - 1
+    return sorted(graph.courses[node].cod_curso for node in iter_nodes(mask & course_mask))
+
+
+def test_closure_unlocks_and_critical_path() -> None:
+    graph = CurriculumGraph(ROWS)
+    closure = PrerequisiteClosure(graph)
+    node = graph.node
+
+    assert _codes(graph, closure.requires[node("C4")]) == ["A1", "A2", "A3", "B1"]
+    assert graph.requirement_names(closure.requires[node("C4")]) == ("100 CREDITOS APROBADOS",)
+    assert _codes(graph, closure.unlocks[node("A1")]) == ["A2", "A3", "C4"]
+    assert _codes(graph, closure.unlocks[node("C4")]) == []
+    assert closure.depth[node("C4")] == 4
+    assert [graph.courses[n].cod_curso for n in closure.critical_path(node("C4"))] == ["A1", "A2", "A3", "C4"]
+
+
+def test_reload_recomputes_only_affected_courses() -> None:
+    previous = PrerequisiteClosure(CurriculumGraph(ROWS))
+    rows = [dict(row) for row in ROWS]
+    rows[2]["prerequisitos"] = ["B1"]  # A3 no longer needs A2
+    graph = CurriculumGraph(rows)
+    closure = PrerequisiteClosure(graph, previous=previous)
+
+    assert closure.recomputed == 2  # A3 and C4
+    fresh = PrerequisiteClosure(graph)
+    assert (closure.requires, closure.unlocks, closure.depth) == (fresh.requires, fresh.unlocks, fresh.depth)
+    assert _codes(graph, closure.unlocks[graph.node("A1")]) == ["A2"]
+
+
+def test_cycles_still_close() -> None:
+    rows = [
+        {"cod_curso": "X1", "nombre": "X1", "semestre": 1, "prerequisitos": ["X2"]},
+        {"cod_curso": "X2", "nombre": "X2", "semestre": 2, "prerequisitos": ["X1"]},
+    ]
+    graph = CurriculumGraph(rows)
+    closure = PrerequisiteClosure(graph)
+    assert _codes(graph, closure.requires[graph.node("X1")]) == ["X1", "X2"]
+
+
+@pytest.fixture()
+def curriculum() -> None:
+    with SessionLocal() as session:
+        session.add_all(Course(**row) for row in ROWS)
+        session.commit()
+    CurriculumGraph.refresh()
+    yield
+    with SessionLocal() as session:
+        session.query(Course).filter(Course.cod_curso.in_([row["cod_curso"] for row in ROWS])).delete()
+        session.commit()
+    CurriculumGraph.refresh()
+
+
+@pytest.mark.asyncio
+async def test_dependency_endpoints(async_client, curriculum) -> None:
+    headers = {"Authorization": "Bearer test"}
+    response = await async_client.get("/api/v1/courses/a3/blocked-by", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["direct"], [c["cod_curso"] for c in body["courses"]]) == (["B1", "A2"], ["A1", "B1", "A2"])
+    assert body["curriculum_version"] == CurriculumGraph.current().version
+
+    response = await async_client.get("/api/v1/courses/A1/unlocks", headers=headers)
+    assert [c["cod_curso"] for c in response.json()["courses"]] == ["A2", "A3", "C4"]
+
+    response = await async_client.get("/api/v1/courses/C4/critical-path", headers=headers)
+    assert response.json()["length"] == 4
+
+    response = await async_client.get("/api/v1/courses/ZZ999/unlocks", headers=headers)
+    assert response.status_code == 404
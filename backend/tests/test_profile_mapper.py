@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.ml.course_index import COURSE_FEATURES, CourseIndex, stable_code
+from app.ml.featurizer import to_feature_vector
+from app.services.profile_mapper import FEATURE_NAMES, simplified_to_feature_matrix, simplified_to_full_features
+
+PROFILE = {
+    "sexo": "F",
+    "fecha_nacimiento": "2001-03-15",
+    "tipo_colegio": "Privado",
+    "promedio_general": 15.5,
+    "creditos_aprobados": 40,
+    "puntaje_ingreso": 82.0,
+    "semestres_cursados": 3,
+    "tiene_beca": True,
+    "periodo_ingreso": "2022-2",
+}
+
+
+def test_feature_matrix_rows_match_dict_mapper() -> None:
+    courses = ["CS2H1", "MA100", "FG101"]
+    matrix = simplified_to_feature_matrix(PROFILE, courses)
+
+    assert matrix.shape == (len(courses), len(FEATURE_NAMES))
+    assert matrix.dtype == np.float64
+    for row, code in zip(matrix, courses):
+        expected = to_feature_vector(simplified_to_full_features(PROFILE, course_code=code))[0]
+        np.testing.assert_allclose(row, expected)
+
+
+def test_feature_names_follow_sorted_vector_order() -> None:
+    assert list(FEATURE_NAMES) == sorted(FEATURE_NAMES)
+
+
+def test_course_index_encoding_is_deterministic() -> None:
+    records = [
+        {"cod_curso": "MA100", "nombre": "MATEMATICA I", "tipo": "O", "horas": 6, "creditos": 5},
+        {"cod_curso": "CS2H1", "nombre": "INTERACCION HUMANO COMPUTADOR", "tipo": "O", "horas": 5, "creditos": 3},
+    ]
+    index = CourseIndex(records, catalog_codes=["MA100", "CS2H1"])
+    rows = index.rows(["CS2H1", "MA100", "XX999"])
+    columns = {name: idx for idx, name in enumerate(COURSE_FEATURES)}
+
+    assert rows[:2, columns["COD_CURSO"]].tolist() == [0.0, 1.0]
+    assert rows[:2, columns["CREDITOS"]].tolist() == [3.0, 5.0]
+    # Clusters follow the two-character prefix the model was trained with
+    assert rows[:2, columns["CLUSTER_CURSO"]].tolist() == [0.0, 5.0]
+    assert rows[2, columns["COD_CURSO"]] == float(stable_code("XX999", 1000))
+    np.testing.assert_array_equal(index.rows(["XX999"])[0], rows[2])
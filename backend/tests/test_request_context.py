@@ -0,0 +1,57 @@
+import uuid
+
+from sqlalchemy import event
+
+from app.db import repository
+from app.db.base import SessionLocal, engine
+from app.db.identity_cache import get_identity_cache
+
+
+def _count_queries(fn):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return result, len(statements)
+
+
+def test_context_resolves_user_profile_and_course_in_one_select() -> None:
+    user_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        repository.get_or_create_user(db, user_id=user_id, email=f"{user_id}@example.com")
+        repository.get_or_create_course(db, course_code="CTX101")
+        repository.create_student_profile(db, user_id=user_id, profile_data={"promedio_general": 14.0})
+        db.commit()
+
+    get_identity_cache().clear()
+    with SessionLocal() as db:
+        context, selects = _count_queries(
+            lambda: repository.load_request_context(db, user_id=user_id, course_code="CTX101")
+        )
+        assert selects == 1
+        assert context.profile.profile_data == {"promedio_general": 14.0}
+
+    # User and course are now known, only the profile is read
+    with SessionLocal() as db:
+        _, selects = _count_queries(lambda: repository.load_request_context(db, user_id=user_id, course_code="CTX101"))
+        assert selects == 1
+        assert get_identity_cache().hits >= 2
+
+
+def test_context_creates_missing_user_and_course() -> None:
+    user_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        context = repository.load_request_context(db, user_id=user_id, email=f"{user_id}@example.com", course_code="CTX999")
+        db.commit()
+        assert context.profile is None
+
+    with SessionLocal() as db:
+        assert repository.get_or_create_course(db, course_code="CTX999").nombre == "CTX999"
+        assert str(repository.get_or_create_user(db, user_id=user_id).id) == user_id
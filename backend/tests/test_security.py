@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.config import Settings
+from app.core.security import get_token_cache, invalidate_token, verify_access_token
+
+JWKS_URL = "https://idp.test/auth/v1/keys"
+
+
+def _settings() -> Settings:
+    return Settings(_env_file=None, AUTH_MODE="jwt", DATABASE_URL="sqlite://", JWT_SECRET="test-secret")
+
+
+def _token(exp: float, sub: str = "11111111-1111-1111-1111-111111111111") -> str:
+    return jwt.encode({"sub": sub, "email": "a@b.c", "exp": int(exp)}, "test-secret", algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_served_from_cache(monkeypatch) -> None:
+    settings = _settings()
+    get_token_cache().clear()
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+
+    token = _token(time.time() + 3600)
+    first = await verify_access_token(token, settings)
+    second = await verify_access_token(token, settings)
+    assert second is first
+    assert len(calls) == 1
+
+    assert invalidate_token(token, settings=settings) == 1
+    await verify_access_token(token, settings)
+    assert len(calls) == 2
+
+    assert invalidate_token(user_id=first.id) == 1
+    assert len(get_token_cache()) == 0
+
+
+def test_cache_entries_expire_at_token_exp() -> None:
+    cache = security.VerifiedTokenCache(max_entries=2, max_ttl_seconds=600)
+    expired = security.AuthenticatedUser(id="u", raw_claims={"exp": time.time() - 1})
+    cache.set("k", expired)
+    assert cache.get("k") is None
+
+    for key in ("a", "b", "c"):
+        cache.set(key, security.AuthenticatedUser(id=key, raw_claims={"exp": time.time() + 60}))
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def _jwks_server(*kids: str):
+    """Local stand-in for the identity provider's JWKS endpoint."""
+    state = {"calls": 0, "kids": list(kids)}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"keys": [{"kid": kid, "kty": "RSA"} for kid in state["kids"]]})
+
+    return httpx.MockTransport(handler), state
+
+
+@pytest.mark.asyncio
+async def test_jwks_refresh_is_single_flight() -> None:
+    transport, server = _jwks_server("k1")
+    cache = security.JWKSCache(transport=transport)
+    results = await asyncio.gather(*(cache.get_keys(JWKS_URL) for _ in range(20)))
+    assert server["calls"] == 1
+    assert all(result is results[0] for result in results)
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_jwks_serves_stale_keys_while_refreshing() -> None:
+    transport, server = _jwks_server("k1")
+    cache = security.JWKSCache(ttl_seconds=300, refresh_ahead_seconds=60, min_refresh_interval_seconds=0, transport=transport)
+    first = await cache.get_keys(JWKS_URL)
+
+    cache._fetched_at -= 400  # past the TTL, within the stale window
+    assert await cache.get_keys(JWKS_URL) is first
+    assert cache.stale_served == 1
+    await asyncio.sleep(0.05)
+    assert server["calls"] == 2
+    assert await cache.get_keys(JWKS_URL) is not first
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_at_most_once_per_interval() -> None:
+    transport, server = _jwks_server("k1")
+    cache = security.JWKSCache(min_refresh_interval_seconds=30, transport=transport)
+    assert await cache.get_key(JWKS_URL, "k1") is not None
+
+    server["kids"].append("k2")
+    cache._attempted_at -= 60
+    assert (await cache.get_key(JWKS_URL, "k2"))["kid"] == "k2"
+    assert await cache.get_key(JWKS_URL, "unknown") is None
+    assert server["calls"] == 2
+    await cache.aclose()
@@ -0,0 +1,95 @@
+import ast
+import csv
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.curriculum_graph import CurriculumGraph
+from app.services.study_planner import build_plan
+
+CURRICULUM_CSV = Path(__file__).resolve().parents[2] / "ml_models" / "data" / "malla_curricular_2016.csv"
+SEMESTERS = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7, "VIII": 8, "IX": 9, "X": 10}
+
+ROWS = [
+    {"cod_curso": "A1", "nombre": "A1", "semestre": 1, "tipo": "O", "creditos": 4, "prerequisitos": []},
+    {"cod_curso": "A2", "nombre": "A2", "semestre": 2, "tipo": "O", "creditos": 4, "prerequisitos": ["A1"]},
+    {"cod_curso": "A3", "nombre": "A3", "semestre": 3, "tipo": "O", "creditos": 4, "prerequisitos": ["A2"]},
+    {"cod_curso": "B1", "nombre": "B1", "semestre": 1, "tipo": "O", "creditos": 4, "prerequisitos": []},
+    {"cod_curso": "B2", "nombre": "B2", "semestre": 1, "tipo": "O", "creditos": 4, "prerequisitos": []},
+    {"cod_curso": "E1", "nombre": "E1", "semestre": 3, "tipo": "EP", "creditos": 3, "prerequisitos": ["B1", "X"]},
+    {"cod_curso": "E2", "nombre": "E2", "semestre": 3, "tipo": "EP", "creditos": 3, "prerequisitos": []},
+]
+
+
+def _codes(plan):
+    return [[item.course.cod_curso for item in semester] for semester in plan.semesters]
+
+
+def test_plan_starts_the_longest_chain_first() -> None:
+    graph = CurriculumGraph(ROWS)
+    scores = {course.node: 0.5 for course in graph.courses}
+    plan = build_plan(graph, 0, scores, max_credits=8, max_semesters=6)
+
+    # Only two courses fit per semester; A1 heads a chain of three and must go first
+    assert plan.critical_path == 3
+    assert "A1" in _codes(plan)[0]
+    assert len(plan.semesters) == 3
+    assert sorted(code for semester in _codes(plan) for code in semester) == ["A1", "A2", "A3", "B1", "B2"]
+    assert all(sum(item.course.creditos for item in semester) <= 8 for semester in plan.semesters)
+
+
+def test_electives_by_pass_probability_and_unscheduled() -> None:
+    graph = CurriculumGraph(ROWS)
+    scores = {course.node: 0.5 for course in graph.courses}
+    scores[graph.node("E1")] = 0.9
+    approved = graph.approved_mask(codes=["A1", "A2", "A3", "B2"])
+
+    plan = build_plan(graph, approved, scores, max_credits=8, max_semesters=4, electives=1)
+    assert _codes(plan) == [["B1"], ["E1"]]
+    assert plan.semesters[1][0].requirements == ("X",)
+
+    plan = build_plan(graph, approved, scores, max_credits=3, max_semesters=4, electives=1)
+    assert [course.cod_curso for course in plan.unscheduled] == ["B1", "E1"]
+
+
+@pytest.mark.skipif(not CURRICULUM_CSV.exists(), reason="curriculum CSV not available")
+def test_full_curriculum_plans_quickly() -> None:
+    with CURRICULUM_CSV.open(encoding="utf-8") as handle:
+        rows = [
+            {
+                "cod_curso": row["CODIGO"].strip(),
+                "nombre": row["CURSO"].strip(),
+                "semestre": SEMESTERS.get(row["SEM"].strip()),
+                "tipo": row["TIPO"].strip(),
+                "creditos": int(row["CREDITOS"]),
+                "prerequisitos": ast.literal_eval(row["PREREQUISITO"]),
+            }
+            for row in csv.DictReader(handle)
+        ]
+    graph = CurriculumGraph(rows)
+    scores = {course.node: 0.7 for course in graph.courses}
+
+    started = time.perf_counter()
+    plan = build_plan(graph, 0, scores, max_credits=24, max_semesters=14, electives=4)
+    assert time.perf_counter() - started < 0.5
+    assert not plan.unscheduled
+    assert plan.critical_path <= len(plan.semesters) <= 14
+
+
+@pytest.mark.asyncio
+async def test_plan_endpoint_scores_once_and_returns_semesters(async_client) -> None:
+    CurriculumGraph._install(CurriculumGraph(ROWS))
+    try:
+        response = await async_client.post(
+            "/api/v1/plan",
+            json={"max_credits": 8, "features": {"promedio": 14.0}},
+            headers={"Authorization": "Bearer test"},
+        )
+    finally:
+        CurriculumGraph.refresh()
+    assert response.status_code == 200
+    body = response.json()
+    assert body["critical_path"] == 3
+    assert [course["cod_curso"] for course in body["semesters"][2]["courses"]] == ["A3"]
+    assert all(semester["credits"] <= 8 for semester in body["semesters"])
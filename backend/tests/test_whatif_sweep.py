@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from app.db.schemas import SweepAxis
+from app.services.profile_mapper import FEATURE_INDEX, simplified_to_feature_matrix
+from app.services.whatif_sweep import SweepError, build_sweep_matrix
+
+PROFILE = {
+    "sexo": "M",
+    "fecha_nacimiento": "2002-01-01",
+    "tipo_colegio": "Público",
+    "promedio_general": 14.0,
+    "puntaje_ingreso": 70.0,
+    "semestres_cursados": 2,
+    "periodo_ingreso": "2023-1",
+}
+
+
+def test_sweep_rows_match_individually_mapped_profiles() -> None:
+    axes = [
+        SweepAxis(key="promedio_general", start=10, stop=20, steps=3),
+        SweepAxis(key="HRS_INASISTENCIA_ACUM_PASADO_y", values=[0.0, 4.0]),
+    ]
+    matrix, grid = build_sweep_matrix(
+        course_code="MA100", axes=axes, profile_data=PROFILE, features={}, max_points=100
+    )
+
+    assert matrix.shape == (1 + 6, len(FEATURE_INDEX))
+    np.testing.assert_allclose(matrix[0], simplified_to_feature_matrix(PROFILE, ["MA100"])[0])
+    for row, (promedio, absences) in zip(matrix[1:], grid):
+        expected = simplified_to_feature_matrix({**PROFILE, "promedio_general": promedio}, ["MA100"])[0]
+        expected[FEATURE_INDEX["HRS_INASISTENCIA_ACUM_PASADO_y"]] = absences
+        np.testing.assert_allclose(row, expected)
+
+
+def test_relative_axes_and_point_limit() -> None:
+    axes = [SweepAxis(key="promedio_general", values=[-1.0, 1.0], relative=True)]
+    _, grid = build_sweep_matrix(course_code="MA100", axes=axes, profile_data=PROFILE, features={}, max_points=10)
+    assert grid[:, 0].tolist() == [13.0, 15.0]
+
+    with pytest.raises(SweepError):
+        build_sweep_matrix(
+            course_code="MA100",
+            axes=[SweepAxis(key="promedio_general", start=0, stop=20, steps=50)],
+            profile_data=PROFILE,
+            features={},
+            max_points=10,
+        )
+
+
+@pytest.mark.asyncio
+async def test_sweep_endpoint_returns_curve_and_one_history_entry(async_client):
+    headers = {"Authorization": "Bearer test"}
+    before = (await async_client.get("/api/v1/history", headers=headers)).json()["total"]
+
+    response = await async_client.post(
+        "/api/v1/whatif/sweep",
+        json={
+            "cod_curso": "CS101",
+            "features": {"HRS_INASISTENCIA_ACUM_PASADO_y": 0.0},
+            "axes": [{"key": "HRS_INASISTENCIA_ACUM_PASADO_y", "start": 0, "stop": 8, "steps": 5}],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [point["values"]["HRS_INASISTENCIA_ACUM_PASADO_y"] for point in body["points"]] == [0.0, 2.0, 4.0, 6.0, 8.0]
+
+    after = (await async_client.get("/api/v1/history", headers=headers)).json()["total"]
+    assert after == before + 1
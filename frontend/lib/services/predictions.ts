@@ -26,6 +26,19 @@ export interface PredictionResult {
   max_grade?: number | null;
 }
 
+export interface BatchPredictRequest {
+  cod_cursos?: string[];
+  all_available?: boolean;
+  max_next_semesters?: number;
+  features?: Record<string, number>;
+  metadata?: Record<string, any>;
+}
+
+export interface BatchPredictionResult {
+  items: PredictionResult[];
+  version: string;
+}
+
 export interface InferenceRecord {
   id: string;
   cod_curso: string;
@@ -39,9 +52,10 @@ export interface InferenceRecord {
 
 export interface HistoryResponse {
   items: InferenceRecord[];
-  total: number;
+  total: number | null; // null with total=none
   limit: number;
   offset: number;
+  next_cursor?: string | null;
 }
 
 /**
@@ -61,6 +75,15 @@ export async function predict(
   return api.post<PredictionResult>('/predict', request);
 }
 
+/**
+ * Make predictions for several courses in one request
+ */
+export async function predictBatch(
+  request: BatchPredictRequest
+): Promise<BatchPredictionResult> {
+  return api.post<BatchPredictionResult>('/predict/batch', request);
+}
+
 /**
  * Run a what-if scenario
  */
@@ -85,7 +108,12 @@ export async function whatIf(
  */
 export async function getHistory(
   limit: number = 50,
-  offset: number = 0
+  offset: number = 0,
+  cursor?: string | null
 ): Promise<HistoryResponse> {
+  // Prefer the cursor (next_cursor of the previous page) for deep pages
+  if (cursor) {
+    return api.get<HistoryResponse>(`/history?limit=${limit}&cursor=${encodeURIComponent(cursor)}`);
+  }
   return api.get<HistoryResponse>(`/history?limit=${limit}&offset=${offset}`);
 }